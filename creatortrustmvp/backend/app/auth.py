@@ -1,27 +1,79 @@
+import asyncio
+import os
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.metrics import MetricFamily
+
 SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# bcrypt cost factor for new hashes; existing hashes are upgraded on login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a thread pool keeps hashing off the event loop
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+# Bearer token for the /api/admin endpoints, which are disabled while it is unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
 security = HTTPBearer()
 
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_queue_depth = 0
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    # Accounts created by bulk import have no password
+    if not hashed_password:
+        return False
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
 def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # Hashes look like $2b$12$<salt+digest>; the second field is the cost factor
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def password_queue_depth() -> int:
+    """Hash/verify calls submitted to the pool that have not finished yet."""
+    return _password_queue_depth
+
+
+async def _run_password_task(func, *args):
+    global _password_queue_depth
+    _password_queue_depth += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+    finally:
+        _password_queue_depth -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_task(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -41,8 +93,81 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+class TokenCache:
+    """Bounded LRU of verified JWT claims keyed by the raw token, kept until the token's exp."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            self.invalidate_token(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: dict):
+        expires_at = claims.get("exp")
+        if expires_at is None or self.max_size <= 0:
+            return
+        self._entries[token] = (float(expires_at), claims)
+        self._entries.move_to_end(token)
+        user_id = claims.get("sub")
+        if user_id is not None:
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            self.invalidate_token(next(iter(self._entries)))
+
+    def invalidate_token(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1].get("sub")
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: str):
+        """Evict every cached token of a user; storage calls it when their password hash changes."""
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+
+def collect_metrics() -> List[MetricFamily]:
+    return [
+        MetricFamily("password_hash_queue_depth", "gauge", "bcrypt calls submitted to the pool and not finished", (),
+                     {(): _password_queue_depth}),
+        MetricFamily("token_cache_lookups_total", "counter", "Token cache lookups, by result", ("result",),
+                     {("hit",): token_cache.hits, ("miss",): token_cache.misses}),
+        MetricFamily("token_cache_entries", "gauge", "Verified tokens held in the cache", (), {(): len(token_cache)}),
+    ]
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    from app.database import db
+    from app.storage import storage
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,17 +176,32 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     token = credentials.credentials
-    payload = decode_token(token)
-    
+    payload = token_cache.get(token)
     if payload is None:
-        raise credentials_exception
+        payload = decode_token(token)
+        if payload is None:
+            raise credentials_exception
+        token_cache.put(token, payload)
     
     user_id: str = payload.get("sub")
     if user_id is None:
         raise credentials_exception
     
-    user = db.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id)
     if user is None:
         raise credentials_exception
     
     return user
+
+
+async def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled"
+        )
+    if not secrets.compare_digest(credentials.credentials.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
@@ -0,0 +1,168 @@
+"""
+Bulk import and export of creator profiles and campaigns as NDJSON
+
+Import reads one JSON object per line and validates the lines against
+CreatorImport or CampaignImport a chunk at a time. The valid rows of each
+chunk are written with one storage call (see Database.import_creators)
+before the next chunk is read, so memory use and the time the database lock
+is held are bounded by the chunk rather than the file, and every rejected
+line is reported by number. Export walks a table in
+created_at order one page at a time and yields a line per record, so the
+whole table is never held as JSON. Its pages skip the query result cache,
+which they would otherwise fill with entries read only once.
+"""
+import asyncio
+import json
+from typing import (
+    AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Type, Union
+)
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.models import Campaign, CampaignImport, CreatorImport, CreatorProfile
+from app.pagination import Page
+from app.serialization import encode_record
+from app.storage import Storage
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_PAGE_SIZE = 1000
+# Import results list at most this many failed lines; "failed" counts them all
+MAX_REPORTED_ERRORS = 1000
+
+
+class BulkTable(NamedTuple):
+    import_model: Type[BaseModel]
+    export_model: Type[BaseModel]
+    # Field that must be unique within one import file, if any
+    unique_field: Optional[str]
+    # Reported for rows the storage rejects
+    rejected: str
+    insert: Callable[[Storage, List[dict]], Awaitable[List[Optional[str]]]]
+    page: Callable[[Storage, Page], Awaitable[List[dict]]]
+
+
+BULK_TABLES: Dict[str, BulkTable] = {
+    "creators": BulkTable(
+        CreatorImport, CreatorProfile, "email", "Email already registered",
+        lambda storage, rows: storage.import_creators(rows),
+        lambda storage, page: storage.search_creators(page=page, cache=False),
+    ),
+    "campaigns": BulkTable(
+        CampaignImport, Campaign, None, "Brand profile not found",
+        lambda storage, rows: storage.import_campaigns(rows),
+        lambda storage, page: storage.list_campaigns(page=page, cache=False),
+    ),
+}
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without the newline."""
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+def _describe(error: dict) -> str:
+    location = ".".join(str(part) for part in error["loc"][1:])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def validate_chunk(adapter: TypeAdapter, objects: List[object]) -> List[Union[dict, str]]:
+    """
+    Validate a chunk of decoded lines with one call to the List[model]
+    adapter. Returns the row for each valid object and an error message for
+    each invalid one; only when some fail are the others validated again.
+    """
+    try:
+        return [row.model_dump() for row in adapter.validate_python(objects)]
+    except ValidationError as exc:
+        messages: Dict[int, List[str]] = {}
+        for error in exc.errors():
+            messages.setdefault(error["loc"][0], []).append(_describe(error))
+    valid = [i for i in range(len(objects)) if i not in messages]
+    results: List[Union[dict, str]] = ["; ".join(messages.get(i, [])) for i in range(len(objects))]
+    for i, row in zip(valid, adapter.validate_python([objects[i] for i in valid])):
+        results[i] = row.model_dump()
+    return results
+
+
+async def import_ndjson(storage: Storage, table: str, chunks: AsyncIterable[bytes]) -> dict:
+    """Import an NDJSON stream into table ("creators" or "campaigns"); returns an ImportResult."""
+    spec = BULK_TABLES[table]
+    adapter = TypeAdapter(List[spec.import_model])
+    # Errors of the lines read since the last flush, and the ones to report
+    errors: List[Tuple[int, str]] = []
+    reported: List[Tuple[int, str]] = []
+    first_seen: Dict[str, int] = {}
+    imported = failed = 0
+
+    def accept(line_number: int, row: Union[dict, str]) -> bool:
+        if isinstance(row, str):
+            errors.append((line_number, row))
+            return False
+        if spec.unique_field is not None:
+            value = row[spec.unique_field]
+            if value in first_seen:
+                errors.append((line_number, f"Duplicate {spec.unique_field}, first given on line {first_seen[value]}"))
+                return False
+            first_seen[value] = line_number
+        return True
+
+    async def flush(chunk: List[Tuple[int, object]]):
+        nonlocal imported, failed
+        rows, row_lines = [], []
+        for (line_number, _), row in zip(chunk, validate_chunk(adapter, [obj for _, obj in chunk])):
+            if accept(line_number, row):
+                rows.append(row)
+                row_lines.append(line_number)
+        if rows:
+            for row_line, record_id in zip(row_lines, await spec.insert(storage, rows)):
+                if record_id is None:
+                    errors.append((row_line, spec.rejected))
+                else:
+                    imported += 1
+        failed += len(errors)
+        reported.extend(sorted(errors)[:MAX_REPORTED_ERRORS - len(reported)])
+        errors.clear()
+        # Lets other requests in between chunks, which storage calls may not
+        await asyncio.sleep(0)
+
+    chunk: List[Tuple[int, object]] = []
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            chunk.append((line_number, json.loads(line)))
+        except ValueError as exc:
+            errors.append((line_number, f"Invalid JSON: {exc}"))
+            continue
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            await flush(chunk)
+            chunk = []
+    await flush(chunk)
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": [{"line": line, "error": error} for line, error in reported],
+    }
+
+
+async def export_ndjson(storage: Storage, table: str) -> AsyncIterator[bytes]:
+    """Yield table as NDJSON, one page of EXPORT_PAGE_SIZE records per chunk, oldest first."""
+    spec = BULK_TABLES[table]
+    page = Page("created_at", False, None, EXPORT_PAGE_SIZE)
+    while True:
+        records = await spec.page(storage, page)
+        if records:
+            yield b"".join(encode_record(record, spec.export_model) + b"\n" for record in records)
+        if len(records) < EXPORT_PAGE_SIZE:
+            return
+        page = page._replace(after=(records[-1]["created_at"], records[-1]["id"]))
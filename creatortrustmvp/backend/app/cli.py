@@ -0,0 +1,104 @@
+"""
+Maintenance commands, run against the storage configured by the environment
+(DATABASE_URL or DATABASE_WAL_DIR, as for the API).
+
+    python -m app.cli recompute-ratings [--fix]
+    python -m app.cli import {creators,campaigns} FILE
+    python -m app.cli export {creators,campaigns} [FILE]
+
+With the in-memory backend the commands load DATABASE_WAL_DIR themselves, so
+stop the API before running one that writes (recompute-ratings --fix,
+import): both processes would append to the same log. FILE may be - for
+stdin or stdout.
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from app.bulk import BULK_TABLES, export_ndjson, import_ndjson
+from app.storage import storage
+
+READ_SIZE = 64 * 1024
+
+
+async def recompute_ratings(args: argparse.Namespace) -> int:
+    mismatched = await storage.recompute_creator_ratings(fix=args.fix)
+    for creator_id in mismatched:
+        print(creator_id)
+    action = "fixed" if args.fix else "found"
+    print(f"{len(mismatched)} creator rating aggregate(s) {action}", file=sys.stderr)
+    return 1 if mismatched and not args.fix else 0
+
+
+def _open(path: str, mode: str) -> BinaryIO:
+    if path == "-":
+        return sys.stdin.buffer if "r" in mode else sys.stdout.buffer
+    return open(path, mode)
+
+
+async def _read_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := file.read(READ_SIZE):
+        yield chunk
+
+
+async def import_table(args: argparse.Namespace) -> int:
+    file = _open(args.file, "rb")
+    try:
+        result = await import_ndjson(storage, args.table, _read_chunks(file))
+    finally:
+        if file is not sys.stdin.buffer:
+            file.close()
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    print(f"{result['imported']} {args.table} imported, {result['failed']} line(s) failed", file=sys.stderr)
+    return 1 if result["failed"] else 0
+
+
+async def export_table(args: argparse.Namespace) -> int:
+    file = _open(args.file, "wb")
+    try:
+        async for chunk in export_ndjson(storage, args.table):
+            file.write(chunk)
+    finally:
+        if file is sys.stdout.buffer:
+            file.flush()
+        else:
+            file.close()
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    await storage.open()
+    try:
+        return await args.command(args)
+    finally:
+        await storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(required=True)
+
+    recompute = commands.add_parser(
+        "recompute-ratings",
+        help="recount review aggregates and list creators whose stored values disagree"
+    )
+    recompute.add_argument("--fix", action="store_true", help="overwrite the stored aggregates and ratings")
+    recompute.set_defaults(command=recompute_ratings)
+
+    importer = commands.add_parser("import", help="import NDJSON rows, reporting each rejected line")
+    importer.add_argument("table", choices=list(BULK_TABLES))
+    importer.add_argument("file", help="NDJSON file, or - for stdin")
+    importer.set_defaults(command=import_table)
+
+    exporter = commands.add_parser("export", help="write every row as NDJSON, oldest first")
+    exporter.add_argument("table", choices=list(BULK_TABLES))
+    exporter.add_argument("file", nargs="?", default="-", help="output file (default: stdout)")
+    exporter.set_defaults(command=export_table)
+
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
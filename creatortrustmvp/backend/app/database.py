@@ -1,18 +1,159 @@
 """
 In-memory database for MVP
-Data will be lost when the server restarts
+Data will be lost when the server restarts unless durability is enabled
+(see Database.enable_durability and app.wal)
 """
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import contextlib
+import functools
+import heapq
+import math
+import pickle
+import sys
+import threading
 import uuid
+from app.events import EventBus
+from app.indexes import InvertedIndex, SortedIndex
+from app.matching import CreatorColumns, campaign_platforms
+from app.query_cache import QueryCache
+from app.ratings import average_rating, empty_rating_stats, rating_summary
+from app.pagination import (
+    Page, RELEVANCE, CREATOR_SORT_KEYS, CAMPAIGN_SORT_KEYS, REVIEW_SORT_KEYS, PAYMENT_SORT_KEYS,
+    APPLICANT_SORT_KEYS, total_followers
+)
+from app.records import (
+    RECORD_TYPES, UserRecord, CreatorProfileRecord, BrandProfileRecord, CampaignRecord,
+    SubmissionRecord, PaymentRecord, ReviewRecord, ApplicationRecord
+)
+from app.wal import WriteAheadLog
 from app.models import (
     User, CreatorProfile, BrandProfile, Campaign, 
     CampaignSubmission, Payment, Review,
     UserType, CampaignStatus, PaymentStatus, SubscriptionTier
 )
 
+# Creator profile fields covered by keyword search, with their term weight
+CREATOR_TEXT_FIELDS = {
+    "name": 3,
+    "niche": 2,
+    "instagram_handle": 2,
+    "youtube_handle": 2,
+    "tiktok_handle": 2,
+    "location": 1,
+    "bio": 1,
+}
+
+ACTIVE_CAMPAIGN_STATUSES = (
+    CampaignStatus.OPEN.value,
+    CampaignStatus.ASSIGNED.value,
+    CampaignStatus.IN_PROGRESS.value,
+)
+# Bulk imports of at least 1/BULK_REBUILD_FRACTION of all rows rebuild the
+# indexes once at the end instead of updating them per row
+BULK_REBUILD_FRACTION = 4
+# Statuses the assign, submit and approve flows accept; from any other status
+# they change nothing and return None
+ASSIGNABLE_CAMPAIGN_STATUSES = (
+    CampaignStatus.OPEN.value,
+    CampaignStatus.ASSIGNED.value,
+)
+DELIVERABLE_CAMPAIGN_STATUSES = (
+    CampaignStatus.ASSIGNED.value,
+    CampaignStatus.IN_PROGRESS.value,
+    CampaignStatus.SUBMITTED.value,
+)
+# Only submitted work is approved, which completes the campaign and releases its escrow
+APPROVABLE_CAMPAIGN_STATUSES = (
+    CampaignStatus.SUBMITTED.value,
+)
+
+
+def _new_id() -> str:
+    return sys.intern(str(uuid.uuid4()))
+
+
+def _as_datetime(value: Any) -> datetime:
+    # ISO strings or datetimes; aware values become naive UTC like every stored datetime
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _as_budget(value: Any) -> float:
+    # NaN or infinity would break the bisection in the budget index
+    budget = float(value)
+    if not math.isfinite(budget) or budget < 0:
+        raise ValueError(f"Invalid budget: {value!r}")
+    return budget
+
+
+# Campaign fields the indexes sort or bucket on, coerced by update_campaign before it changes anything
+CAMPAIGN_FIELD_TYPES = {
+    "budget": _as_budget,
+    "min_followers": int,
+    "duration_days": int,
+    "niche": str,
+    "status": lambda value: CampaignStatus(value).value,
+    "deadline": _as_datetime,
+}
+# Campaign fields update_campaign refuses: the by-brand and by-creator indexes follow them
+CAMPAIGN_OWNER_FIELDS = ("id", "brand_id", "creator_id")
+
+
+def _campaign_changes(data: dict) -> dict:
+    """data with the indexed fields coerced; raises ValueError for a value that does not fit."""
+    changes = dict(data)
+    for field in CAMPAIGN_OWNER_FIELDS:
+        if field in changes:
+            raise ValueError(f"Campaign {field} cannot be updated")
+    for field, kind in CAMPAIGN_FIELD_TYPES.items():
+        if field in changes:
+            try:
+                changes[field] = kind(changes[field])
+            except (AttributeError, TypeError, ValueError) as e:
+                raise ValueError(f"Invalid campaign {field}: {changes[field]!r}") from e
+    return changes
+
+
+def _cacheable(page: Optional[Page], cache: bool) -> bool:
+    # Pages after a cursor are mostly walked once, by scrolling clients and exports
+    return cache and (page is None or page.after is None)
+
+
+def _synchronized(method):
+    """Run a Database method under Database.lock, then wait for a synchronous log outside it."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        state = self._thread_state
+        with self.lock:
+            state.depth = getattr(state, "depth", 0) + 1
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                state.depth -= 1
+        if not state.depth and not getattr(state, "deferred", False):
+            self._wait_durable()
+        return result
+    return wrapper
+
+
+def _empty_profile_stats() -> dict:
+    return {
+        "released": 0.0,
+        "escrowed": 0.0,
+        "campaigns": 0,
+        "active_campaigns": 0,
+        "completed_campaigns": 0
+    }
+
 
 class Database:
+    TABLES = ("users", "creator_profiles", "brand_profiles", "campaigns", "submissions", "payments", "reviews",
+              "applications")
+    
     def __init__(self):
         self.users: Dict[str, dict] = {}
         self.creator_profiles: Dict[str, dict] = {}
@@ -21,26 +162,277 @@ class Database:
         self.submissions: Dict[str, dict] = {}
         self.payments: Dict[str, dict] = {}
         self.reviews: Dict[str, dict] = {}
+        self.applications: Dict[str, dict] = {}
         
+        self.wal: Optional[WriteAheadLog] = None
+        # Every method that writes, or that iterates a shared index, holds this.
+        # Each call is then atomic, including the multi-record approve flow.
+        self.lock = threading.RLock()
+        # Per thread: nesting depth of synchronized calls, whether the wait for
+        # fsync is deferred, and the LSN of its last logged record not waited for
+        self._thread_state = threading.local()
+        # Set while rebuild_indexes runs: sorted indexes are appended to and
+        # sorted once at the end, rather than kept in order row by row
+        self._defer_sort = False
+        # Results of filtered search_creators and list_campaigns calls (see app.query_cache)
+        self.creator_search_cache = QueryCache()
+        self.campaign_list_cache = QueryCache()
+        # Campaign and payment changes for the /api/events streams (see app.events)
+        self.events = EventBus()
+        self._reset_indexes()
+    
+    def _reset_indexes(self):
         self.users_by_email: Dict[str, str] = {}
         self.profiles_by_user_id: Dict[str, str] = {}
         self.campaigns_by_brand: Dict[str, List[str]] = {}
         self.campaigns_by_creator: Dict[str, List[str]] = {}
         self.reviews_by_creator: Dict[str, List[str]] = {}
+        self.submissions_by_campaign: Dict[str, List[str]] = {}
+        self.payments_by_campaign: Dict[str, List[str]] = {}
+        self.payments_by_brand: Dict[str, List[str]] = {}
+        self.payments_by_creator: Dict[str, List[str]] = {}
+        # campaign id -> {creator id: application id}, in application order
+        self.applications_by_campaign: Dict[str, Dict[str, str]] = {}
+        self.applications_by_creator: Dict[str, List[str]] = {}
+        
+        self.creators_by_niche: Dict[str, Set[str]] = {}
+        self.creators_by_location: Dict[str, Set[str]] = {}
+        self.creators_text = InvertedIndex()
+        self.creator_columns = CreatorColumns()
+        self.campaigns_by_status: Dict[str, Set[str]] = {}
+        self.campaigns_by_niche: Dict[str, Set[str]] = {}
+        # Min-heap of (deadline, campaign id) for open campaigns, popped by
+        # expire_campaigns. scheduled_deadlines holds the live entry per
+        # campaign; heap entries that no longer match it are skipped.
+        self.campaign_deadlines: List[Tuple[datetime, str]] = []
+        self.scheduled_deadlines: Dict[str, datetime] = {}
         
+        # One SortedIndex per sort field, for range filters and keyset pagination.
+        # Campaigns are partitioned by status, reviews by creator, payments by
+        # brand/creator profile id and applicants (creator profiles) by campaign.
+        self.creators_sorted: Dict[str, SortedIndex] = {field: SortedIndex() for field in CREATOR_SORT_KEYS}
+        self.campaigns_sorted_by_status: Dict[str, Dict[str, SortedIndex]] = {}
+        self.reviews_sorted_by_creator: Dict[str, Dict[str, SortedIndex]] = {}
+        self.payments_sorted_by_profile: Dict[str, Dict[str, SortedIndex]] = {}
+        self.applicants_sorted_by_campaign: Dict[str, Dict[str, SortedIndex]] = {}
+        
+        # Running totals per brand/creator profile id, read by the dashboards
+        self.profile_stats: Dict[str, dict] = {}
+        # Review count, rating sum and star histogram per creator (see app.ratings)
+        self.rating_stats: Dict[str, dict] = {}
+        self.creator_search_cache.clear()
+        self.campaign_list_cache.clear()
+    
+    def _log(self, table: str, record: dict):
+        if self.wal is not None:
+            self._thread_state.lsn = self.wal.append(table, record, wait=False)
+    
+    def _wait_durable(self):
+        lsn = self.take_unsynced_lsn()
+        if lsn:
+            self.wal.wait_durable(lsn)
+    
+    def take_unsynced_lsn(self) -> int:
+        """The LSN a synchronous log must reach before this thread's writes are acknowledged; 0 if none."""
+        lsn = getattr(self._thread_state, "lsn", 0)
+        self._thread_state.lsn = 0
+        return lsn if lsn and self.wal.synchronous else 0
+    
+    @contextlib.contextmanager
+    def deferred_durability(self):
+        """Leave the wait for a synchronous log to the caller (see take_unsynced_lsn)."""
+        self._thread_state.deferred = True
+        try:
+            yield
+        finally:
+            self._thread_state.deferred = False
+    
+    def enable_durability(self, directory: str, fsync_interval: float = 0.005, synchronous: bool = False):
+        """Recover state from directory, then log every mutation there."""
+        wal = WriteAheadLog(directory, fsync_interval, synchronous)
+        snapshot, tail = wal.load()
+        if snapshot:
+            for table in self.TABLES:
+                rows = snapshot.get(table, {})
+                setattr(self, table, {row_id: self._as_record(table, row) for row_id, row in rows.items()})
+        for table, record in tail:
+            record = self._as_record(table, record)
+            getattr(self, table)[record["id"]] = record
+        self.rebuild_indexes()
+        wal.start()
+        self.wal = wal
+    
+    def _as_record(self, table: str, row: dict) -> dict:
+        # Logs and snapshots written before rows became slotted records hold plain dicts
+        record_type = RECORD_TYPES[table]
+        return row if isinstance(row, record_type) else record_type.from_dict(row)
+    
+    @_synchronized
+    def dump_snapshot(self) -> Tuple[int, bytes]:
+        """Rotate the log and pickle every table at the same point."""
+        lsn = self.wal.rotate()
+        payload = pickle.dumps({table: getattr(self, table) for table in self.TABLES}, pickle.HIGHEST_PROTOCOL)
+        return lsn, payload
+    
+    def snapshot(self):
+        if self.wal is not None:
+            self.wal.write_snapshot(*self.dump_snapshot())
+    
+    @_synchronized
+    def begin_snapshot(self) -> Tuple[int, bytes, Dict[str, List[dict]]]:
+        """Rotate the log; return its LSN, the snapshot header and the records to pass to dump_records."""
+        lsn = self.wal.rotate()
+        header = pickle.dumps({}, pickle.HIGHEST_PROTOCOL)
+        return lsn, header, {table: list(getattr(self, table).values()) for table in self.TABLES}
+    
+    @_synchronized
+    def dump_records(self, table: str, records: List[dict]) -> Tuple[int, bytes]:
+        """A pickled snapshot chunk and the last LSN whose writes it may contain."""
+        return self.wal.last_lsn, pickle.dumps((table, records), pickle.HIGHEST_PROTOCOL)
+    
+    @_synchronized
+    def index_sizes(self) -> Dict[str, int]:
+        """Entry counts of the secondary indexes, reported by /metrics."""
+        sorted_indexes = list(self._sorted_indexes())
+        return {
+            "users_by_email": len(self.users_by_email),
+            "creators_text_terms": len(self.creators_text.postings),
+            "creator_columns": len(self.creator_columns.ids),
+            "campaign_deadlines": len(self.campaign_deadlines),
+            "sorted_indexes": len(sorted_indexes),
+            "sorted_index_entries": sum(len(index) for index in sorted_indexes),
+        }
+    
+    def _add_sorted(self, index: Dict[str, Dict[str, SortedIndex]], owner: str, row: dict,
+                    sort_keys: Dict[str, Callable[[dict], Any]]):
+        indexes = index.get(owner)
+        if indexes is None:
+            indexes = index[owner] = {field: SortedIndex() for field in sort_keys}
+        for field, sort_key in sort_keys.items():
+            self._sorted_add(indexes[field], sort_key(row), row["id"])
+    
+    def _sorted_add(self, index: SortedIndex, key: Any, item_id: str):
+        if self._defer_sort:
+            index.append(key, item_id)
+        else:
+            index.add(key, item_id)
+    
+    def _sorted_indexes(self) -> Iterable[SortedIndex]:
+        yield from self.creators_sorted.values()
+        for partitions in (self.campaigns_sorted_by_status, self.reviews_sorted_by_creator,
+                           self.payments_sorted_by_profile, self.applicants_sorted_by_campaign):
+            for indexes in partitions.values():
+                yield from indexes.values()
+    
+    def _remove_sorted(self, index: Dict[str, Dict[str, SortedIndex]], owner: str, row: dict,
+                       sort_keys: Dict[str, Callable[[dict], Any]]):
+        indexes = index.get(owner)
+        if indexes is None:
+            return
+        for field, sort_key in sort_keys.items():
+            indexes[field].remove(sort_key(row), row["id"])
+        if not any(len(sorted_index) for sorted_index in indexes.values()):
+            del index[owner]
+    
+    def _prefer_candidates(self, candidates: int, population: int, page: Page) -> bool:
+        """
+        Whether to sort a filtered candidate set rather than walk a sorted index
+        and filter. The walk reads about limit * population / candidates entries
+        before the page fills, so small candidate sets are cheaper to sort.
+        """
+        if page.limit is None:
+            return True
+        return candidates * candidates <= page.limit * population
+    
+    def _take(self, table: Dict[str, dict], entries: Iterable[Tuple[Any, str]], limit: Optional[int],
+              accept: Optional[Callable[[dict], bool]] = None) -> List[dict]:
+        results = []
+        for _, item_id in entries:
+            row = table[item_id]
+            if accept is not None and not accept(row):
+                continue
+            results.append(row)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+    
+    def _sort_page(self, rows: List[dict], page: Page, sort_key: Callable[[dict], Any]) -> List[dict]:
+        entries = [(sort_key(row), row["id"], row) for row in rows]
+        if page.after is not None:
+            if page.descending:
+                entries = [entry for entry in entries if entry[:2] < page.after]
+            else:
+                entries = [entry for entry in entries if entry[:2] > page.after]
+        if page.limit is None:
+            entries.sort(key=lambda entry: entry[:2], reverse=page.descending)
+        elif page.descending:
+            entries = heapq.nlargest(page.limit, entries, key=lambda entry: entry[:2])
+        else:
+            entries = heapq.nsmallest(page.limit, entries, key=lambda entry: entry[:2])
+        return [entry[2] for entry in entries]
+    
+    def rebuild_indexes(self):
+        """Recompute every secondary index and aggregate from the tables."""
+        self._reset_indexes()
+        self._defer_sort = True
+        try:
+            self._index_tables()
+        finally:
+            self._defer_sort = False
+            for index in self._sorted_indexes():
+                index.sort()
+        self.rebuild_profile_stats()
+        self.rating_stats = self._compute_rating_stats()
+    
+    def _index_tables(self):
+        for user in self.users.values():
+            self.users_by_email[user["email"]] = user["id"]
+        for profile in self.creator_profiles.values():
+            self.profiles_by_user_id[profile["user_id"]] = profile["id"]
+            self._index_creator(profile)
+        for profile in self.brand_profiles.values():
+            self.profiles_by_user_id[profile["user_id"]] = profile["id"]
+        for campaign in self.campaigns.values():
+            self.campaigns_by_brand.setdefault(campaign["brand_id"], []).append(campaign["id"])
+            if campaign.get("creator_id"):
+                self.campaigns_by_creator.setdefault(campaign["creator_id"], []).append(campaign["id"])
+            self._index_campaign(campaign)
+        for submission in self.submissions.values():
+            self.submissions_by_campaign.setdefault(submission["campaign_id"], []).append(submission["id"])
+        for payment in self.payments.values():
+            self.payments_by_campaign.setdefault(payment["campaign_id"], []).append(payment["id"])
+            campaign = self.campaigns.get(payment["campaign_id"])
+            if campaign:
+                self.payments_by_brand.setdefault(campaign["brand_id"], []).append(payment["id"])
+                self._add_sorted(self.payments_sorted_by_profile, campaign["brand_id"], payment, PAYMENT_SORT_KEYS)
+                if campaign.get("creator_id"):
+                    self.payments_by_creator.setdefault(campaign["creator_id"], []).append(payment["id"])
+                    self._add_sorted(self.payments_sorted_by_profile, campaign["creator_id"], payment,
+                                     PAYMENT_SORT_KEYS)
+        for review in self.reviews.values():
+            self.reviews_by_creator.setdefault(review["creator_id"], []).append(review["id"])
+            self._add_sorted(self.reviews_sorted_by_creator, review["creator_id"], review, REVIEW_SORT_KEYS)
+        for application in self.applications.values():
+            self._index_application(application)
+    
+    @_synchronized
     def create_user(self, email: str, password_hash: str, user_type: UserType) -> dict:
-        user_id = str(uuid.uuid4())
+        return self._insert_user(email, password_hash, user_type)
+    
+    def _insert_user(self, email: str, password_hash: str, user_type: UserType) -> dict:
+        user_id = _new_id()
         now = datetime.utcnow()
-        user = {
+        user = UserRecord.from_dict({
             "id": user_id,
             "email": email,
             "password_hash": password_hash,
             "user_type": user_type.value,
             "created_at": now,
             "updated_at": now
-        }
+        })
         self.users[user_id] = user
         self.users_by_email[email] = user_id
+        self._log("users", user)
         return user
     
     def get_user_by_email(self, email: str) -> Optional[dict]:
@@ -52,10 +444,23 @@ class Database:
     def get_user_by_id(self, user_id: str) -> Optional[dict]:
         return self.users.get(user_id)
     
+    @_synchronized
+    def update_user_password_hash(self, user_id: str, password_hash: str) -> Optional[dict]:
+        user = self.users.get(user_id)
+        if user:
+            user["password_hash"] = password_hash
+            user["updated_at"] = datetime.utcnow()
+            self._log("users", user)
+        return user
+    
+    @_synchronized
     def create_creator_profile(self, user_id: str, data: dict) -> dict:
-        profile_id = str(uuid.uuid4())
+        return self._insert_creator_profile(user_id, data)
+    
+    def _insert_creator_profile(self, user_id: str, data: dict, index: bool = True) -> dict:
+        profile_id = _new_id()
         now = datetime.utcnow()
-        profile = {
+        profile = CreatorProfileRecord.from_dict({
             "id": profile_id,
             "user_id": user_id,
             **data,
@@ -68,17 +473,24 @@ class Database:
             "total_campaigns": 0,
             "created_at": now,
             "updated_at": now
-        }
+        })
         self.creator_profiles[profile_id] = profile
         self.profiles_by_user_id[user_id] = profile_id
+        if index:
+            self._index_creator(profile)
+        self._log("creator_profiles", profile)
         return profile
     
+    @_synchronized
     def update_creator_profile(self, user_id: str, data: dict) -> Optional[dict]:
         profile_id = self.profiles_by_user_id.get(user_id)
         if profile_id and profile_id in self.creator_profiles:
             profile = self.creator_profiles[profile_id]
+            self._unindex_creator(profile)
             profile.update(data)
             profile["updated_at"] = datetime.utcnow()
+            self._index_creator(profile)
+            self._log("creator_profiles", profile)
             return profile
         return None
     
@@ -91,43 +503,184 @@ class Database:
     def get_creator_profile_by_id(self, profile_id: str) -> Optional[dict]:
         return self.creator_profiles.get(profile_id)
     
+    @_synchronized
+    def increment_creator_campaigns(self, profile_id: str) -> Optional[dict]:
+        profile = self.creator_profiles.get(profile_id)
+        if profile:
+            self._increment_creator_campaigns(profile)
+        return profile
+    
+    def _increment_creator_campaigns(self, profile: dict):
+        # total_campaigns neither filters nor orders searches, so cached results stay valid
+        profile["total_campaigns"] = profile.get("total_campaigns", 0) + 1
+        profile["updated_at"] = datetime.utcnow()
+        self.creator_columns.put(profile)
+        self._log("creator_profiles", profile)
+    
+    @_synchronized
     def search_creators(self, niche: Optional[str] = None, min_followers: Optional[int] = None, 
-                       platform: Optional[str] = None, location: Optional[str] = None) -> List[dict]:
+                       platform: Optional[str] = None, location: Optional[str] = None,
+                       page: Optional[Page] = None, q: Optional[str] = None, cache: bool = True) -> List[dict]:
+        if q or not _cacheable(page, cache):
+            # BM25 scores depend on every profile's text, so any write could reorder keyword results
+            return self._search_creators(niche, min_followers, location, page, q)
+        # platform does not filter results, so it is not part of the key
+        key = (niche.lower() if niche else None, location.lower() if location else None, min_followers or None, page)
+        results = self.creator_search_cache.get(key)
+        if results is None:
+            results = self._search_creators(niche, min_followers, location, page, q)
+            self.creator_search_cache.put(key, results)
+        return results
+    
+    def _search_creators(self, niche: Optional[str], min_followers: Optional[int], location: Optional[str],
+                         page: Optional[Page], q: Optional[str]) -> List[dict]:
+        buckets: List[Set[str]] = []
+        if niche:
+            buckets.append(self.creators_by_niche.get(niche.lower(), set()))
+        if location:
+            buckets.append(self.creators_by_location.get(location.lower(), set()))
+        buckets.sort(key=len)
+        
+        if q:
+            return self._search_creators_text(q, buckets, min_followers, page)
+        
+        if page is not None and not (buckets and self._prefer_candidates(len(buckets[0]), len(self.creator_profiles), page)):
+            # Walk the requested sort order and stop as soon as the page is full
+            minimum = (min_followers or None) if page.field == "followers" else None
+            entries = self.creators_sorted[page.field].iter_entries(minimum, after=page.after, reverse=page.descending)
+            
+            def accept(profile: dict) -> bool:
+                if any(profile["id"] not in bucket for bucket in buckets):
+                    return False
+                return not min_followers or total_followers(profile) >= min_followers
+            
+            return self._take(self.creator_profiles, entries, page.limit, accept)
+        
+        results = self._filter_creators(buckets, min_followers)
+        if page is not None:
+            results = self._sort_page(results, page, CREATOR_SORT_KEYS[page.field])
+        return results
+    
+    def _search_creators_text(self, q: str, buckets: List[Set[str]], min_followers: Optional[int],
+                              page: Optional[Page]) -> List[dict]:
+        scores = self.creators_text.search(q, buckets[0] if buckets else None)
+        if len(buckets) > 1 or min_followers:
+            scores = {
+                profile_id: score for profile_id, score in scores.items()
+                if all(profile_id in bucket for bucket in buckets[1:]) and
+                (not min_followers or total_followers(self.creator_profiles[profile_id]) >= min_followers)
+            }
+        
+        if page is not None and page.field != RELEVANCE:
+            results = [self.creator_profiles[profile_id] for profile_id in scores]
+            return self._sort_page(results, page, CREATOR_SORT_KEYS[page.field])
+        
+        # Best match first, ties by id; a relevance cursor is an offset into this ranking
+        offset = page.after[0] if page is not None and page.after is not None else 0
+        ranked = scores.items()
+        if page is not None and page.limit is not None and len(scores) > offset + page.limit:
+            threshold = heapq.nlargest(offset + page.limit, scores.values())[-1]
+            ranked = [(profile_id, score) for profile_id, score in ranked if score >= threshold]
+        ranked = sorted(ranked, key=lambda item: (-item[1], item[0]))
+        end = None if page is None or page.limit is None else offset + page.limit
+        return [self.creator_profiles[profile_id] for profile_id, _ in ranked[offset:end]]
+    
+    def _filter_creators(self, buckets: List[Set[str]], min_followers: Optional[int]) -> List[dict]:
+        followers = self.creators_sorted["followers"]
+        if not buckets:
+            if min_followers:
+                return [self.creator_profiles[pid] for pid in followers.irange(min_followers)]
+            return list(self.creator_profiles.values())
+        
+        # Intersect starting from the smallest hash bucket. The follower range is
+        # only materialised when it is smaller than every bucket; otherwise it is
+        # cheaper to check each surviving candidate's total directly.
+        smallest = buckets[0]
+        if min_followers and followers.count_range(min_followers) < len(smallest):
+            ids = followers.irange(min_followers)
+            rest = buckets
+        else:
+            ids = smallest
+            rest = buckets[1:]
+        
         results = []
-        for profile in self.creator_profiles.values():
-            if niche and profile.get("niche", "").lower() != niche.lower():
+        for profile_id in ids:
+            if any(profile_id not in bucket for bucket in rest):
                 continue
-            if location and profile.get("location", "").lower() != location.lower():
+            profile = self.creator_profiles[profile_id]
+            if min_followers and total_followers(profile) < min_followers:
                 continue
-            if min_followers:
-                total_followers = (profile.get("followers_instagram", 0) + 
-                                 profile.get("followers_youtube", 0) + 
-                                 profile.get("followers_tiktok", 0))
-                if total_followers < min_followers:
-                    continue
             results.append(profile)
         return results
     
+    def _invalidate_creator_searches(self, profile: dict):
+        location = profile.get("location", "").lower()
+        followers = total_followers(profile)
+        self.creator_search_cache.invalidate(
+            profile.get("niche", "").lower(),
+            lambda key: key[1] in (None, location) and (key[2] is None or followers >= key[2]))
+    
+    def _index_creator(self, profile: dict):
+        self._invalidate_creator_searches(profile)
+        profile_id = profile["id"]
+        self.creators_by_niche.setdefault(profile.get("niche", "").lower(), set()).add(profile_id)
+        self.creators_by_location.setdefault(profile.get("location", "").lower(), set()).add(profile_id)
+        for field, sort_key in CREATOR_SORT_KEYS.items():
+            self._sorted_add(self.creators_sorted[field], sort_key(profile), profile_id)
+        self.creators_text.add(profile_id, self._creator_text(profile))
+        self.creator_columns.put(profile)
+        for campaign_id in self._applied_campaigns(profile_id):
+            self._add_sorted(self.applicants_sorted_by_campaign, campaign_id, profile, APPLICANT_SORT_KEYS)
+    
+    def _unindex_creator(self, profile: dict):
+        self._invalidate_creator_searches(profile)
+        profile_id = profile["id"]
+        for index, key in ((self.creators_by_niche, profile.get("niche", "").lower()),
+                           (self.creators_by_location, profile.get("location", "").lower())):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(profile_id)
+                if not bucket:
+                    del index[key]
+        for field, sort_key in CREATOR_SORT_KEYS.items():
+            self.creators_sorted[field].remove(sort_key(profile), profile_id)
+        self.creators_text.remove(profile_id, self._creator_text(profile))
+        for campaign_id in self._applied_campaigns(profile_id):
+            self._remove_sorted(self.applicants_sorted_by_campaign, campaign_id, profile, APPLICANT_SORT_KEYS)
+    
+    @_synchronized
+    def match_creators(self, campaign: dict, limit: int) -> List[dict]:
+        matches = self.creator_columns.match(campaign.get("niche"), campaign.get("min_followers") or 0,
+                                             campaign_platforms(campaign), limit)
+        return [{"creator": self.creator_profiles[profile_id], "score": score} for profile_id, score in matches]
+    
+    def _creator_text(self, profile: dict) -> List[Tuple[Optional[str], int]]:
+        return [(profile.get(field), weight) for field, weight in CREATOR_TEXT_FIELDS.items()]
+    
+    @_synchronized
     def create_brand_profile(self, user_id: str, data: dict) -> dict:
-        profile_id = str(uuid.uuid4())
+        profile_id = _new_id()
         now = datetime.utcnow()
-        profile = {
+        profile = BrandProfileRecord.from_dict({
             "id": profile_id,
             "user_id": user_id,
             **data,
             "created_at": now,
             "updated_at": now
-        }
+        })
         self.brand_profiles[profile_id] = profile
         self.profiles_by_user_id[user_id] = profile_id
+        self._log("brand_profiles", profile)
         return profile
     
+    @_synchronized
     def update_brand_profile(self, user_id: str, data: dict) -> Optional[dict]:
         profile_id = self.profiles_by_user_id.get(user_id)
         if profile_id and profile_id in self.brand_profiles:
             profile = self.brand_profiles[profile_id]
             profile.update(data)
             profile["updated_at"] = datetime.utcnow()
+            self._log("brand_profiles", profile)
             return profile
         return None
     
@@ -140,11 +693,17 @@ class Database:
     def get_brand_profile_by_id(self, profile_id: str) -> Optional[dict]:
         return self.brand_profiles.get(profile_id)
     
+    @_synchronized
     def create_campaign(self, brand_id: str, data: dict) -> dict:
-        campaign_id = str(uuid.uuid4())
+        campaign = self._insert_campaign(brand_id, data)
+        self._publish_campaign("campaign.created", campaign)
+        return campaign
+    
+    def _insert_campaign(self, brand_id: str, data: dict, index: bool = True) -> dict:
+        campaign_id = _new_id()
         now = datetime.utcnow()
         deadline = now + timedelta(days=data["duration_days"])
-        campaign = {
+        campaign = CampaignRecord.from_dict({
             "id": campaign_id,
             "brand_id": brand_id,
             "creator_id": None,
@@ -153,38 +712,271 @@ class Database:
             "created_at": now,
             "updated_at": now,
             "deadline": deadline
-        }
+        })
         self.campaigns[campaign_id] = campaign
         if brand_id not in self.campaigns_by_brand:
             self.campaigns_by_brand[brand_id] = []
         self.campaigns_by_brand[brand_id].append(campaign_id)
+        if index:
+            self._index_campaign(campaign)
+        self._log("campaigns", campaign)
         return campaign
     
     def get_campaign(self, campaign_id: str) -> Optional[dict]:
         return self.campaigns.get(campaign_id)
     
+    @_synchronized
     def update_campaign(self, campaign_id: str, data: dict) -> Optional[dict]:
         if campaign_id in self.campaigns:
             campaign = self.campaigns[campaign_id]
-            campaign.update(data)
+            # Coerced before the campaign leaves its indexes, so a bad value cannot strand it outside them
+            changes = _campaign_changes(data)
+            self._unindex_campaign(campaign)
+            campaign.update(changes)
             campaign["updated_at"] = datetime.utcnow()
+            self._index_campaign(campaign)
+            self._log("campaigns", campaign)
+            self._publish_campaign("campaign.updated", campaign)
             return campaign
         return None
     
+    @_synchronized
     def list_campaigns(self, status: Optional[str] = None, niche: Optional[str] = None,
-                      budget_min: Optional[float] = None, budget_max: Optional[float] = None) -> List[dict]:
-        results = []
-        for campaign in self.campaigns.values():
-            if status and campaign.get("status") != status:
+                      budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+                      page: Optional[Page] = None, cache: bool = True) -> List[dict]:
+        low = budget_min if budget_min else None
+        high = budget_max if budget_max else None
+        if not _cacheable(page, cache):
+            return self._list_campaigns(status, niche, low, high, page)
+        key = (niche.lower() if niche else None, status or None, low, high, page)
+        results = self.campaign_list_cache.get(key)
+        if results is None:
+            results = self._list_campaigns(status, niche, low, high, page)
+            self.campaign_list_cache.put(key, results)
+        return results
+    
+    def _list_campaigns(self, status: Optional[str], niche: Optional[str], low: Optional[float],
+                        high: Optional[float], page: Optional[Page]) -> List[dict]:
+        statuses = [status] if status else list(self.campaigns_sorted_by_status)
+        indexes = [self.campaigns_sorted_by_status[s] for s in statuses if s in self.campaigns_sorted_by_status]
+        niche_bucket = self.campaigns_by_niche.get(niche.lower(), set()) if niche else None
+        
+        if page is not None:
+            population = sum(len(sorted_indexes[page.field]) for sorted_indexes in indexes)
+            if niche_bucket is None or not self._prefer_candidates(len(niche_bucket), population, page):
+                # Merge the per-status sort orders and stop as soon as the page is full
+                if page.field == "budget":
+                    streams = [sorted_indexes["budget"].iter_entries(low, high, page.after, page.descending)
+                               for sorted_indexes in indexes]
+                else:
+                    streams = [sorted_indexes[page.field].iter_entries(after=page.after, reverse=page.descending)
+                               for sorted_indexes in indexes]
+                
+                def accept(campaign: dict) -> bool:
+                    if niche_bucket is not None and campaign["id"] not in niche_bucket:
+                        return False
+                    return self._budget_in_range(campaign, low, high)
+                
+                entries = heapq.merge(*streams, reverse=page.descending)
+                return self._take(self.campaigns, entries, page.limit, accept)
+        
+        results = self._filter_campaigns(status, niche_bucket, low, high, indexes)
+        if page is not None:
+            results = self._sort_page(results, page, CAMPAIGN_SORT_KEYS[page.field])
+        return results
+    
+    @_synchronized
+    def expire_campaigns(self, now: datetime, refund: bool = True) -> List[dict]:
+        """Expire open campaigns due by now, refunding their escrow if refund is set."""
+        expired = []
+        heap = self.campaign_deadlines
+        while heap and heap[0][0] <= now:
+            deadline, campaign_id = heapq.heappop(heap)
+            if self.scheduled_deadlines.get(campaign_id) != deadline:
                 continue
-            if niche and campaign.get("niche", "").lower() != niche.lower():
+            del self.scheduled_deadlines[campaign_id]
+            campaign = self.campaigns.get(campaign_id)
+            if campaign is None or campaign["status"] != CampaignStatus.OPEN.value or campaign["deadline"] != deadline:
                 continue
-            if budget_min and campaign.get("budget", 0) < budget_min:
+            
+            self._unindex_campaign(campaign)
+            campaign["status"] = CampaignStatus.EXPIRED.value
+            campaign["updated_at"] = now
+            self._index_campaign(campaign)
+            self._log("campaigns", campaign)
+            self._publish_campaign("campaign.expired", campaign)
+            if refund:
+                for payment_id in self.payments_by_campaign.get(campaign_id, []):
+                    payment = self.payments[payment_id]
+                    if payment["status"] == PaymentStatus.ESCROWED.value:
+                        self._apply_payment_stats(payment, campaign, -1)
+                        payment["status"] = PaymentStatus.REFUNDED.value
+                        self._log("payments", payment)
+                        self._publish_payment("payment.refunded", payment, campaign)
+            expired.append(campaign)
+        return expired
+    
+    def _budget_in_range(self, campaign: dict, low: Optional[float], high: Optional[float]) -> bool:
+        budget = campaign.get("budget", 0)
+        return not ((low is not None and budget < low) or (high is not None and budget > high))
+    
+    def _filter_campaigns(self, status: Optional[str], niche_bucket: Optional[Set[str]],
+                          low: Optional[float], high: Optional[float],
+                          indexes: List[Dict[str, SortedIndex]]) -> List[dict]:
+        ranges = [sorted_indexes["budget"] for sorted_indexes in indexes]
+        if niche_bucket is not None:
+            range_size = sum(r.count_range(low, high) for r in ranges)
+            if len(niche_bucket) < range_size:
+                results = []
+                for campaign_id in niche_bucket:
+                    campaign = self.campaigns[campaign_id]
+                    if status and campaign.get("status") != status:
+                        continue
+                    if not self._budget_in_range(campaign, low, high):
+                        continue
+                    results.append(campaign)
+                return results
+        
+        results = []
+        for budget_range in ranges:
+            for campaign_id in budget_range.irange(low, high):
+                if niche_bucket is not None and campaign_id not in niche_bucket:
+                    continue
+                results.append(self.campaigns[campaign_id])
+        return results
+    
+    def _invalidate_campaign_lists(self, campaign: dict):
+        status = campaign.get("status")
+        budget = campaign.get("budget", 0)
+        self.campaign_list_cache.invalidate(
+            campaign.get("niche", "").lower(),
+            lambda key: key[1] in (None, status) and (key[2] is None or budget >= key[2]) and
+            (key[3] is None or budget <= key[3]))
+    
+    def _index_campaign(self, campaign: dict):
+        self._invalidate_campaign_lists(campaign)
+        campaign_id = campaign["id"]
+        status = campaign.get("status")
+        self.campaigns_by_status.setdefault(status, set()).add(campaign_id)
+        self.campaigns_by_niche.setdefault(campaign.get("niche", "").lower(), set()).add(campaign_id)
+        self._add_sorted(self.campaigns_sorted_by_status, status, campaign, CAMPAIGN_SORT_KEYS)
+        self._apply_campaign_stats(campaign, 1)
+        if status == CampaignStatus.OPEN.value and self.scheduled_deadlines.get(campaign_id) != campaign["deadline"]:
+            self.scheduled_deadlines[campaign_id] = campaign["deadline"]
+            heapq.heappush(self.campaign_deadlines, (campaign["deadline"], campaign_id))
+    
+    def _unindex_campaign(self, campaign: dict):
+        self._invalidate_campaign_lists(campaign)
+        campaign_id = campaign["id"]
+        status = campaign.get("status")
+        for index, key in ((self.campaigns_by_status, status),
+                           (self.campaigns_by_niche, campaign.get("niche", "").lower())):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(campaign_id)
+                if not bucket:
+                    del index[key]
+        self._remove_sorted(self.campaigns_sorted_by_status, status, campaign, CAMPAIGN_SORT_KEYS)
+        self._apply_campaign_stats(campaign, -1)
+    
+    def _campaign_user_ids(self, campaign: dict, *creator_ids: Optional[str]) -> List[Optional[str]]:
+        """User ids of the campaign's brand and creator, and of the creator profiles in creator_ids."""
+        brand = self.brand_profiles.get(campaign["brand_id"])
+        user_ids = [brand["user_id"] if brand else None]
+        for creator_id in (campaign.get("creator_id"),) + creator_ids:
+            profile = self.creator_profiles.get(creator_id) if creator_id else None
+            user_ids.append(profile["user_id"] if profile else None)
+        return user_ids
+    
+    def _publish_campaign(self, event_type: str, campaign: dict, *creator_ids: Optional[str]):
+        self.events.publish(event_type, self._campaign_user_ids(campaign, *creator_ids), {
+            "campaign_id": campaign["id"], "status": campaign["status"], "creator_id": campaign.get("creator_id")
+        })
+    
+    def _publish_payment(self, event_type: str, payment: dict, campaign: Optional[dict]):
+        self.events.publish(event_type, self._campaign_user_ids(campaign) if campaign else (), {
+            "payment_id": payment["id"], "campaign_id": payment["campaign_id"], "status": payment["status"],
+            "amount": payment["amount"]
+        })
+    
+    def _stats_for(self, profile_id: str) -> dict:
+        stats = self.profile_stats.get(profile_id)
+        if stats is None:
+            stats = self.profile_stats[profile_id] = _empty_profile_stats()
+        return stats
+    
+    def _apply_campaign_stats(self, campaign: dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) a campaign and its payments from the profile totals."""
+        status = campaign.get("status")
+        for profile_id in (campaign["brand_id"], campaign.get("creator_id")):
+            if not profile_id:
                 continue
-            if budget_max and campaign.get("budget", 0) > budget_max:
+            stats = self._stats_for(profile_id)
+            stats["campaigns"] += sign
+            if status in ACTIVE_CAMPAIGN_STATUSES:
+                stats["active_campaigns"] += sign
+            elif status == CampaignStatus.COMPLETED.value:
+                stats["completed_campaigns"] += sign
+        
+        for payment_id in self.payments_by_campaign.get(campaign["id"], []):
+            self._apply_payment_stats(self.payments[payment_id], campaign, sign)
+    
+    def _apply_payment_stats(self, payment: dict, campaign: dict, sign: int):
+        if payment["status"] == PaymentStatus.RELEASED.value:
+            key = "released"
+        elif payment["status"] == PaymentStatus.ESCROWED.value:
+            key = "escrowed"
+        else:
+            return
+        for profile_id in (campaign["brand_id"], campaign.get("creator_id")):
+            if profile_id:
+                self._stats_for(profile_id)[key] += sign * payment["amount"]
+    
+    def get_profile_stats(self, profile_id: str) -> dict:
+        return self.profile_stats.get(profile_id) or _empty_profile_stats()
+    
+    def _compute_profile_stats(self) -> Dict[str, dict]:
+        computed: Dict[str, dict] = {}
+        for campaign in self.campaigns.values():
+            for profile_id in (campaign["brand_id"], campaign.get("creator_id")):
+                if not profile_id:
+                    continue
+                stats = computed.setdefault(profile_id, _empty_profile_stats())
+                stats["campaigns"] += 1
+                if campaign.get("status") in ACTIVE_CAMPAIGN_STATUSES:
+                    stats["active_campaigns"] += 1
+                elif campaign.get("status") == CampaignStatus.COMPLETED.value:
+                    stats["completed_campaigns"] += 1
+        for payment in self.payments.values():
+            campaign = self.campaigns.get(payment["campaign_id"])
+            if not campaign:
                 continue
-            results.append(campaign)
-        return results
+            if payment["status"] == PaymentStatus.RELEASED.value:
+                key = "released"
+            elif payment["status"] == PaymentStatus.ESCROWED.value:
+                key = "escrowed"
+            else:
+                continue
+            for profile_id in (campaign["brand_id"], campaign.get("creator_id")):
+                if profile_id:
+                    computed.setdefault(profile_id, _empty_profile_stats())[key] += payment["amount"]
+        return computed
+    
+    @_synchronized
+    def verify_profile_stats(self) -> List[str]:
+        """Return the ids of profiles whose running totals disagree with a full recount."""
+        computed = self._compute_profile_stats()
+        mismatched = []
+        for profile_id in set(computed) | set(self.profile_stats):
+            expected = computed.get(profile_id, _empty_profile_stats())
+            actual = self.profile_stats.get(profile_id, _empty_profile_stats())
+            if any(not math.isclose(actual[key], value, abs_tol=1e-6) for key, value in expected.items()):
+                mismatched.append(profile_id)
+        return mismatched
+    
+    @_synchronized
+    def rebuild_profile_stats(self):
+        self.profile_stats = self._compute_profile_stats()
     
     def get_campaigns_by_brand(self, brand_id: str) -> List[dict]:
         campaign_ids = self.campaigns_by_brand.get(brand_id, [])
@@ -194,23 +986,52 @@ class Database:
         campaign_ids = self.campaigns_by_creator.get(creator_id, [])
         return [self.campaigns[cid] for cid in campaign_ids if cid in self.campaigns]
     
+    @_synchronized
     def assign_campaign(self, campaign_id: str, creator_id: str) -> Optional[dict]:
-        if campaign_id in self.campaigns:
+        """Assign or reassign a campaign; None unless it is open or already assigned."""
+        if campaign_id in self.campaigns and self.campaigns[campaign_id]["status"] in ASSIGNABLE_CAMPAIGN_STATUSES:
             campaign = self.campaigns[campaign_id]
+            self._unindex_campaign(campaign)
+            previous_creator_id = campaign.get("creator_id")
             campaign["creator_id"] = creator_id
             campaign["status"] = CampaignStatus.ASSIGNED.value
             campaign["updated_at"] = datetime.utcnow()
+            self._index_campaign(campaign)
             
-            if creator_id not in self.campaigns_by_creator:
-                self.campaigns_by_creator[creator_id] = []
-            self.campaigns_by_creator[creator_id].append(campaign_id)
+            if previous_creator_id != creator_id:
+                if previous_creator_id in self.campaigns_by_creator:
+                    self.campaigns_by_creator[previous_creator_id].remove(campaign_id)
+                if creator_id not in self.campaigns_by_creator:
+                    self.campaigns_by_creator[creator_id] = []
+                self.campaigns_by_creator[creator_id].append(campaign_id)
+                
+                for payment_id in self.payments_by_campaign.get(campaign_id, []):
+                    payment = self.payments[payment_id]
+                    if previous_creator_id in self.payments_by_creator:
+                        self.payments_by_creator[previous_creator_id].remove(payment_id)
+                        self._remove_sorted(self.payments_sorted_by_profile, previous_creator_id, payment,
+                                            PAYMENT_SORT_KEYS)
+                    if creator_id not in self.payments_by_creator:
+                        self.payments_by_creator[creator_id] = []
+                    self.payments_by_creator[creator_id].append(payment_id)
+                    self._add_sorted(self.payments_sorted_by_profile, creator_id, payment, PAYMENT_SORT_KEYS)
+            self._log("campaigns", campaign)
+            # A creator the campaign was taken from hears about it too
+            self._publish_campaign("campaign.assigned", campaign, previous_creator_id)
             return campaign
         return None
     
-    def create_submission(self, campaign_id: str, data: dict) -> dict:
-        submission_id = str(uuid.uuid4())
+    @_synchronized
+    def create_submission(self, campaign_id: str, creator_id: str, data: dict) -> Optional[dict]:
+        """Store a submission; None unless creator_id is assigned and the campaign is not approved."""
+        campaign = self.campaigns.get(campaign_id)
+        if (campaign is None or campaign.get("creator_id") != creator_id or
+                campaign["status"] not in DELIVERABLE_CAMPAIGN_STATUSES):
+            return None
+        
+        submission_id = _new_id()
         now = datetime.utcnow()
-        submission = {
+        submission = SubmissionRecord.from_dict({
             "id": submission_id,
             "campaign_id": campaign_id,
             **data,
@@ -219,25 +1040,38 @@ class Database:
             "likes": 0,
             "comments": 0,
             "engagement_rate": 0.0
-        }
+        })
         self.submissions[submission_id] = submission
         
-        if campaign_id in self.campaigns:
-            self.campaigns[campaign_id]["status"] = CampaignStatus.SUBMITTED.value
-            self.campaigns[campaign_id]["updated_at"] = now
+        if campaign_id not in self.submissions_by_campaign:
+            self.submissions_by_campaign[campaign_id] = []
+        self.submissions_by_campaign[campaign_id].append(submission_id)
+        
+        self._unindex_campaign(campaign)
+        campaign["status"] = CampaignStatus.SUBMITTED.value
+        campaign["updated_at"] = now
+        self._index_campaign(campaign)
+        self._log("campaigns", campaign)
         
+        self._log("submissions", submission)
+        self._publish_campaign("campaign.submitted", campaign)
         return submission
     
     def get_submission_by_campaign(self, campaign_id: str) -> Optional[dict]:
-        for submission in self.submissions.values():
-            if submission["campaign_id"] == campaign_id:
-                return submission
+        submission_ids = self.submissions_by_campaign.get(campaign_id)
+        if submission_ids:
+            return self.submissions.get(submission_ids[0])
         return None
     
+    def get_submissions_by_campaign(self, campaign_id: str) -> List[dict]:
+        submission_ids = self.submissions_by_campaign.get(campaign_id, [])
+        return [self.submissions[sid] for sid in submission_ids if sid in self.submissions]
+    
+    @_synchronized
     def create_payment(self, campaign_id: str, amount: float) -> dict:
-        payment_id = str(uuid.uuid4())
+        payment_id = _new_id()
         now = datetime.utcnow()
-        payment = {
+        payment = PaymentRecord.from_dict({
             "id": payment_id,
             "campaign_id": campaign_id,
             "amount": amount,
@@ -245,46 +1079,118 @@ class Database:
             "payment_reference": f"PAY-{payment_id[:8]}",
             "created_at": now,
             "released_at": None
-        }
+        })
         self.payments[payment_id] = payment
+        if campaign_id not in self.payments_by_campaign:
+            self.payments_by_campaign[campaign_id] = []
+        self.payments_by_campaign[campaign_id].append(payment_id)
+        
+        campaign = self.campaigns.get(campaign_id)
+        if campaign:
+            brand_id = campaign["brand_id"]
+            if brand_id not in self.payments_by_brand:
+                self.payments_by_brand[brand_id] = []
+            self.payments_by_brand[brand_id].append(payment_id)
+            self._add_sorted(self.payments_sorted_by_profile, brand_id, payment, PAYMENT_SORT_KEYS)
+            
+            creator_id = campaign.get("creator_id")
+            if creator_id:
+                if creator_id not in self.payments_by_creator:
+                    self.payments_by_creator[creator_id] = []
+                self.payments_by_creator[creator_id].append(payment_id)
+                self._add_sorted(self.payments_sorted_by_profile, creator_id, payment, PAYMENT_SORT_KEYS)
+            
+            self._apply_payment_stats(payment, campaign, 1)
+        self._log("payments", payment)
+        self._publish_payment("payment.escrowed", payment, campaign)
         return payment
     
+    @_synchronized
     def release_payment(self, payment_id: str) -> Optional[dict]:
-        if payment_id in self.payments:
+        """Release an escrowed payment; None if there is no such payment in escrow."""
+        payment = self.payments.get(payment_id)
+        if payment is None or payment["status"] != PaymentStatus.ESCROWED.value:
+            return None
+        self._release_payment(payment, self.campaigns.get(payment["campaign_id"]))
+        return payment
+    
+    def _release_payment(self, payment: dict, campaign: Optional[dict]):
+        if campaign:
+            self._apply_payment_stats(payment, campaign, -1)
+        payment["status"] = PaymentStatus.RELEASED.value
+        payment["released_at"] = datetime.utcnow()
+        if campaign:
+            self._apply_payment_stats(payment, campaign, 1)
+        self._log("payments", payment)
+        self._publish_payment("payment.released", payment, campaign)
+    
+    @_synchronized
+    def approve_campaign(self, campaign_id: str) -> Optional[Tuple[dict, Optional[dict]]]:
+        """Complete a submitted campaign and release its escrow; None if it is not awaiting approval."""
+        campaign = self.campaigns.get(campaign_id)
+        if campaign is None or campaign["status"] not in APPROVABLE_CAMPAIGN_STATUSES:
+            return None
+        
+        self._unindex_campaign(campaign)
+        campaign["status"] = CampaignStatus.COMPLETED.value
+        campaign["updated_at"] = datetime.utcnow()
+        self._index_campaign(campaign)
+        self._log("campaigns", campaign)
+        self._publish_campaign("campaign.completed", campaign)
+        
+        for payment_id in self.payments_by_campaign.get(campaign_id, []):
             payment = self.payments[payment_id]
-            payment["status"] = PaymentStatus.RELEASED.value
-            payment["released_at"] = datetime.utcnow()
-            return payment
-        return None
+            if payment["status"] == PaymentStatus.ESCROWED.value:
+                self._release_payment(payment, campaign)
+        
+        profile = self.creator_profiles.get(campaign.get("creator_id"))
+        if profile:
+            self._increment_creator_campaigns(profile)
+        return campaign, self.get_payment_by_campaign(campaign_id)
+    
+    def get_payment(self, payment_id: str) -> Optional[dict]:
+        return self.payments.get(payment_id)
     
     def get_payment_by_campaign(self, campaign_id: str) -> Optional[dict]:
-        for payment in self.payments.values():
-            if payment["campaign_id"] == campaign_id:
-                return payment
+        payment_ids = self.payments_by_campaign.get(campaign_id)
+        if payment_ids:
+            return self.payments.get(payment_ids[0])
         return None
     
-    def get_payments_by_user(self, user_id: str, user_type: UserType) -> List[dict]:
-        results = []
-        for payment in self.payments.values():
-            campaign = self.campaigns.get(payment["campaign_id"])
-            if not campaign:
-                continue
-            
-            if user_type == UserType.BRAND:
-                brand_profile = self.get_brand_profile_by_user_id(user_id)
-                if brand_profile and campaign["brand_id"] == brand_profile["id"]:
-                    results.append(payment)
-            elif user_type == UserType.CREATOR:
-                creator_profile = self.get_creator_profile_by_user_id(user_id)
-                if creator_profile and campaign.get("creator_id") == creator_profile["id"]:
-                    results.append(payment)
+    def get_payments_by_campaign(self, campaign_id: str) -> List[dict]:
+        payment_ids = self.payments_by_campaign.get(campaign_id, [])
+        return [self.payments[pid] for pid in payment_ids if pid in self.payments]
+    
+    @_synchronized
+    def get_payments_by_user(self, user_id: str, user_type: UserType, page: Optional[Page] = None) -> List[dict]:
+        profile_id = self.profiles_by_user_id.get(user_id)
+        if not profile_id:
+            return []
         
-        return results
+        if user_type == UserType.BRAND:
+            if profile_id not in self.brand_profiles:
+                return []
+            payment_ids = self.payments_by_brand.get(profile_id, [])
+        elif user_type == UserType.CREATOR:
+            if profile_id not in self.creator_profiles:
+                return []
+            payment_ids = self.payments_by_creator.get(profile_id, [])
+        else:
+            return []
+        
+        if page is not None:
+            indexes = self.payments_sorted_by_profile.get(profile_id)
+            if indexes is None:
+                return []
+            entries = indexes[page.field].iter_entries(after=page.after, reverse=page.descending)
+            return self._take(self.payments, entries, page.limit)
+        return [self.payments[pid] for pid in payment_ids if pid in self.payments]
     
+    @_synchronized
     def create_review(self, campaign_id: str, creator_id: str, brand_id: str, rating: int, comment: str) -> dict:
-        review_id = str(uuid.uuid4())
+        review_id = _new_id()
         now = datetime.utcnow()
-        review = {
+        review = ReviewRecord.from_dict({
             "id": review_id,
             "campaign_id": campaign_id,
             "creator_id": creator_id,
@@ -292,33 +1198,190 @@ class Database:
             "rating": rating,
             "comment": comment,
             "created_at": now
-        }
+        })
         self.reviews[review_id] = review
         
         if creator_id not in self.reviews_by_creator:
             self.reviews_by_creator[creator_id] = []
         self.reviews_by_creator[creator_id].append(review_id)
+        self._add_sorted(self.reviews_sorted_by_creator, creator_id, review, REVIEW_SORT_KEYS)
         
-        self._update_creator_rating(creator_id)
+        self._log("reviews", review)
+        self._add_rating(creator_id, rating)
+        campaign = self.campaigns.get(campaign_id)
+        self.events.publish("review.created", self._campaign_user_ids(campaign) if campaign else (), {
+            "review_id": review_id, "campaign_id": campaign_id, "creator_id": creator_id, "rating": rating
+        })
         
         return review
     
-    def _update_creator_rating(self, creator_id: str):
-        review_ids = self.reviews_by_creator.get(creator_id, [])
-        if not review_ids:
-            return
-        
-        total_rating = sum(self.reviews[rid]["rating"] for rid in review_ids if rid in self.reviews)
-        avg_rating = total_rating / len(review_ids)
+    def _add_rating(self, creator_id: str, rating: int):
+        stats = self.rating_stats.get(creator_id)
+        if stats is None:
+            stats = self.rating_stats[creator_id] = empty_rating_stats()
+        stats["count"] += 1
+        stats["sum"] += rating
+        stats["histogram"][rating] = stats["histogram"].get(rating, 0) + 1
         
         profile = self.get_creator_profile_by_id(creator_id)
         if profile:
-            profile["rating"] = round(avg_rating, 2)
-            profile["updated_at"] = datetime.utcnow()
+            self._set_creator_rating(profile, average_rating(stats))
+    
+    def _set_creator_rating(self, profile: dict, rating: float):
+        creator_id = profile["id"]
+        ratings = [self.creators_sorted["rating"]]
+        ratings += [self.applicants_sorted_by_campaign[campaign_id]["rating"]
+                    for campaign_id in self._applied_campaigns(creator_id)]
+        for index in ratings:
+            index.remove(profile["rating"], creator_id)
+        self._invalidate_creator_searches(profile)
+        profile["rating"] = rating
+        profile["updated_at"] = datetime.utcnow()
+        for index in ratings:
+            index.add(profile["rating"], creator_id)
+        self.creator_columns.put(profile)
+        self._log("creator_profiles", profile)
     
-    def get_reviews_by_creator(self, creator_id: str) -> List[dict]:
+    def get_rating_summary(self, creator_id: str) -> dict:
+        return rating_summary(self.rating_stats.get(creator_id) or empty_rating_stats())
+    
+    def _compute_rating_stats(self) -> Dict[str, dict]:
+        computed: Dict[str, dict] = {}
+        for review in self.reviews.values():
+            stats = computed.setdefault(review["creator_id"], empty_rating_stats())
+            stats["count"] += 1
+            stats["sum"] += review["rating"]
+            stats["histogram"][review["rating"]] = stats["histogram"].get(review["rating"], 0) + 1
+        return computed
+    
+    @_synchronized
+    def recompute_creator_ratings(self, fix: bool = False) -> List[str]:
+        """
+        Recount every creator's ratings from the reviews and return the ids whose
+        running totals or profile rating disagree. With fix, correct them.
+        """
+        computed = self._compute_rating_stats()
+        mismatched = []
+        for creator_id in set(computed) | set(self.rating_stats):
+            expected = computed.get(creator_id, empty_rating_stats())
+            profile = self.creator_profiles.get(creator_id)
+            stale_rating = (profile is not None and expected["count"] > 0 and
+                            profile["rating"] != average_rating(expected))
+            if self.rating_stats.get(creator_id, empty_rating_stats()) == expected and not stale_rating:
+                continue
+            mismatched.append(creator_id)
+            if fix:
+                if expected["count"]:
+                    self.rating_stats[creator_id] = expected
+                else:
+                    self.rating_stats.pop(creator_id, None)
+                if stale_rating:
+                    self._set_creator_rating(profile, average_rating(expected))
+        return mismatched
+    
+    @_synchronized
+    def get_reviews_by_creator(self, creator_id: str, page: Optional[Page] = None) -> List[dict]:
+        if page is not None:
+            indexes = self.reviews_sorted_by_creator.get(creator_id)
+            if indexes is None:
+                return []
+            entries = indexes[page.field].iter_entries(after=page.after, reverse=page.descending)
+            return self._take(self.reviews, entries, page.limit)
         review_ids = self.reviews_by_creator.get(creator_id, [])
         return [self.reviews[rid] for rid in review_ids if rid in self.reviews]
+    
+    @_synchronized
+    def create_application(self, campaign_id: str, creator_id: str) -> Optional[dict]:
+        """Record a creator's application; None if they already applied to the campaign."""
+        if creator_id in self.applications_by_campaign.get(campaign_id, {}):
+            return None
+        application = ApplicationRecord.from_dict({
+            "id": _new_id(),
+            "campaign_id": campaign_id,
+            "creator_id": creator_id,
+            "created_at": datetime.utcnow()
+        })
+        self.applications[application["id"]] = application
+        self._index_application(application)
+        self._log("applications", application)
+        campaign = self.campaigns.get(campaign_id)
+        if campaign:
+            self.events.publish("application.created", self._campaign_user_ids(campaign, creator_id), {
+                "application_id": application["id"], "campaign_id": campaign_id, "creator_id": creator_id
+            })
+        return application
+    
+    def _index_application(self, application: dict):
+        campaign_id, creator_id = application["campaign_id"], application["creator_id"]
+        self.applications_by_campaign.setdefault(campaign_id, {})[creator_id] = application["id"]
+        self.applications_by_creator.setdefault(creator_id, []).append(application["id"])
+        profile = self.creator_profiles.get(creator_id)
+        if profile:
+            self._add_sorted(self.applicants_sorted_by_campaign, campaign_id, profile, APPLICANT_SORT_KEYS)
+    
+    def _applied_campaigns(self, creator_id: str) -> List[str]:
+        return [self.applications[aid]["campaign_id"] for aid in self.applications_by_creator.get(creator_id, [])]
+    
+    @_synchronized
+    def get_applicants(self, campaign_id: str, page: Optional[Page] = None) -> List[dict]:
+        """Creator profiles that applied to a campaign, in application order unless paginated."""
+        if page is not None:
+            indexes = self.applicants_sorted_by_campaign.get(campaign_id)
+            if indexes is None:
+                return []
+            entries = indexes[page.field].iter_entries(after=page.after, reverse=page.descending)
+            return self._take(self.creator_profiles, entries, page.limit)
+        creator_ids = self.applications_by_campaign.get(campaign_id, {})
+        return [self.creator_profiles[cid] for cid in creator_ids if cid in self.creator_profiles]
+    
+    def get_applications_by_creator(self, creator_id: str) -> List[dict]:
+        application_ids = self.applications_by_creator.get(creator_id, [])
+        return [self.applications[aid] for aid in application_ids]
+    
+    def _prefer_rebuild(self, count: int) -> bool:
+        """
+        Whether inserting count rows should skip per-row index maintenance and
+        rebuild every index once afterwards, which is cheaper once the batch is
+        a sizeable share of all rows.
+        """
+        return count * BULK_REBUILD_FRACTION >= sum(len(getattr(self, table)) for table in self.TABLES)
+    
+    @_synchronized
+    def import_creators(self, rows: List[dict]) -> List[Optional[str]]:
+        """
+        Insert creator profiles, each with a new creator account for row["email"]
+        that has no password. Returns the new profile id per row, or None where
+        the email is already registered.
+        """
+        rebuild = self._prefer_rebuild(2 * len(rows))
+        profile_ids = []
+        for row in rows:
+            data = dict(row)
+            email = data.pop("email")
+            if email in self.users_by_email:
+                profile_ids.append(None)
+                continue
+            user = self._insert_user(email, "", UserType.CREATOR)
+            profile_ids.append(self._insert_creator_profile(user["id"], data, index=not rebuild)["id"])
+        if rebuild:
+            self.rebuild_indexes()
+        return profile_ids
+    
+    @_synchronized
+    def import_campaigns(self, rows: List[dict]) -> List[Optional[str]]:
+        """Insert open campaigns; returns the new id per row, or None where row["brand_id"] is unknown."""
+        rebuild = self._prefer_rebuild(len(rows))
+        campaign_ids = []
+        for row in rows:
+            data = dict(row)
+            brand_id = data.pop("brand_id")
+            if brand_id not in self.brand_profiles:
+                campaign_ids.append(None)
+                continue
+            campaign_ids.append(self._insert_campaign(brand_id, data, index=not rebuild)["id"])
+        if rebuild:
+            self.rebuild_indexes()
+        return campaign_ids
 
 
 db = Database()
@@ -0,0 +1,207 @@
+"""
+In-process event bus behind the GET /api/events Server-Sent Events stream
+
+The in-memory Database publishes an Event from every method that moves a
+campaign or payment along (application, assignment, submission, approval,
+expiry, payment escrow, release and refund), addressed to the user ids of
+the campaign's brand and creator. Each open stream holds a Subscription for
+its user: a bounded queue of encoded frames that the stream drains in
+batches. Publishing never waits for a client. When a slow client lets its
+queue fill, the queue is dropped and the stream sends a single resync event
+instead, telling the client to refetch what it shows; memory per client is
+therefore bounded by EVENTS_QUEUE_SIZE frames.
+
+Events get ids "<epoch>:<seq>", and the last EVENTS_REPLAY_SIZE events are
+kept, so a client reconnecting with Last-Event-ID receives what it missed,
+or resync when that is no longer known. Delivery and all subscription state
+live on the event loop thread; a publish from another thread is handed over
+with call_soon_threadsafe. One heartbeat task per bus writes a comment to
+every stream every EVENTS_HEARTBEAT_SECONDS, so idle connections survive
+proxies without a timer per connection; it wakes HEARTBEAT_BATCH streams at
+a time so a tick over tens of thousands of streams does not stall requests.
+"""
+import asyncio
+import itertools
+import json
+import os
+import secrets
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "64"))
+EVENTS_REPLAY_SIZE = int(os.environ.get("EVENTS_REPLAY_SIZE", "4096"))
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get("EVENTS_MAX_SUBSCRIBERS", "100000"))
+
+# Sent first on every stream: how long the browser waits before reconnecting
+RETRY_FRAME = b"retry: 5000\n\n"
+HEARTBEAT_FRAME = b": ping\n\n"
+# The client missed events and should reload its state
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+# Streams woken per loop iteration by the heartbeat, so requests are served between batches
+HEARTBEAT_BATCH = 1000
+
+
+class TooManySubscribers(Exception):
+    """The bus already holds max_subscribers subscriptions."""
+
+
+class Event:
+    __slots__ = ("id", "seq", "type", "user_ids", "data", "_frame")
+
+    def __init__(self, event_id: str, seq: int, event_type: str, user_ids: Set[str], data: dict):
+        self.id = event_id
+        self.seq = seq
+        self.type = event_type
+        self.user_ids = user_ids
+        self.data = data
+        self._frame: Optional[bytes] = None
+
+    @property
+    def frame(self) -> bytes:
+        """The event in SSE wire format, encoded once however many streams send it."""
+        if self._frame is None:
+            self._frame = (f"id: {self.id}\nevent: {self.type}\n"
+                           f"data: {json.dumps(self.data, default=str)}\n\n").encode()
+        return self._frame
+
+
+class Subscription:
+    __slots__ = ("user_id", "frames", "max_frames", "missed", "_ready")
+
+    def __init__(self, user_id: str, max_frames: int):
+        self.user_id = user_id
+        self.frames: Deque[bytes] = deque()
+        self.max_frames = max_frames
+        self.missed = False
+        self._ready = asyncio.Event()
+
+    def push(self, frame: bytes) -> bool:
+        """Queue frame; False if it was dropped because the queue is full or a resync is already due."""
+        if self.missed:
+            return False
+        if len(self.frames) >= self.max_frames:
+            self.resync()
+            return False
+        self.frames.append(frame)
+        self._ready.set()
+        return True
+
+    def resync(self):
+        """Drop what is queued and send a resync event instead."""
+        self.frames.clear()
+        self.missed = True
+        self._ready.set()
+
+    async def next_chunk(self) -> bytes:
+        """Wait for frames and return everything queued as one chunk."""
+        await self._ready.wait()
+        self._ready.clear()
+        chunk = b"".join(self.frames)
+        self.frames.clear()
+        if self.missed:
+            self.missed = False
+            chunk = RESYNC_FRAME
+        return chunk
+
+
+class EventBus:
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, replay_size: int = EVENTS_REPLAY_SIZE,
+                 heartbeat: float = EVENTS_HEARTBEAT_SECONDS, max_subscribers: int = EVENTS_MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        # Distinguishes this process's event ids from those of an earlier run
+        self.epoch = secrets.token_hex(4)
+        self.published = 0
+        self.delivered = 0
+        # Frames not queued because the stream was too far behind
+        self.dropped = 0
+        self._seq = itertools.count(1)
+        self._recent: Deque[Event] = deque(maxlen=replay_size)
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._subscriber_count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscriber_count
+
+    def publish(self, event_type: str, user_ids: Iterable[Optional[str]], data: dict):
+        """Record an event for the given users (None entries are ignored) and deliver it to their streams."""
+        seq = next(self._seq)
+        event = Event(f"{self.epoch}:{seq}", seq, event_type, {user_id for user_id in user_ids if user_id}, data)
+        self._recent.append(event)
+        self.published += 1
+        if not self._subscriber_count or not event.user_ids:
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._deliver(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Event):
+        for user_id in event.user_ids:
+            for subscription in self._subscriptions.get(user_id, ()):
+                if subscription.push(event.frame):
+                    self.delivered += 1
+                else:
+                    self.dropped += 1
+
+    def subscribe(self, user_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Open a subscription on the running loop, queueing what user_id missed
+        after last_event_id; raises TooManySubscribers when the bus is full.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+            self._heartbeat_task = None
+        if self._subscriber_count >= self.max_subscribers:
+            raise TooManySubscribers()
+        subscription = Subscription(user_id, self.queue_size)
+        if last_event_id:
+            self._replay(subscription, last_event_id)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        self._subscriber_count += 1
+        if self._heartbeat_task is None and self.heartbeat > 0:
+            self._heartbeat_task = loop.create_task(self._send_heartbeats())
+        return subscription
+
+    def _replay(self, subscription: Subscription, last_event_id: str):
+        epoch, _, seq = last_event_id.partition(":")
+        recent = list(self._recent)
+        if epoch != self.epoch or not seq.isdigit() or (recent and int(seq) < recent[0].seq - 1):
+            # From an earlier process, or older than every event still kept
+            subscription.resync()
+            return
+        for event in recent:
+            if event.seq > int(seq) and subscription.user_id in event.user_ids:
+                subscription.push(event.frame)
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+        self._subscriber_count -= 1
+
+    async def _send_heartbeats(self):
+        try:
+            while self._subscriber_count:
+                await asyncio.sleep(self.heartbeat)
+                streams = [s for subscriptions in self._subscriptions.values() for s in subscriptions]
+                for start in range(0, len(streams), HEARTBEAT_BATCH):
+                    for subscription in streams[start:start + HEARTBEAT_BATCH]:
+                        subscription.push(HEARTBEAT_FRAME)
+                    await asyncio.sleep(0)
+        finally:
+            if self._heartbeat_task is asyncio.current_task():
+                self._heartbeat_task = None
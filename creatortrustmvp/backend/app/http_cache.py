@@ -0,0 +1,70 @@
+"""
+ETags and Cache-Control for the read-heavy GET endpoints
+
+A response's ETag is a digest of the (id, version) pairs of the records it
+is built from, in order. Records of the in-memory Database carry a version
+that every write increments (see app.records), so the tag is computed
+without encoding the body, and a matching If-None-Match is answered with 304
+before anything is serialized. Versions restart with the process, so tags
+also include EPOCH, a random token per process; after a restart clients
+download once more rather than risk a stale match. Rows that are not Records
+(the PostgreSQL backend) are tagged with a digest of their contents.
+"""
+import hashlib
+import json
+import secrets
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+from app.records import Record
+
+EPOCH = secrets.token_hex(4)
+
+# Cache-Control per endpoint. Profiles change rarely; a campaign's status
+# moves on through its lifecycle, so shared caches keep it only briefly.
+PROFILE_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+CAMPAIGN_CACHE_CONTROL = "public, max-age=5, stale-while-revalidate=30"
+REVIEWS_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=300"
+
+
+def _version_key(row: Optional[dict]) -> str:
+    if row is None:
+        return "-"
+    if isinstance(row, Record):
+        return f"{row['id']}:{row._version}"
+    return json.dumps(row, sort_keys=True, default=str)
+
+
+def etag_for(*rows: Optional[dict]) -> str:
+    """Strong ETag of a response built from rows; None stands for an absent row."""
+    digest = hashlib.blake2b(digest_size=12)
+    for row in rows:
+        digest.update(_version_key(row).encode())
+        digest.update(b"\0")
+    return f'"{EPOCH}-{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison, which is weak: a W/ prefix on the client's tags is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str, cache_control: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    A 304 response if the request already holds etag; otherwise None, after
+    putting the cache headers on response, the handler's own response.
+    """
+    headers = cache_headers(etag, cache_control)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
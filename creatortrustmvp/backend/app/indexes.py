@@ -0,0 +1,222 @@
+"""
+Secondary index structures used by the in-memory database
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import heapq
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# Query tokens shorter than this only match whole terms
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 64
+PREFIX_MATCH_WEIGHT = 0.5
+# Common English words are neither indexed nor searched
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has i in is it its my of on or our the to we with you your".split()
+)
+
+
+class SortedIndex:
+    """Keeps (key, id) pairs in sorted order so range filters become a bisect."""
+
+    def __init__(self):
+        self._entries: List[Tuple[Any, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Any, item_id: str):
+        insort(self._entries, (key, item_id))
+
+    def append(self, key: Any, item_id: str):
+        """Add without keeping the order; call sort() before the index is next used."""
+        self._entries.append((key, item_id))
+
+    def sort(self):
+        self._entries.sort()
+
+    def remove(self, key: Any, item_id: str):
+        entry = (key, item_id)
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def _bounds(self, minimum: Optional[Any], maximum: Optional[Any]) -> Tuple[int, int]:
+        lo = 0 if minimum is None else bisect_left(self._entries, (minimum,))
+        # (maximum, chr(0x10FFFF)) sorts after every (maximum, id) pair
+        hi = len(self._entries) if maximum is None else bisect_right(self._entries, (maximum, chr(0x10FFFF)))
+        return lo, max(lo, hi)
+
+    def count_range(self, minimum: Optional[Any] = None, maximum: Optional[Any] = None) -> int:
+        lo, hi = self._bounds(minimum, maximum)
+        return hi - lo
+
+    def irange(self, minimum: Optional[Any] = None, maximum: Optional[Any] = None) -> Iterator[str]:
+        """Yield ids whose key lies in [minimum, maximum], in key order."""
+        lo, hi = self._bounds(minimum, maximum)
+        for i in range(lo, hi):
+            yield self._entries[i][1]
+
+    def iter_entries(self, minimum: Optional[Any] = None, maximum: Optional[Any] = None,
+                     after: Optional[Tuple[Any, str]] = None, reverse: bool = False) -> Iterator[Tuple[Any, str]]:
+        """
+        Yield (key, id) pairs with key in [minimum, maximum] that sort strictly
+        after the pair `after` in the direction of iteration. Positioning is a
+        bisect, so resuming from a cursor does not walk the earlier entries.
+        """
+        lo, hi = self._bounds(minimum, maximum)
+        entries = self._entries
+        if reverse:
+            if after is not None:
+                hi = max(lo, min(hi, bisect_left(entries, after)))
+            for i in range(hi - 1, lo - 1, -1):
+                yield entries[i]
+        else:
+            if after is not None:
+                lo = min(hi, max(lo, bisect_right(entries, after)))
+            for i in range(lo, hi):
+                yield entries[i]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased runs of letters and digits; "@ada_fit" gives ["ada", "fit"]."""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """
+    Term -> {doc id: weighted term frequency} postings with BM25 scoring.
+
+    Documents are sets of (text, weight) fields; a term's frequency counts
+    each occurrence with the weight of its field. Query tokens also match
+    longer terms they are a prefix of, at a reduced weight. Removing a
+    document needs the same fields it was added with.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+        # Sorted vocabulary for prefix lookups: a large sorted list plus a small
+        # one for new terms, merged once the small one reaches 1/8 of the large
+        # one. Terms whose postings emptied stay listed until the next merge.
+        self._terms: List[str] = []
+        self._new_terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _term_counts(self, fields: Iterable[Tuple[Optional[str], int]]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + weight
+        return counts
+
+    def add(self, doc_id: str, fields: Iterable[Tuple[Optional[str], int]]):
+        counts = self._term_counts(fields)
+        if not counts:
+            return
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self._new_terms, term)
+            postings[doc_id] = tf
+        length = sum(counts.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        if len(self._new_terms) > max(1024, len(self._terms) // 8):
+            self._merge_terms()
+
+    def remove(self, doc_id: str, fields: Iterable[Tuple[Optional[str], int]]):
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self._term_counts(fields):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def _merge_terms(self):
+        # Both lists are sorted runs, so this sort is a linear merge
+        terms = sorted(self._terms + self._new_terms)
+        self._terms = [term for term in dict.fromkeys(terms) if term in self.postings]
+        self._new_terms = []
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """Indexed terms matching a query token, with the weight of each match."""
+        matches: Dict[str, float] = {}
+        if token in self.postings:
+            matches[token] = 1.0
+        if len(token) < MIN_PREFIX_LENGTH:
+            return matches
+        completions = set()
+        for terms in (self._terms, self._new_terms):
+            i = bisect_left(terms, token)
+            while i < len(terms) and terms[i].startswith(token):
+                if terms[i] != token and terms[i] in self.postings:
+                    completions.add(terms[i])
+                i += 1
+        if len(completions) > MAX_PREFIX_EXPANSIONS:
+            completions = heapq.nlargest(MAX_PREFIX_EXPANSIONS, completions, key=lambda t: len(self.postings[t]))
+        for term in completions:
+            matches[term] = PREFIX_MATCH_WEIGHT
+        return matches
+
+    def search(self, query: str, within: Optional[Set[str]] = None) -> Dict[str, float]:
+        """
+        BM25 scores of the documents matching every query token (exactly or
+        by prefix), optionally restricted to the ids in `within`. A token's
+        contribution is its best-scoring matching term.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.doc_lengths:
+            return {}
+        n = len(self.doc_lengths)
+        lengths = self.doc_lengths
+        # BM25 term weight is idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average))
+        base = self.k1 * (1 - self.b)
+        per_length = self.k1 * self.b * n / self.total_length
+        expanded = [self._expand(token) for token in tokens]
+        # Most selective token first, so later tokens only score surviving documents
+        expanded.sort(key=lambda matches: sum(len(self.postings[t]) for t in matches))
+
+        scores = None
+        for matches in expanded:
+            allowed = scores if scores is not None else within
+            token_scores: Dict[str, float] = {}
+            for term, weight in matches.items():
+                postings = self.postings[term]
+                df = len(postings)
+                factor = weight * math.log(1 + (n - df + 0.5) / (df + 0.5)) * (self.k1 + 1)
+                if allowed is None:
+                    items = postings.items()
+                elif len(allowed) < df:
+                    items = [(doc_id, postings[doc_id]) for doc_id in allowed if doc_id in postings]
+                else:
+                    items = [(doc_id, tf) for doc_id, tf in postings.items() if doc_id in allowed]
+                term_scores = {doc_id: factor * tf / (tf + base + per_length * lengths[doc_id])
+                               for doc_id, tf in items}
+                if not token_scores:
+                    token_scores = term_scores
+                    continue
+                for doc_id, score in term_scores.items():
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: scores[doc_id] + score for doc_id, score in token_scores.items()}
+            if not scores:
+                break
+        return scores
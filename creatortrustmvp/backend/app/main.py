@@ -1,21 +1,56 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List
-from datetime import datetime
 
 from app.models import (
     UserRegister, UserLogin, User, Token, UserWithProfile,
-    CreatorProfileCreate, CreatorProfile, BrandProfileCreate, BrandProfile,
-    CampaignCreate, Campaign, CampaignSubmissionCreate, CampaignSubmission,
-    PaymentCreate, Payment, ReviewCreate, Review,
+    CreatorProfileCreate, CreatorProfile, CreatorMatch, BrandProfileCreate, BrandProfile,
+    CampaignCreate, CampaignUpdate, Campaign, Application, CampaignSubmissionCreate, CampaignSubmission,
+    PaymentCreate, Payment, ReviewCreate, Review, RatingSummary, ImportResult,
     UserType, CampaignStatus
 )
-from app.database import db
+from app.pagination import (
+    Page, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE, RELEVANCE, CREATOR_SORT_KEYS, CREATOR_TEXT_SORT_KEYS,
+    APPLICANT_SORT_KEYS, CAMPAIGN_SORT_KEYS, REVIEW_SORT_KEYS, PAYMENT_SORT_KEYS, parse_page, fetch_size, finish_page
+)
+from app.bulk import BULK_TABLES, NDJSON_MEDIA_TYPE, export_ndjson, import_ndjson
+from app.database import Database
+from app.events import EVENT_STREAM_MEDIA_TYPE, RETRY_FRAME, TooManySubscribers
+from app.http_cache import (
+    CAMPAIGN_CACHE_CONTROL, PROFILE_CACHE_CONTROL, REVIEWS_CACHE_CONTROL, cache_headers, etag_for, not_modified
+)
+from app.matching import DEFAULT_MATCH_LIMIT
+from app.metrics import (
+    DATABASE_METHOD_METRICS, METRICS_CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, instrument_methods,
+    loop_lag_probe, registry
+)
+from app.profiler import DEFAULT_SAMPLE_HZ, MAX_PROFILE_SECONDS, profiler, to_collapsed, to_speedscope
+from app.scheduler import scheduler
+from app.serialization import record_list_response
+from app.storage import storage
 from app.auth import (
-    get_password_hash, verify_password, create_access_token, get_current_user
+    hash_password_async, verify_password_async, password_needs_rehash,
+    create_access_token, get_current_user, require_admin, collect_metrics as collect_auth_metrics
 )
 
-app = FastAPI(title="CreatorTrust API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await storage.open()
+    scheduler.start()
+    loop_lag_probe.start()
+    yield
+    await loop_lag_probe.stop()
+    await scheduler.stop()
+    await storage.close()
+
+
+app = FastAPI(title="CreatorTrust API", version="1.0.0", lifespan=lifespan)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -24,7 +59,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+# Added last so it is outermost and times the other middleware too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if DATABASE_METHOD_METRICS:
+    instrument_methods(Database)
+registry.collector(storage.collect_metrics)
+registry.collector(collect_auth_metrics)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    # NaN and Infinity parse as JSON numbers but cannot be echoed back as JSON
+    errors = [
+        {**error, "input": str(error["input"])}
+        if isinstance(error.get("input"), float) and not math.isfinite(error["input"]) else error
+        for error in exc.errors()
+    ]
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+
+
+def get_page(sort: Optional[str], cursor: Optional[str], limit: Optional[int],
+             sort_keys: dict, default_sort: str) -> Optional[Page]:
+    try:
+        return parse_page(sort, cursor, limit, sort_keys, default_sort)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def send_page(rows: List[dict], page: Optional[Page], sort_keys: dict, model,
+              headers: Optional[dict] = None) -> Response:
+    rows, next_cursor = finish_page(rows, page, sort_keys)
+    if next_cursor:
+        headers = dict(headers or {}, **{NEXT_CURSOR_HEADER: next_cursor})
+    return record_list_response(rows, model, headers)
 
 
 @app.get("/healthz")
@@ -32,17 +105,28 @@ async def healthz():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_metrics():
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.post("/api/auth/register", response_model=dict)
 async def register(user_data: UserRegister):
-    existing_user = db.get_user_by_email(user_data.email)
+    existing_user = await storage.get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    password_hash = get_password_hash(user_data.password)
-    user = db.create_user(user_data.email, password_hash, user_data.user_type)
+    password_hash = await hash_password_async(user_data.password)
+    # Another registration for the same email may have finished while hashing
+    if await storage.get_user_by_email(user_data.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    user = await storage.create_user(user_data.email, password_hash, user_data.user_type)
     
     access_token = create_access_token(data={"sub": user["id"]})
     
@@ -61,19 +145,23 @@ async def register(user_data: UserRegister):
 
 @app.post("/api/auth/login", response_model=dict)
 async def login(user_data: UserLogin):
-    user = db.get_user_by_email(user_data.email)
+    user = await storage.get_user_by_email(user_data.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    if not verify_password(user_data.password, user["password_hash"]):
+    if not await verify_password_async(user_data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    if password_needs_rehash(user["password_hash"]):
+        password_hash = await hash_password_async(user_data.password)
+        user = await storage.update_user_password_hash(user["id"], password_hash)
+    
     access_token = create_access_token(data={"sub": user["id"]})
     
     return {
@@ -94,9 +182,9 @@ async def get_me(current_user: dict = Depends(get_current_user)):
     user_type = UserType(current_user["user_type"])
     
     if user_type == UserType.CREATOR:
-        profile = db.get_creator_profile_by_user_id(current_user["id"])
+        profile = await storage.get_creator_profile_by_user_id(current_user["id"])
     else:
-        profile = db.get_brand_profile_by_user_id(current_user["id"])
+        profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     
     return {
         "user": {
@@ -121,24 +209,27 @@ async def create_or_update_creator_profile(
             detail="Only creators can create creator profiles"
         )
     
-    existing_profile = db.get_creator_profile_by_user_id(current_user["id"])
+    existing_profile = await storage.get_creator_profile_by_user_id(current_user["id"])
     
     if existing_profile:
-        profile = db.update_creator_profile(current_user["id"], profile_data.model_dump())
+        profile = await storage.update_creator_profile(current_user["id"], profile_data.model_dump())
     else:
-        profile = db.create_creator_profile(current_user["id"], profile_data.model_dump())
+        profile = await storage.create_creator_profile(current_user["id"], profile_data.model_dump())
     
     return profile
 
 
 @app.get("/api/creators/profile/{user_id}", response_model=CreatorProfile)
-async def get_creator_profile(user_id: str):
-    profile = db.get_creator_profile_by_user_id(user_id)
+async def get_creator_profile(user_id: str, request: Request, response: Response):
+    profile = await storage.get_creator_profile_by_user_id(user_id)
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Creator profile not found"
         )
+    cached = not_modified(request, response, etag_for(profile), PROFILE_CACHE_CONTROL)
+    if cached:
+        return cached
     return profile
 
 
@@ -147,10 +238,34 @@ async def search_creators(
     niche: Optional[str] = None,
     min_followers: Optional[int] = None,
     platform: Optional[str] = None,
-    location: Optional[str] = None
+    location: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)
 ):
-    creators = db.search_creators(niche, min_followers, platform, location)
-    return creators
+    if q:
+        sort_keys, default_sort = CREATOR_TEXT_SORT_KEYS, RELEVANCE
+    else:
+        sort_keys, default_sort = CREATOR_SORT_KEYS, "-rating"
+    page = get_page(sort, cursor, limit, sort_keys, default_sort)
+    creators = await storage.search_creators(niche, min_followers, platform, location, fetch_size(page), q)
+    return send_page(creators, page, sort_keys, CreatorProfile)
+
+
+@app.get("/api/creators/applications", response_model=List[Application])
+async def get_creator_applications(current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != UserType.CREATOR.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only creators have applications"
+        )
+    
+    profile = await storage.get_creator_profile_by_user_id(current_user["id"])
+    if not profile:
+        return []
+    
+    return await storage.get_applications_by_creator(profile["id"])
 
 
 @app.get("/api/creators/dashboard")
@@ -161,25 +276,22 @@ async def get_creator_dashboard(current_user: dict = Depends(get_current_user)):
             detail="Only creators can access creator dashboard"
         )
     
-    profile = db.get_creator_profile_by_user_id(current_user["id"])
+    profile = await storage.get_creator_profile_by_user_id(current_user["id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Creator profile not found"
         )
     
-    campaigns = db.get_campaigns_by_creator(profile["id"])
-    payments = db.get_payments_by_user(current_user["id"], UserType.CREATOR)
-    
-    total_earnings = sum(p["amount"] for p in payments if p["status"] == "released")
-    pending_earnings = sum(p["amount"] for p in payments if p["status"] == "escrowed")
+    campaigns = await storage.get_campaigns_by_creator(profile["id"])
+    stats = await storage.get_profile_stats(profile["id"])
     
     return {
         "profile": profile,
         "campaigns": campaigns,
-        "total_earnings": total_earnings,
-        "pending_earnings": pending_earnings,
-        "total_campaigns": len(campaigns),
+        "total_earnings": stats["released"],
+        "pending_earnings": stats["escrowed"],
+        "total_campaigns": stats["campaigns"],
         "rating": profile.get("rating", 0.0)
     }
 
@@ -195,24 +307,27 @@ async def create_or_update_brand_profile(
             detail="Only brands can create brand profiles"
         )
     
-    existing_profile = db.get_brand_profile_by_user_id(current_user["id"])
+    existing_profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     
     if existing_profile:
-        profile = db.update_brand_profile(current_user["id"], profile_data.model_dump())
+        profile = await storage.update_brand_profile(current_user["id"], profile_data.model_dump())
     else:
-        profile = db.create_brand_profile(current_user["id"], profile_data.model_dump())
+        profile = await storage.create_brand_profile(current_user["id"], profile_data.model_dump())
     
     return profile
 
 
 @app.get("/api/brands/profile/{user_id}", response_model=BrandProfile)
-async def get_brand_profile(user_id: str):
-    profile = db.get_brand_profile_by_user_id(user_id)
+async def get_brand_profile(user_id: str, request: Request, response: Response):
+    profile = await storage.get_brand_profile_by_user_id(user_id)
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Brand profile not found"
         )
+    cached = not_modified(request, response, etag_for(profile), PROFILE_CACHE_CONTROL)
+    if cached:
+        return cached
     return profile
 
 
@@ -224,26 +339,23 @@ async def get_brand_dashboard(current_user: dict = Depends(get_current_user)):
             detail="Only brands can access brand dashboard"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Brand profile not found"
         )
     
-    campaigns = db.get_campaigns_by_brand(profile["id"])
-    payments = db.get_payments_by_user(current_user["id"], UserType.BRAND)
-    
-    total_spent = sum(p["amount"] for p in payments if p["status"] == "released")
-    pending_amount = sum(p["amount"] for p in payments if p["status"] == "escrowed")
+    campaigns = await storage.get_campaigns_by_brand(profile["id"])
+    stats = await storage.get_profile_stats(profile["id"])
     
     return {
         "profile": profile,
         "campaigns": campaigns,
-        "total_spent": total_spent,
-        "pending_amount": pending_amount,
-        "total_campaigns": len(campaigns),
-        "active_campaigns": len([c for c in campaigns if c["status"] in ["open", "assigned", "in_progress"]])
+        "total_spent": stats["released"],
+        "pending_amount": stats["escrowed"],
+        "total_campaigns": stats["campaigns"],
+        "active_campaigns": stats["active_campaigns"]
     }
 
 
@@ -258,14 +370,14 @@ async def create_campaign(
             detail="Only brands can create campaigns"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Brand profile not found. Please create a profile first."
         )
     
-    campaign = db.create_campaign(profile["id"], campaign_data.model_dump())
+    campaign = await storage.create_campaign(profile["id"], campaign_data.model_dump())
     return campaign
 
 
@@ -274,28 +386,36 @@ async def list_campaigns(
     status: Optional[str] = None,
     niche: Optional[str] = None,
     budget_min: Optional[float] = None,
-    budget_max: Optional[float] = None
+    budget_max: Optional[float] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)
 ):
-    campaigns = db.list_campaigns(status, niche, budget_min, budget_max)
-    return campaigns
+    page = get_page(sort, cursor, limit, CAMPAIGN_SORT_KEYS, "-created_at")
+    campaigns = await storage.list_campaigns(status, niche, budget_min, budget_max, fetch_size(page))
+    return send_page(campaigns, page, CAMPAIGN_SORT_KEYS, Campaign)
 
 
 @app.get("/api/campaigns/{campaign_id}")
-async def get_campaign(campaign_id: str):
-    campaign = db.get_campaign(campaign_id)
+async def get_campaign(campaign_id: str, request: Request, response: Response):
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    brand = db.get_brand_profile_by_id(campaign["brand_id"])
+    brand = await storage.get_brand_profile_by_id(campaign["brand_id"])
     
     creator = None
     if campaign.get("creator_id"):
-        creator = db.get_creator_profile_by_id(campaign["creator_id"])
+        creator = await storage.get_creator_profile_by_id(campaign["creator_id"])
+    
+    submission = await storage.get_submission_by_campaign(campaign_id)
     
-    submission = db.get_submission_by_campaign(campaign_id)
+    cached = not_modified(request, response, etag_for(campaign, brand, creator, submission), CAMPAIGN_CACHE_CONTROL)
+    if cached:
+        return cached
     
     return {
         "campaign": campaign,
@@ -308,27 +428,56 @@ async def get_campaign(campaign_id: str):
 @app.put("/api/campaigns/{campaign_id}", response_model=Campaign)
 async def update_campaign(
     campaign_id: str,
-    campaign_data: dict,
+    campaign_data: CampaignUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    campaign = db.get_campaign(campaign_id)
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile or profile["id"] != campaign["brand_id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to update this campaign"
         )
     
-    updated_campaign = db.update_campaign(campaign_id, campaign_data)
+    updated_campaign = await storage.update_campaign(campaign_id, campaign_data.model_dump(exclude_none=True))
     return updated_campaign
 
 
+@app.get("/api/campaigns/{campaign_id}/matches", response_model=List[CreatorMatch])
+async def match_campaign_creators(
+    campaign_id: str,
+    limit: int = Query(DEFAULT_MATCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user["user_type"] != UserType.BRAND.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only brands can match creators to campaigns"
+        )
+    
+    campaign = await storage.get_campaign(campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
+    if not profile or profile["id"] != campaign["brand_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to view matches for this campaign"
+        )
+    
+    return await storage.match_creators(campaign, limit)
+
+
 @app.post("/api/campaigns/{campaign_id}/apply")
 async def apply_to_campaign(
     campaign_id: str,
@@ -340,7 +489,7 @@ async def apply_to_campaign(
             detail="Only creators can apply to campaigns"
         )
     
-    campaign = db.get_campaign(campaign_id)
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -353,7 +502,48 @@ async def apply_to_campaign(
             detail="Campaign is not open for applications"
         )
     
-    return {"success": True, "message": "Application submitted successfully"}
+    profile = await storage.get_creator_profile_by_user_id(current_user["id"])
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Creator profile not found. Please create a profile first."
+        )
+    
+    application = await storage.create_application(campaign_id, profile["id"])
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already applied to this campaign"
+        )
+    
+    return {"success": True, "message": "Application submitted successfully", "application": application}
+
+
+@app.get("/api/campaigns/{campaign_id}/applicants", response_model=List[CreatorProfile])
+async def get_campaign_applicants(
+    campaign_id: str,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
+    campaign = await storage.get_campaign(campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
+    if not profile or profile["id"] != campaign["brand_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to view applicants for this campaign"
+        )
+    
+    page = get_page(sort, cursor, limit, APPLICANT_SORT_KEYS, "-rating")
+    applicants = await storage.get_applicants(campaign_id, fetch_size(page))
+    return send_page(applicants, page, APPLICANT_SORT_KEYS, CreatorProfile)
 
 
 @app.post("/api/campaigns/{campaign_id}/assign", response_model=Campaign)
@@ -368,14 +558,14 @@ async def assign_campaign(
             detail="Only brands can assign campaigns"
         )
     
-    campaign = db.get_campaign(campaign_id)
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile or profile["id"] != campaign["brand_id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -389,7 +579,12 @@ async def assign_campaign(
             detail="creator_id is required"
         )
     
-    updated_campaign = db.assign_campaign(campaign_id, creator_id)
+    updated_campaign = await storage.assign_campaign(campaign_id, creator_id)
+    if not updated_campaign:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Campaign can no longer be assigned"
+        )
     return updated_campaign
 
 
@@ -405,21 +600,27 @@ async def submit_campaign(
             detail="Only creators can submit campaigns"
         )
     
-    campaign = db.get_campaign(campaign_id)
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    profile = db.get_creator_profile_by_user_id(current_user["id"])
+    profile = await storage.get_creator_profile_by_user_id(current_user["id"])
     if not profile or campaign.get("creator_id") != profile["id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not assigned to this campaign"
         )
     
-    submission = db.create_submission(campaign_id, submission_data.model_dump())
+    # Checked again atomically: the campaign may have been reassigned or approved since it was read
+    submission = await storage.create_submission(campaign_id, profile["id"], submission_data.model_dump())
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Campaign is no longer accepting submissions"
+        )
     return submission
 
 
@@ -434,36 +635,32 @@ async def approve_campaign(
             detail="Only brands can approve campaigns"
         )
     
-    campaign = db.get_campaign(campaign_id)
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile or profile["id"] != campaign["brand_id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to approve this campaign"
         )
     
-    db.update_campaign(campaign_id, {"status": CampaignStatus.COMPLETED.value})
-    
-    payment = db.get_payment_by_campaign(campaign_id)
-    if payment:
-        db.release_payment(payment["id"])
-    
-    if campaign.get("creator_id"):
-        creator = db.get_creator_profile_by_id(campaign["creator_id"])
-        if creator:
-            creator["total_campaigns"] = creator.get("total_campaigns", 0) + 1
-            creator["updated_at"] = datetime.utcnow()
+    approved = await storage.approve_campaign(campaign_id)
+    if not approved:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Campaign is not awaiting approval"
+        )
+    campaign, payment = approved
     
     return {
         "success": True,
         "message": "Campaign approved and payment released",
-        "campaign": db.get_campaign(campaign_id),
+        "campaign": campaign,
         "payment": payment
     }
 
@@ -479,21 +676,21 @@ async def create_escrow_payment(
             detail="Only brands can create payments"
         )
     
-    campaign = db.get_campaign(payment_data.campaign_id)
+    campaign = await storage.get_campaign(payment_data.campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile or profile["id"] != campaign["brand_id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to create payment for this campaign"
         )
     
-    payment = db.create_payment(payment_data.campaign_id, payment_data.amount)
+    payment = await storage.create_payment(payment_data.campaign_id, payment_data.amount)
     
     payment_url = f"https://payment.example.com/pay/{payment['id']}"
     
@@ -505,36 +702,47 @@ async def release_payment(
     payment_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    payment = db.payments.get(payment_id)
+    payment = await storage.get_payment(payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment not found"
         )
     
-    campaign = db.get_campaign(payment["campaign_id"])
+    campaign = await storage.get_campaign(payment["campaign_id"])
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile or profile["id"] != campaign["brand_id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to release this payment"
         )
     
-    released_payment = db.release_payment(payment_id)
+    released_payment = await storage.release_payment(payment_id)
+    if not released_payment:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Payment is not in escrow"
+        )
     return released_payment
 
 
 @app.get("/api/payments/history", response_model=List[Payment])
-async def get_payment_history(current_user: dict = Depends(get_current_user)):
+async def get_payment_history(
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
+    page = get_page(sort, cursor, limit, PAYMENT_SORT_KEYS, "-created_at")
     user_type = UserType(current_user["user_type"])
-    payments = db.get_payments_by_user(current_user["id"], user_type)
-    return payments
+    payments = await storage.get_payments_by_user(current_user["id"], user_type, fetch_size(page))
+    return send_page(payments, page, PAYMENT_SORT_KEYS, Payment)
 
 
 @app.post("/api/reviews", response_model=Review)
@@ -548,14 +756,14 @@ async def create_review(
             detail="Only brands can create reviews"
         )
     
-    campaign = db.get_campaign(review_data.campaign_id)
+    campaign = await storage.get_campaign(review_data.campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    brand_profile = db.get_brand_profile_by_user_id(current_user["id"])
+    brand_profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not brand_profile or brand_profile["id"] != campaign["brand_id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -568,7 +776,7 @@ async def create_review(
             detail="Campaign has no assigned creator"
         )
     
-    review = db.create_review(
+    review = await storage.create_review(
         review_data.campaign_id,
         campaign["creator_id"],
         brand_profile["id"],
@@ -580,9 +788,27 @@ async def create_review(
 
 
 @app.get("/api/reviews/creator/{creator_id}", response_model=List[Review])
-async def get_creator_reviews(creator_id: str):
-    reviews = db.get_reviews_by_creator(creator_id)
-    return reviews
+async def get_creator_reviews(
+    creator_id: str,
+    request: Request,
+    response: Response,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)
+):
+    page = get_page(sort, cursor, limit, REVIEW_SORT_KEYS, "-created_at")
+    reviews = await storage.get_reviews_by_creator(creator_id, fetch_size(page))
+    # The fetched rows include the one past the page, so the tag also covers the next cursor
+    etag = etag_for(*reviews)
+    cached = not_modified(request, response, etag, REVIEWS_CACHE_CONTROL)
+    if cached:
+        return cached
+    return send_page(reviews, page, REVIEW_SORT_KEYS, Review, cache_headers(etag, REVIEWS_CACHE_CONTROL))
+
+
+@app.get("/api/reviews/creator/{creator_id}/summary", response_model=RatingSummary)
+async def get_creator_rating_summary(creator_id: str):
+    return await storage.get_rating_summary(creator_id)
 
 
 @app.get("/api/analytics/creator")
@@ -593,23 +819,19 @@ async def get_creator_analytics(current_user: dict = Depends(get_current_user)):
             detail="Only creators can access creator analytics"
         )
     
-    profile = db.get_creator_profile_by_user_id(current_user["id"])
+    profile = await storage.get_creator_profile_by_user_id(current_user["id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Creator profile not found"
         )
     
-    campaigns = db.get_campaigns_by_creator(profile["id"])
-    payments = db.get_payments_by_user(current_user["id"], UserType.CREATOR)
-    
-    total_earnings = sum(p["amount"] for p in payments if p["status"] == "released")
-    campaigns_completed = len([c for c in campaigns if c["status"] == "completed"])
+    stats = await storage.get_profile_stats(profile["id"])
     
     return {
-        "total_earnings": total_earnings,
-        "campaigns_completed": campaigns_completed,
-        "total_campaigns": len(campaigns),
+        "total_earnings": stats["released"],
+        "campaigns_completed": stats["completed_campaigns"],
+        "total_campaigns": stats["campaigns"],
         "avg_rating": profile.get("rating", 0.0),
         "engagement_rate": profile.get("engagement_rate", 0.0)
     }
@@ -623,37 +845,33 @@ async def get_brand_analytics(current_user: dict = Depends(get_current_user)):
             detail="Only brands can access brand analytics"
         )
     
-    profile = db.get_brand_profile_by_user_id(current_user["id"])
+    profile = await storage.get_brand_profile_by_user_id(current_user["id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Brand profile not found"
         )
     
-    campaigns = db.get_campaigns_by_brand(profile["id"])
-    payments = db.get_payments_by_user(current_user["id"], UserType.BRAND)
-    
-    total_spent = sum(p["amount"] for p in payments if p["status"] == "released")
-    campaigns_completed = len([c for c in campaigns if c["status"] == "completed"])
+    stats = await storage.get_profile_stats(profile["id"])
     
     return {
-        "total_spent": total_spent,
-        "campaigns_created": len(campaigns),
-        "campaigns_completed": campaigns_completed,
-        "active_campaigns": len([c for c in campaigns if c["status"] in ["open", "assigned", "in_progress"]])
+        "total_spent": stats["released"],
+        "campaigns_created": stats["campaigns"],
+        "campaigns_completed": stats["completed_campaigns"],
+        "active_campaigns": stats["active_campaigns"]
     }
 
 
 @app.get("/api/analytics/campaign/{campaign_id}")
 async def get_campaign_analytics(campaign_id: str):
-    campaign = db.get_campaign(campaign_id)
+    campaign = await storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    submission = db.get_submission_by_campaign(campaign_id)
+    submission = await storage.get_submission_by_campaign(campaign_id)
     
     if not submission:
         return {
@@ -671,3 +889,87 @@ async def get_campaign_analytics(campaign_id: str):
         "engagement_rate": submission.get("engagement_rate", 0.0),
         "status": campaign["status"]
     }
+
+
+def _bulk_table(table: str) -> str:
+    if table not in BULK_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown table: {table}. Use one of: {', '.join(BULK_TABLES)}"
+        )
+    return table
+
+
+@app.get("/api/events")
+async def stream_events(request: Request, current_user: dict = Depends(get_current_user)):
+    events = storage.events
+    if events is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Event streams are not available with this storage backend"
+        )
+    last_event_id = request.headers.get("last-event-id")
+    
+    async def frames():
+        # Subscribing here rather than in the handler ties the subscription's
+        # lifetime to the stream, which is closed however the client leaves
+        subscription = events.subscribe(current_user["id"], last_event_id)
+        try:
+            yield RETRY_FRAME
+            while True:
+                yield await subscription.next_chunk()
+        finally:
+            events.unsubscribe(subscription)
+    
+    stream = frames()
+    try:
+        # Subscribes before the response starts, so a full bus can still answer 503
+        first = await anext(stream)
+    except TooManySubscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams"
+        )
+    
+    async def body():
+        yield first
+        async for chunk in stream:
+            yield chunk
+    
+    return StreamingResponse(body(), media_type=EVENT_STREAM_MEDIA_TYPE,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/api/admin/import/{table}", response_model=ImportResult, dependencies=[Depends(require_admin)])
+async def bulk_import(table: str, request: Request):
+    return await import_ndjson(storage, _bulk_table(table), request.stream())
+
+
+@app.get("/api/admin/export/{table}", dependencies=[Depends(require_admin)])
+async def bulk_export(table: str):
+    return StreamingResponse(export_ndjson(storage, _bulk_table(table)), media_type=NDJSON_MEDIA_TYPE)
+
+
+@app.post("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def capture_profile(
+    seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+    hz: int = Query(DEFAULT_SAMPLE_HZ, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$")
+):
+    if profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already being captured"
+        )
+    try:
+        profile = await profiler.capture(seconds, hz)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if format == "speedscope":
+        return JSONResponse(to_speedscope(profile), headers={
+            "Content-Disposition": 'attachment; filename="profile.speedscope.json"'
+        })
+    return Response(to_collapsed(profile), media_type="text/plain")
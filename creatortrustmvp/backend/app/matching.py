@@ -0,0 +1,142 @@
+"""
+Campaign-creator matching
+
+A creator is eligible for a campaign when their niche matches and their
+followers on the campaign's platforms reach its min_followers. Eligible
+creators are scored from 0 to 1 on rating, engagement rate, reach, past
+campaigns and how many of the campaign's platforms they have a handle on.
+Each signal saturates, so one outsized number cannot outweigh the others.
+
+CreatorColumns keeps those fields of every creator profile in NumPy arrays
+so a match query scores the whole niche at once. The PostgreSQL backend
+evaluates the same formula in SQL (see app.postgres).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+PLATFORMS = ("instagram", "youtube", "tiktok")
+
+MATCH_WEIGHTS = {
+    "rating": 0.35,
+    "engagement": 0.25,
+    "reach": 0.2,
+    "experience": 0.1,
+    "platforms": 0.1,
+}
+# Value at which a saturating signal scores half its weight
+ENGAGEMENT_MIDPOINT = 3.0
+EXPERIENCE_MIDPOINT = 5
+# Reach is measured against the campaign's min_followers, or this when it is lower
+REACH_MIDPOINT = 10_000
+MAX_RATING = 5.0
+DEFAULT_MATCH_LIMIT = 20
+
+
+def campaign_platforms(campaign: dict) -> List[str]:
+    """The known platforms a campaign asks for; all of them when it names none."""
+    requested = {str(platform).lower() for platform in campaign.get("platforms") or ()}
+    return [platform for platform in PLATFORMS if platform in requested] or list(PLATFORMS)
+
+
+def reach_midpoint(min_followers: int) -> int:
+    return max(min_followers, REACH_MIDPOINT)
+
+
+class CreatorColumns:
+    """
+    Columnar mirror of the creator_profiles fields read by match scoring.
+
+    Row i holds the profile ids[i]; put() overwrites a profile's row in place
+    (or appends one), so the arrays stay current without a rebuild. Capacity
+    doubles when full.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.niche_codes: Dict[str, int] = {}
+        self.niche = np.zeros(capacity, dtype=np.int32)
+        # One row per platform, in PLATFORMS order
+        self.followers = np.zeros((len(PLATFORMS), capacity), dtype=np.int64)
+        # Bit p is set when the creator has a handle on PLATFORMS[p]
+        self.handles = np.zeros(capacity, dtype=np.uint8)
+        self.rating = np.zeros(capacity, dtype=np.float64)
+        self.engagement = np.zeros(capacity, dtype=np.float64)
+        self.campaigns = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _grow(self):
+        capacity = 2 * len(self.niche)
+        for name in ("niche", "handles", "rating", "engagement", "campaigns"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        followers = np.zeros((len(PLATFORMS), capacity), dtype=np.int64)
+        followers[:, :self.followers.shape[1]] = self.followers
+        self.followers = followers
+
+    def put(self, profile: dict):
+        row = self.rows.get(profile["id"])
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.niche):
+                self._grow()
+            self.ids.append(profile["id"])
+            self.rows[profile["id"]] = row
+        niche = (profile.get("niche") or "").lower()
+        self.niche[row] = self.niche_codes.setdefault(niche, len(self.niche_codes))
+        handles = 0
+        for p, platform in enumerate(PLATFORMS):
+            self.followers[p, row] = profile.get(f"followers_{platform}") or 0
+            if profile.get(f"{platform}_handle"):
+                handles |= 1 << p
+        self.handles[row] = handles
+        self.rating[row] = profile.get("rating") or 0.0
+        self.engagement[row] = profile.get("engagement_rate") or 0.0
+        self.campaigns[row] = profile.get("total_campaigns") or 0
+
+    def match(self, niche: Optional[str], min_followers: int, platforms: Iterable[str],
+              limit: int) -> List[Tuple[str, float]]:
+        """Return up to `limit` (profile id, score) pairs, best first; ties go to the older profile."""
+        code = self.niche_codes.get((niche or "").lower())
+        if code is None or limit <= 0:
+            return []
+        n = len(self.ids)
+        rows = np.flatnonzero(self.niche[:n] == code)
+        wanted = [PLATFORMS.index(platform) for platform in platforms]
+        # Gather only the niche's columns; followers[wanted] would copy every row first
+        reach = self.followers[np.ix_(wanted, rows)].sum(axis=0)
+        if min_followers > 0:
+            eligible = reach >= min_followers
+            rows, reach = rows[eligible], reach[eligible]
+        if not len(rows):
+            return []
+
+        # Share of the wanted platforms covered by each handle bitmask
+        mask = sum(1 << p for p in wanted)
+        coverage = np.array([bin(bits & mask).count("1") / len(wanted) for bits in range(1 << len(PLATFORMS))])
+        engagement = np.maximum(self.engagement[rows], 0.0)
+        experience = np.maximum(self.campaigns[rows], 0)
+        midpoint = reach_midpoint(min_followers)
+        scores = (
+            MATCH_WEIGHTS["rating"] * np.clip(self.rating[rows] / MAX_RATING, 0.0, 1.0) +
+            MATCH_WEIGHTS["engagement"] * engagement / (engagement + ENGAGEMENT_MIDPOINT) +
+            MATCH_WEIGHTS["reach"] * reach / (reach + midpoint) +
+            MATCH_WEIGHTS["experience"] * experience / (experience + EXPERIENCE_MIDPOINT) +
+            MATCH_WEIGHTS["platforms"] * coverage[self.handles[rows]]
+        )
+
+        if len(scores) > limit:
+            # Partial selection of the top `limit`; of the rows tied with the
+            # last selected score, the lowest (oldest) rows are kept
+            kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            above = np.flatnonzero(scores > kth)
+            tied = np.flatnonzero(scores == kth)[:limit - len(above)]
+            keep = np.concatenate((above, tied))
+            rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((rows, -scores))
+        return [(self.ids[row], float(score)) for row, score in zip(rows[order].tolist(), scores[order].tolist())]
@@ -0,0 +1,282 @@
+"""
+Request, database and event-loop metrics in the Prometheus text format
+
+MetricsMiddleware records a latency histogram and response counts per route
+template and method, and the number of requests in flight; event streams
+are counted but not timed. Histograms use HDR-style log-linear buckets: every
+power of two between 2**-15 s (~31 µs) and 32 s is split into
+METRICS_LATENCY_SUB_BUCKETS equal buckets (default 4, so a bucket bound is
+within 25% of any value it counts), and an observation costs one bisect over
+a fixed list.
+With DATABASE_METHOD_METRICS=1 every public Database method is timed as well,
+and LoopLagProbe measures how late the event loop wakes a sleeping task.
+GET /metrics renders the registry, including the values collectors compute
+at scrape time (table and index sizes, WAL and connection pool state).
+"""
+import asyncio
+import contextlib
+import functools
+import inspect
+import os
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Label for requests that matched no route (404s, or rejected before routing)
+UNMATCHED_ROUTE = "unmatched"
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+DATABASE_METHOD_METRICS = os.environ.get("DATABASE_METHOD_METRICS", "") == "1"
+LOOP_LAG_INTERVAL = float(os.environ.get("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+LATENCY_SUB_BUCKETS = max(1, int(os.environ.get("METRICS_LATENCY_SUB_BUCKETS", "4")))
+# Responses that stay open until the client leaves, whose duration is not a latency
+UNTIMED_CONTENT_TYPES = (b"text/event-stream",)
+
+
+def log_linear_bounds(min_exponent: int, max_exponent: int, sub_buckets: int) -> List[float]:
+    """Upper bounds splitting each [2**e, 2**(e+1)) into sub_buckets equal parts."""
+    bounds = []
+    for exponent in range(min_exponent, max_exponent):
+        base = 2.0 ** exponent
+        bounds.extend(base * (1 + i / sub_buckets) for i in range(sub_buckets))
+    bounds.append(2.0 ** max_exponent)
+    return bounds
+
+
+LATENCY_BOUNDS = log_linear_bounds(-15, 5, LATENCY_SUB_BUCKETS)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        # counts[i] observations were <= bounds[i] and > bounds[i - 1]; the last is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class HistogramFamily:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...], bounds: List[float] = LATENCY_BOUNDS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.bounds = bounds
+        self.series: Dict[tuple, Histogram] = {}
+
+    def labels(self, values: tuple) -> Histogram:
+        histogram = self.series.get(values)
+        if histogram is None:
+            histogram = self.series[values] = Histogram(self.bounds)
+        return histogram
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        bounds = [_format_value(bound) for bound in self.bounds] + ["+Inf"]
+        for values, histogram in list(self.series.items()):
+            labels = _format_labels(self.label_names, values)
+            prefix = labels[:-1] + "," if labels else "{"
+            total = 0
+            for bound, count in zip(bounds, histogram.counts):
+                total += count
+                lines.append(f'{self.name}_bucket{prefix}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{labels} {_format_value(histogram.sum)}")
+            lines.append(f"{self.name}_count{labels} {total}")
+
+
+class ValueFamily:
+    """A counter or gauge, one value per label tuple."""
+
+    def __init__(self, name: str, kind: str, help: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.label_names = label_names
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, values: tuple, amount: float = 1):
+        self.values[values] = self.values.get(values, 0) + amount
+
+    def set(self, values: tuple, value: float):
+        self.values[values] = value
+
+    def render(self, lines: List[str]):
+        _render_values(self, lines)
+
+
+class MetricFamily(NamedTuple):
+    """A counter or gauge computed by a collector at scrape time."""
+    name: str
+    kind: str
+    help: str
+    label_names: Tuple[str, ...]
+    values: Dict[tuple, float]
+
+    def render(self, lines: List[str]):
+        _render_values(self, lines)
+
+
+def _render_values(family, lines: List[str]):
+    lines.append(f"# HELP {family.name} {family.help}")
+    lines.append(f"# TYPE {family.name} {family.kind}")
+    for values, value in list(family.values.items()):
+        lines.append(f"{family.name}{_format_labels(family.label_names, values)} {_format_value(value)}")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._families: list = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def histogram(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> HistogramFamily:
+        family = HistogramFamily(name, help, label_names)
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> ValueFamily:
+        family = ValueFamily(name, "counter", help, label_names)
+        self._families.append(family)
+        return family
+
+    def gauge(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> ValueFamily:
+        family = ValueFamily(name, "gauge", help, label_names)
+        self._families.append(family)
+        return family
+
+    def collector(self, collect: Callable[[], Iterable[MetricFamily]]):
+        """Register a function returning MetricFamily values, called on every render."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families:
+            family.render(lines)
+        for collect in self._collectors:
+            for family in collect():
+                family.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+registry = Registry()
+request_latency = registry.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last body chunk",
+    ("method", "route"))
+responses = registry.counter("http_responses_total", "Responses sent, by status code", ("method", "route", "status"))
+requests_in_flight = registry.gauge("http_requests_in_flight", "Requests being handled")
+requests_in_flight.set((), 0)
+database_latency = registry.histogram(
+    "database_method_duration_seconds", "Duration of Database method calls, including the wait for its lock",
+    ("method",))
+loop_lag = registry.histogram("event_loop_lag_seconds", "How late the event loop resumed a sleeping task")
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding request_latency, responses and requests_in_flight."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        timed = True
+
+        async def send_with_status(message):
+            nonlocal status_code, timed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type" and value.startswith(UNTIMED_CONTENT_TYPES):
+                        timed = False
+            await send(message)
+
+        in_flight = requests_in_flight.values
+        in_flight[()] += 1
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - started
+            in_flight[()] -= 1
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else UNMATCHED_ROUTE)
+            if timed:
+                request_latency.labels(labels).observe(elapsed)
+            responses.inc(labels + (status_code,))
+
+
+def _timed(method: Callable, histogram: Histogram) -> Callable:
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - started)
+
+    timed.metrics_timed = True
+    return timed
+
+
+def instrument_methods(cls: type, family: HistogramFamily = database_latency):
+    """Time every public method defined on cls into family, labelled by method name."""
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attribute) or getattr(attribute, "metrics_timed", False):
+            continue
+        setattr(cls, name, _timed(attribute, family.labels((name,))))
+
+
+class LoopLagProbe:
+    """Sleeps for interval seconds at a time and records how much later than that it woke."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        histogram = loop_lag.labels(())
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            histogram.observe(max(0.0, loop.time() - started - self.interval))
+
+
+loop_lag_probe = LoopLagProbe(LOOP_LAG_INTERVAL if METRICS_ENABLED else 0)
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from typing import Dict, Optional, List
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from enum import Enum
 
 
@@ -16,6 +16,8 @@ class CampaignStatus(str, Enum):
     SUBMITTED = "submitted"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
+    # Still open when its deadline passed
+    EXPIRED = "expired"
 
 
 class PaymentStatus(str, Enum):
@@ -60,6 +62,11 @@ class CreatorProfileCreate(BaseModel):
     tiktok_handle: Optional[str] = None
 
 
+class CreatorImport(CreatorProfileCreate):
+    # A creator account is created for this address, without a password
+    email: EmailStr
+
+
 class CreatorProfile(BaseModel):
     id: str
     user_id: str
@@ -81,6 +88,11 @@ class CreatorProfile(BaseModel):
     updated_at: datetime
 
 
+class CreatorMatch(BaseModel):
+    creator: CreatorProfile
+    score: float
+
+
 class BrandProfileCreate(BaseModel):
     company_name: str
     industry: str
@@ -102,7 +114,7 @@ class BrandProfile(BaseModel):
 class CampaignCreate(BaseModel):
     title: str
     description: str
-    budget: float
+    budget: float = Field(ge=0, allow_inf_nan=False)
     platforms: List[str]
     duration_days: int
     niche: str
@@ -110,6 +122,25 @@ class CampaignCreate(BaseModel):
     content_requirements: str
 
 
+class CampaignUpdate(BaseModel):
+    # Only the brand-editable fields; status and the assigned creator change through their own flows
+    model_config = ConfigDict(extra="forbid")
+
+    title: Optional[str] = None
+    description: Optional[str] = None
+    budget: Optional[float] = Field(default=None, ge=0, allow_inf_nan=False)
+    platforms: Optional[List[str]] = None
+    duration_days: Optional[int] = None
+    niche: Optional[str] = None
+    min_followers: Optional[int] = None
+    content_requirements: Optional[str] = None
+    deadline: Optional[datetime] = None
+
+
+class CampaignImport(CampaignCreate):
+    brand_id: str
+
+
 class Campaign(BaseModel):
     id: str
     brand_id: str
@@ -128,6 +159,13 @@ class Campaign(BaseModel):
     deadline: datetime
 
 
+class Application(BaseModel):
+    id: str
+    campaign_id: str
+    creator_id: str
+    created_at: datetime
+
+
 class CampaignSubmissionCreate(BaseModel):
     content_links: List[str]
     notes: str
@@ -162,7 +200,7 @@ class Payment(BaseModel):
 
 class ReviewCreate(BaseModel):
     campaign_id: str
-    rating: int
+    rating: int = Field(ge=1, le=5)
     comment: str
 
 
@@ -176,6 +214,26 @@ class Review(BaseModel):
     created_at: datetime
 
 
+class RatingSummary(BaseModel):
+    count: int
+    average: float
+    bayesian_average: float
+    # Number of reviews per star rating, 1-5
+    histogram: Dict[int, int]
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    # The first MAX_REPORTED_ERRORS failures (see app.bulk)
+    errors: List[ImportLineError]
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,150 @@
+"""
+Keyset pagination for list endpoints
+
+A page is ordered by (sort key, id) and a cursor records the position of the
+last row returned, so the next page starts right after it without counting
+or skipping earlier rows. Cursors are opaque to clients: base64url-encoded
+JSON carrying the sort order they were issued for.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 100
+DATETIME_SORT_FIELDS = {"created_at", "deadline"}
+# Keyword search results can be ranked by relevance; that cursor holds an
+# offset into the ranking instead of a sort key.
+RELEVANCE = "relevance"
+
+
+def total_followers(profile: dict) -> int:
+    return (profile.get("followers_instagram", 0) +
+            profile.get("followers_youtube", 0) +
+            profile.get("followers_tiktok", 0))
+
+
+# Sort key of a row for each sort field an endpoint accepts. The in-memory
+# Database builds its sorted indexes from the same functions.
+CREATOR_SORT_KEYS: Dict[str, Callable[[dict], Any]] = {
+    "rating": lambda profile: profile["rating"],
+    "followers": total_followers,
+    "created_at": lambda profile: profile["created_at"],
+}
+CAMPAIGN_SORT_KEYS: Dict[str, Callable[[dict], Any]] = {
+    "budget": lambda campaign: campaign.get("budget", 0),
+    "created_at": lambda campaign: campaign["created_at"],
+    "deadline": lambda campaign: campaign["deadline"],
+}
+REVIEW_SORT_KEYS: Dict[str, Callable[[dict], Any]] = {
+    "rating": lambda review: review["rating"],
+    "created_at": lambda review: review["created_at"],
+}
+PAYMENT_SORT_KEYS: Dict[str, Callable[[dict], Any]] = {
+    "amount": lambda payment: payment["amount"],
+    "created_at": lambda payment: payment["created_at"],
+}
+# Applicants to a campaign are creator profiles
+APPLICANT_SORT_KEYS: Dict[str, Callable[[dict], Any]] = {
+    "rating": CREATOR_SORT_KEYS["rating"],
+    "followers": total_followers,
+}
+CREATOR_TEXT_SORT_KEYS: Dict[str, Optional[Callable[[dict], Any]]] = {RELEVANCE: None, **CREATOR_SORT_KEYS}
+
+
+class Page(NamedTuple):
+    field: str
+    descending: bool
+    # (sort key, id) of the last row on the previous page
+    after: Optional[Tuple[Any, str]]
+    limit: Optional[int]
+
+    @property
+    def sort(self) -> str:
+        return f"-{self.field}" if self.descending else self.field
+
+
+def _encode_key(key: Any) -> Any:
+    if isinstance(key, datetime):
+        return {"dt": key.isoformat()}
+    return key
+
+
+def _decode_key(value: Any) -> Any:
+    if isinstance(value, dict):
+        key = datetime.fromisoformat(value["dt"])
+        # Stored datetimes are naive UTC and cannot be compared with aware ones
+        if key.tzinfo is not None:
+            raise ValueError("Invalid cursor")
+        return key
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    raise ValueError("Invalid cursor")
+
+
+def encode_cursor(sort: str, key: Any, item_id: str) -> str:
+    data = json.dumps([sort, _encode_key(key), item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Tuple[Any, str]]:
+    """Return the sort order a cursor was issued for and its (key, id) position."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, key, item_id = json.loads(data)
+        if not isinstance(sort, str) or not isinstance(item_id, str):
+            raise ValueError
+        return sort, (_decode_key(key), item_id)
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def parse_page(sort: Optional[str], cursor: Optional[str], limit: Optional[int],
+               sort_keys: Dict[str, Callable[[dict], Any]], default_sort: str) -> Optional[Page]:
+    """
+    Build the Page for a request, or None when no pagination parameter was
+    given. A cursor implies the sort order it was issued for. Raises
+    ValueError for an unknown sort field or a cursor from another sort order.
+    """
+    if sort is None and cursor is None and limit is None:
+        return None
+    after = None
+    if cursor is not None:
+        cursor_sort, after = decode_cursor(cursor)
+        if sort is not None and sort != cursor_sort:
+            raise ValueError("Cursor was issued for a different sort order")
+        sort = cursor_sort
+    sort = sort or default_sort
+    field = sort.lstrip("-")
+    if field not in sort_keys or sort.count("-") > 1:
+        raise ValueError(f"Unsupported sort field: {field}. Use one of: {', '.join(sort_keys)}")
+    if field == RELEVANCE:
+        if sort.startswith("-"):
+            raise ValueError("Relevance is always ranked best match first")
+        if after is not None and (not isinstance(after[0], int) or after[0] < 0):
+            raise ValueError("Invalid cursor")
+    elif after is not None and isinstance(after[0], datetime) != (field in DATETIME_SORT_FIELDS):
+        raise ValueError("Invalid cursor")
+    return Page(field, sort.startswith("-"), after, limit)
+
+
+def fetch_size(page: Optional[Page]) -> Optional[Page]:
+    """The page to request from storage: one extra row tells whether another page follows."""
+    if page is None or page.limit is None:
+        return page
+    return page._replace(limit=page.limit + 1)
+
+
+def finish_page(rows: List[dict], page: Optional[Page],
+                sort_keys: Dict[str, Callable[[dict], Any]]) -> Tuple[List[dict], Optional[str]]:
+    """Trim the extra row fetched by fetch_size and return the cursor for the next page."""
+    if page is None or page.limit is None or len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    last = rows[-1]
+    if page.field == RELEVANCE:
+        offset = (page.after[0] if page.after is not None else 0) + page.limit
+        return rows, encode_cursor(page.sort, offset, last["id"])
+    return rows, encode_cursor(page.sort, sort_keys[page.field](last), last["id"])
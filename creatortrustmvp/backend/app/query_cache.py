@@ -0,0 +1,79 @@
+"""
+Result cache for the filtered creator searches and campaign listings
+
+Keys start with the niche filter, so a write evicts only entries for the
+row's niche or for no niche whose other filters match the row. Entries are
+LRU-bounded by count and total rows, and results over QUERY_CACHE_RESULT_ROWS
+are not kept.
+"""
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+QUERY_CACHE_ENTRIES = int(os.environ.get("QUERY_CACHE_ENTRIES", "1024"))
+QUERY_CACHE_ROWS = int(os.environ.get("QUERY_CACHE_ROWS", "500000"))
+QUERY_CACHE_RESULT_ROWS = int(os.environ.get("QUERY_CACHE_RESULT_ROWS", "1000"))
+
+
+class QueryCache:
+    """Bounded LRU of query results keyed by (niche, *other filters); see the module docstring."""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_ENTRIES, max_rows: int = QUERY_CACHE_ROWS,
+                 max_result_rows: int = QUERY_CACHE_RESULT_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.max_result_rows = max_result_rows
+        self.hits = 0
+        self.misses = 0
+        # Entries dropped because a write could change them, and to stay within bounds
+        self.invalidations = 0
+        self.evictions = 0
+        self.rows = 0
+        self._entries: "OrderedDict[tuple, List[dict]]" = OrderedDict()
+        self._keys_by_niche: Dict[Optional[str], Set[tuple]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[List[dict]]:
+        results = self._entries.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return list(results)
+
+    def put(self, key: tuple, results: List[dict]):
+        if self.max_entries <= 0 or len(results) > min(self.max_rows, self.max_result_rows):
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = list(results)
+        self._keys_by_niche.setdefault(key[0], set()).add(key)
+        self.rows += len(results)
+        while len(self._entries) > self.max_entries or self.rows > self.max_rows:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, niche: str, matches: Callable[[tuple], bool]):
+        """Drop the entries a row in niche could belong to: those matches() accepts among niche's and the unfiltered."""
+        for bucket in (niche, None):
+            keys = self._keys_by_niche.get(bucket)
+            if not keys:
+                continue
+            for key in [key for key in keys if matches(key)]:
+                self._drop(key)
+                self.invalidations += 1
+
+    def _drop(self, key: tuple):
+        self.rows -= len(self._entries.pop(key))
+        keys = self._keys_by_niche[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_niche[key[0]]
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_niche.clear()
+        self.rows = 0
@@ -0,0 +1,36 @@
+"""
+Running review aggregates per creator
+
+Both backends keep, for every creator, the number of reviews, the sum of
+their ratings and a histogram of star counts, updated as each review is
+written. The public average and the smoothed score are derived from those
+three values, so reading them never touches the reviews themselves.
+"""
+from typing import Dict
+
+STARS = range(1, 6)
+# The smoothed score starts every creator at PRIOR_RATING, weighted as if it
+# came from PRIOR_WEIGHT reviews, so a single 5-star review does not outrank
+# a long record of 4.8s.
+PRIOR_RATING = 3.0
+PRIOR_WEIGHT = 5
+
+
+def empty_rating_stats() -> dict:
+    return {"count": 0, "sum": 0, "histogram": {star: 0 for star in STARS}}
+
+
+def average_rating(stats: dict) -> float:
+    """The rating stored on the creator profile: the mean, rounded to 2 places."""
+    return round(stats["sum"] / stats["count"], 2) if stats["count"] else 0.0
+
+
+def rating_summary(stats: dict) -> Dict[str, object]:
+    return {
+        "count": stats["count"],
+        "average": average_rating(stats),
+        "bayesian_average": round(
+            (PRIOR_RATING * PRIOR_WEIGHT + stats["sum"]) / (PRIOR_WEIGHT + stats["count"]), 2
+        ),
+        "histogram": dict(stats["histogram"]),
+    }
@@ -0,0 +1,164 @@
+"""
+Slotted row types for the in-memory Database, read like the dicts they replace
+
+Ids, foreign keys and low-cardinality values such as niche and status are
+interned. A record also keeps its last JSON encoding (see app.serialization)
+and a write count that app.http_cache derives ETags from.
+"""
+import sys
+from collections.abc import MutableMapping
+from typing import Any, FrozenSet, Iterator, Tuple
+
+
+class Record(MutableMapping):
+    # Subclasses list their fields in __slots__; _json and _version are not fields
+    __slots__ = ("_json", "_version")
+
+    # Fields whose string values are interned on assignment
+    INTERNED: FrozenSet[str] = frozenset()
+    # Fields holding a list of low-cardinality strings, stored as an interned tuple
+    INTERNED_LISTS: FrozenSet[str] = frozenset()
+    FIELDS: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = frozenset(cls.__slots__)
+
+    def __init__(self, **fields: Any):
+        self._json = None
+        self._version = 0
+        for name in self.__slots__:
+            self._set(name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Record":
+        """Build a record from a row dict, ignoring keys that are not fields."""
+        record = cls.__new__(cls)
+        record._json = None
+        record._version = 0
+        for name in cls.__slots__:
+            record._set(name, data.get(name))
+        return record
+
+    def _set(self, name: str, value: Any):
+        if name in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        elif name in self.INTERNED_LISTS and value is not None:
+            value = tuple(sys.intern(v) if type(v) is str else v for v in value)
+        object.__setattr__(self, name, value)
+        self._json = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        self._set(key, value)
+        self._version += 1
+
+    def __delitem__(self, key: str):
+        raise TypeError(f"{type(self).__name__} fields cannot be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return default
+
+    def update(self, data: dict = (), **kwargs: Any):
+        """Assign known fields; keys that are not fields of this record are ignored."""
+        for key, value in dict(data, **kwargs).items():
+            if key in self.FIELDS:
+                self._set(key, value)
+        self._version += 1
+
+    def copy(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]):
+        self._json = None
+        self._version = 0
+        for name, value in zip(self.__slots__, state):
+            self._set(name, value)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.copy()!r})"
+
+
+class UserRecord(Record):
+    __slots__ = ("id", "email", "password_hash", "user_type", "created_at", "updated_at")
+    INTERNED = frozenset({"id", "user_type"})
+
+
+class CreatorProfileRecord(Record):
+    __slots__ = (
+        "id", "user_id", "name", "bio", "niche", "location",
+        "instagram_handle", "youtube_handle", "tiktok_handle",
+        "followers_instagram", "followers_youtube", "followers_tiktok",
+        "engagement_rate", "subscription_tier", "rating", "total_campaigns",
+        "created_at", "updated_at",
+    )
+    INTERNED = frozenset({"id", "user_id", "niche", "location", "subscription_tier"})
+
+
+class BrandProfileRecord(Record):
+    __slots__ = ("id", "user_id", "company_name", "industry", "website", "description",
+                 "created_at", "updated_at")
+    INTERNED = frozenset({"id", "user_id", "industry"})
+
+
+class CampaignRecord(Record):
+    __slots__ = (
+        "id", "brand_id", "creator_id", "title", "description", "budget", "platforms",
+        "duration_days", "status", "niche", "min_followers", "content_requirements",
+        "created_at", "updated_at", "deadline",
+    )
+    INTERNED = frozenset({"id", "brand_id", "creator_id", "status", "niche"})
+    INTERNED_LISTS = frozenset({"platforms"})
+
+
+class SubmissionRecord(Record):
+    __slots__ = ("id", "campaign_id", "content_links", "notes", "submitted_at",
+                 "views", "likes", "comments", "engagement_rate")
+    INTERNED = frozenset({"id", "campaign_id"})
+
+
+class PaymentRecord(Record):
+    __slots__ = ("id", "campaign_id", "amount", "status", "payment_reference", "created_at", "released_at")
+    INTERNED = frozenset({"id", "campaign_id", "status"})
+
+
+class ReviewRecord(Record):
+    __slots__ = ("id", "campaign_id", "creator_id", "brand_id", "rating", "comment", "created_at")
+    INTERNED = frozenset({"id", "campaign_id", "creator_id", "brand_id"})
+
+
+class ApplicationRecord(Record):
+    __slots__ = ("id", "campaign_id", "creator_id", "created_at")
+    INTERNED = frozenset({"id", "campaign_id", "creator_id"})
+
+
+RECORD_TYPES = {
+    "users": UserRecord,
+    "creator_profiles": CreatorProfileRecord,
+    "brand_profiles": BrandProfileRecord,
+    "campaigns": CampaignRecord,
+    "submissions": SubmissionRecord,
+    "payments": PaymentRecord,
+    "reviews": ReviewRecord,
+    "applications": ApplicationRecord,
+}
@@ -0,0 +1,60 @@
+"""
+Background campaign expiry
+
+Every CAMPAIGN_EXPIRY_INTERVAL seconds (default 30; 0 disables it) open
+campaigns whose deadline has passed move to "expired", and their escrowed
+payments are refunded unless CAMPAIGN_EXPIRY_REFUNDS=0. Each storage backend
+finds the due campaigns by deadline order, so a tick costs time in proportion
+to the campaigns it expires.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from app.storage import Storage, storage
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryScheduler:
+    def __init__(self, storage: Storage, interval: float = 30.0, refund: bool = True):
+        self.storage = storage
+        self.interval = interval
+        self.refund = refund
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Waits for a tick in progress to unwind before storage closes
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def tick(self) -> int:
+        expired = await self.storage.expire_campaigns(datetime.utcnow(), self.refund)
+        if expired:
+            logger.info("Expired %d campaign(s)", len(expired))
+        return len(expired)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Campaign expiry failed")
+            await asyncio.sleep(self.interval)
+
+
+scheduler = ExpiryScheduler(
+    storage,
+    interval=float(os.environ.get("CAMPAIGN_EXPIRY_INTERVAL", "30")),
+    refund=os.environ.get("CAMPAIGN_EXPIRY_REFUNDS", "1") != "0",
+)
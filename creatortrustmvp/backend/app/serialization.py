@@ -0,0 +1,53 @@
+"""
+Cached JSON encoding for list responses
+
+Each Record keeps its response model's JSON bytes until a field changes, and
+a list response joins them into an array; other rows are encoded every call.
+"""
+from typing import AsyncIterator, Dict, List, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.records import Record
+
+JSON_MEDIA_TYPE = "application/json"
+# Bodies larger than this are streamed in chunks of about this size
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def encode_record(record: dict, model: Type[BaseModel]) -> bytes:
+    if isinstance(record, Record):
+        cached = record._json
+        if cached is not None and cached[0] is model:
+            return cached[1]
+    fragment = model.model_validate(record).model_dump_json().encode()
+    if isinstance(record, Record):
+        record._json = (model, fragment)
+    return fragment
+
+
+async def _stream_array(fragments: List[bytes]) -> AsyncIterator[bytes]:
+    chunk = [b"["]
+    size = 1
+    for i, fragment in enumerate(fragments):
+        if i:
+            chunk.append(b",")
+        chunk.append(fragment)
+        size += len(fragment) + 1
+        if size >= STREAM_CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    chunk.append(b"]")
+    yield b"".join(chunk)
+
+
+def record_list_response(records: List[dict], model: Type[BaseModel],
+                         headers: Optional[Dict[str, str]] = None) -> Response:
+    """A JSON array response of records, encoded as List[model] would be."""
+    # Encode everything up front so the body reflects the records as they are now
+    fragments = [encode_record(record, model) for record in records]
+    if sum(map(len, fragments)) < STREAM_CHUNK_SIZE:
+        return Response(b"[" + b",".join(fragments) + b"]", media_type=JSON_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(_stream_array(fragments), media_type=JSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,460 @@
+"""
+Storage interface used by the API handlers
+
+The in-memory Database is the default. Setting DATABASE_WAL_DIR makes it
+durable through a write-ahead log and periodic snapshots, and setting
+DATABASE_URL switches the API to the PostgreSQL backend in app.postgres.
+"""
+import asyncio
+import contextlib
+import functools
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.auth import token_cache
+from app.database import Database, db
+from app.events import EventBus
+from app.metrics import MetricFamily
+from app.models import UserType
+from app.pagination import Page
+
+
+class Storage(ABC):
+    # Publisher of campaign and payment events for GET /api/events; None where the backend has none
+    events: Optional[EventBus] = None
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Backend state reported by /metrics, read at scrape time."""
+        return []
+
+    @abstractmethod
+    async def create_user(self, email: str, password_hash: str, user_type: UserType) -> dict: ...
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def update_user_password_hash(self, user_id: str, password_hash: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def create_creator_profile(self, user_id: str, data: dict) -> dict: ...
+
+    @abstractmethod
+    async def update_creator_profile(self, user_id: str, data: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_creator_profile_by_user_id(self, user_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_creator_profile_by_id(self, profile_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def increment_creator_campaigns(self, profile_id: str) -> Optional[dict]: ...
+
+    # cache=False skips the in-memory backend's query result cache, for callers that read each page once
+    @abstractmethod
+    async def search_creators(self, niche: Optional[str] = None, min_followers: Optional[int] = None,
+                              platform: Optional[str] = None, location: Optional[str] = None,
+                              page: Optional[Page] = None, q: Optional[str] = None,
+                              cache: bool = True) -> List[dict]: ...
+
+    @abstractmethod
+    async def match_creators(self, campaign: dict, limit: int) -> List[dict]: ...
+
+    @abstractmethod
+    async def create_brand_profile(self, user_id: str, data: dict) -> dict: ...
+
+    @abstractmethod
+    async def update_brand_profile(self, user_id: str, data: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_brand_profile_by_user_id(self, user_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_brand_profile_by_id(self, profile_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def create_campaign(self, brand_id: str, data: dict) -> dict: ...
+
+    @abstractmethod
+    async def get_campaign(self, campaign_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def update_campaign(self, campaign_id: str, data: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def list_campaigns(self, status: Optional[str] = None, niche: Optional[str] = None,
+                             budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+                             page: Optional[Page] = None, cache: bool = True) -> List[dict]: ...
+
+    @abstractmethod
+    async def expire_campaigns(self, now: datetime, refund: bool = True) -> List[dict]: ...
+
+    @abstractmethod
+    async def get_campaigns_by_brand(self, brand_id: str) -> List[dict]: ...
+
+    @abstractmethod
+    async def get_campaigns_by_creator(self, creator_id: str) -> List[dict]: ...
+
+    @abstractmethod
+    async def get_profile_stats(self, profile_id: str) -> dict: ...
+
+    @abstractmethod
+    async def assign_campaign(self, campaign_id: str, creator_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def create_submission(self, campaign_id: str, creator_id: str, data: dict) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_submission_by_campaign(self, campaign_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_submissions_by_campaign(self, campaign_id: str) -> List[dict]: ...
+
+    @abstractmethod
+    async def create_payment(self, campaign_id: str, amount: float) -> dict: ...
+
+    @abstractmethod
+    async def release_payment(self, payment_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def approve_campaign(self, campaign_id: str) -> Optional[Tuple[dict, Optional[dict]]]: ...
+
+    @abstractmethod
+    async def get_payment(self, payment_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_payment_by_campaign(self, campaign_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_payments_by_campaign(self, campaign_id: str) -> List[dict]: ...
+
+    @abstractmethod
+    async def get_payments_by_user(self, user_id: str, user_type: UserType,
+                                   page: Optional[Page] = None) -> List[dict]: ...
+
+    @abstractmethod
+    async def create_review(self, campaign_id: str, creator_id: str, brand_id: str,
+                            rating: int, comment: str) -> dict: ...
+
+    @abstractmethod
+    async def get_reviews_by_creator(self, creator_id: str, page: Optional[Page] = None) -> List[dict]: ...
+
+    @abstractmethod
+    async def get_rating_summary(self, creator_id: str) -> dict: ...
+
+    @abstractmethod
+    async def recompute_creator_ratings(self, fix: bool = False) -> List[str]: ...
+
+    @abstractmethod
+    async def create_application(self, campaign_id: str, creator_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def get_applicants(self, campaign_id: str, page: Optional[Page] = None) -> List[dict]: ...
+
+    @abstractmethod
+    async def get_applications_by_creator(self, creator_id: str) -> List[dict]: ...
+
+    @abstractmethod
+    async def import_creators(self, rows: List[dict]) -> List[Optional[str]]: ...
+
+    @abstractmethod
+    async def import_campaigns(self, rows: List[dict]) -> List[Optional[str]]: ...
+
+
+# Records pickled per event-loop iteration while a snapshot is taken
+SNAPSHOT_BATCH = 1000
+
+
+def _durable(method):
+    """Await the fsync of what a MemoryStorage write logged, when the log is synchronous."""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with self.db.deferred_durability():
+            result = await method(self, *args, **kwargs)
+        lsn = self.db.take_unsynced_lsn()
+        if lsn:
+            await self.db.wal.wait_durable_async(lsn)
+        return result
+    return wrapper
+
+
+class MemoryStorage(Storage):
+    """Async facade over the in-process Database; every call completes without yielding."""
+
+    def __init__(self, database: Database, snapshot_interval: float = 300.0):
+        self.db = database
+        self.snapshot_interval = snapshot_interval
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    @property
+    def events(self) -> EventBus:
+        return self.db.events
+
+    async def open(self):
+        if self.db.wal is not None and self.snapshot_interval > 0:
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def close(self):
+        if self._snapshot_task is not None:
+            task, self._snapshot_task = self._snapshot_task, None
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if self.db.wal is not None:
+            self.db.wal.close()
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        families = [
+            MetricFamily("database_rows", "gauge", "Rows per in-memory table", ("table",),
+                         {(table,): len(getattr(self.db, table)) for table in self.db.TABLES}),
+            MetricFamily("database_index_entries", "gauge", "Entries per in-memory secondary index", ("index",),
+                         {(index,): size for index, size in self.db.index_sizes().items()}),
+        ]
+        lookups, hit_ratios, evictions, entries, rows = {}, {}, {}, {}, {}
+        for name, cache in (("creator_search", self.db.creator_search_cache),
+                            ("campaign_list", self.db.campaign_list_cache)):
+            lookups[name, "hit"] = cache.hits
+            lookups[name, "miss"] = cache.misses
+            hit_ratios[(name,)] = cache.hits / max(1, cache.hits + cache.misses)
+            evictions[name, "invalidated"] = cache.invalidations
+            evictions[name, "capacity"] = cache.evictions
+            entries[(name,)] = len(cache)
+            rows[(name,)] = cache.rows
+        families += [
+            MetricFamily("query_cache_lookups_total", "counter", "Query result cache lookups, by result",
+                         ("cache", "result"), lookups),
+            MetricFamily("query_cache_hit_ratio", "gauge", "Share of query result cache lookups that hit", ("cache",),
+                         hit_ratios),
+            MetricFamily("query_cache_evictions_total", "counter", "Query result cache entries dropped, by reason",
+                         ("cache", "reason"), evictions),
+            MetricFamily("query_cache_entries", "gauge", "Cached query results", ("cache",), entries),
+            MetricFamily("query_cache_rows", "gauge", "Rows held across cached query results", ("cache",), rows),
+        ]
+        events = self.db.events
+        families += [
+            MetricFamily("event_stream_subscribers", "gauge", "Open /api/events streams", (),
+                         {(): events.subscriber_count}),
+            MetricFamily("events_published_total", "counter", "Campaign and payment events published", (),
+                         {(): events.published}),
+            MetricFamily("events_delivered_total", "counter", "Event frames queued for open streams", (),
+                         {(): events.delivered}),
+            MetricFamily("events_dropped_total", "counter",
+                         "Event frames dropped for streams too far behind, which are sent a resync instead", (),
+                         {(): events.dropped}),
+        ]
+        wal = self.db.wal
+        if wal is not None:
+            families += [
+                MetricFamily("wal_records_written_total", "counter", "Records written to write-ahead log segments", (),
+                             {(): wal.records_written}),
+                MetricFamily("wal_fsyncs_total", "counter", "fsync calls on write-ahead log segments", (),
+                             {(): wal.fsyncs}),
+                MetricFamily("wal_unflushed_records", "gauge", "Records appended but not yet durable", (),
+                             {(): wal.last_lsn - wal.durable_lsn}),
+            ]
+        return families
+
+    async def _snapshot_loop(self):
+        last_lsn = self.db.wal.last_lsn
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self.db.wal.last_lsn == last_lsn:
+                continue
+            last_lsn = await self.write_snapshot()
+
+    async def write_snapshot(self) -> int:
+        """Snapshot the database SNAPSHOT_BATCH records per event-loop turn."""
+        lsn, header, tables = self.db.begin_snapshot()
+        chunks, dumped_lsn = [header], lsn
+        for table, records in tables.items():
+            for start in range(0, len(records), SNAPSHOT_BATCH):
+                dumped_lsn, chunk = self.db.dump_records(table, records[start:start + SNAPSHOT_BATCH])
+                chunks.append(chunk)
+                await asyncio.sleep(0)
+        # Chunks can hold writes made after lsn, which must be in the log before older segments go
+        await self.db.wal.wait_durable_async(dumped_lsn)
+        await asyncio.to_thread(self.db.wal.write_snapshot, lsn, b"".join(chunks))
+        return lsn
+
+    @_durable
+    async def create_user(self, email, password_hash, user_type):
+        return self.db.create_user(email, password_hash, user_type)
+
+    async def get_user_by_email(self, email):
+        return self.db.get_user_by_email(email)
+
+    async def get_user_by_id(self, user_id):
+        return self.db.get_user_by_id(user_id)
+
+    @_durable
+    async def update_user_password_hash(self, user_id, password_hash):
+        user = self.db.update_user_password_hash(user_id, password_hash)
+        token_cache.invalidate_user(user_id)
+        return user
+
+    @_durable
+    async def create_creator_profile(self, user_id, data):
+        return self.db.create_creator_profile(user_id, data)
+
+    @_durable
+    async def update_creator_profile(self, user_id, data):
+        return self.db.update_creator_profile(user_id, data)
+
+    async def get_creator_profile_by_user_id(self, user_id):
+        return self.db.get_creator_profile_by_user_id(user_id)
+
+    async def get_creator_profile_by_id(self, profile_id):
+        return self.db.get_creator_profile_by_id(profile_id)
+
+    @_durable
+    async def increment_creator_campaigns(self, profile_id):
+        return self.db.increment_creator_campaigns(profile_id)
+
+    async def search_creators(self, niche=None, min_followers=None, platform=None, location=None, page=None,
+                              q=None, cache=True):
+        return self.db.search_creators(niche, min_followers, platform, location, page, q, cache)
+
+    async def match_creators(self, campaign, limit):
+        return self.db.match_creators(campaign, limit)
+
+    @_durable
+    async def create_brand_profile(self, user_id, data):
+        return self.db.create_brand_profile(user_id, data)
+
+    @_durable
+    async def update_brand_profile(self, user_id, data):
+        return self.db.update_brand_profile(user_id, data)
+
+    async def get_brand_profile_by_user_id(self, user_id):
+        return self.db.get_brand_profile_by_user_id(user_id)
+
+    async def get_brand_profile_by_id(self, profile_id):
+        return self.db.get_brand_profile_by_id(profile_id)
+
+    @_durable
+    async def create_campaign(self, brand_id, data):
+        return self.db.create_campaign(brand_id, data)
+
+    async def get_campaign(self, campaign_id):
+        return self.db.get_campaign(campaign_id)
+
+    @_durable
+    async def update_campaign(self, campaign_id, data):
+        return self.db.update_campaign(campaign_id, data)
+
+    async def list_campaigns(self, status=None, niche=None, budget_min=None, budget_max=None, page=None,
+                             cache=True):
+        return self.db.list_campaigns(status, niche, budget_min, budget_max, page, cache)
+
+    @_durable
+    async def expire_campaigns(self, now, refund=True):
+        return self.db.expire_campaigns(now, refund)
+
+    async def get_campaigns_by_brand(self, brand_id):
+        return self.db.get_campaigns_by_brand(brand_id)
+
+    async def get_campaigns_by_creator(self, creator_id):
+        return self.db.get_campaigns_by_creator(creator_id)
+
+    async def get_profile_stats(self, profile_id):
+        return self.db.get_profile_stats(profile_id)
+
+    @_durable
+    async def assign_campaign(self, campaign_id, creator_id):
+        return self.db.assign_campaign(campaign_id, creator_id)
+
+    @_durable
+    async def create_submission(self, campaign_id, creator_id, data):
+        return self.db.create_submission(campaign_id, creator_id, data)
+
+    async def get_submission_by_campaign(self, campaign_id):
+        return self.db.get_submission_by_campaign(campaign_id)
+
+    async def get_submissions_by_campaign(self, campaign_id):
+        return self.db.get_submissions_by_campaign(campaign_id)
+
+    @_durable
+    async def create_payment(self, campaign_id, amount):
+        return self.db.create_payment(campaign_id, amount)
+
+    @_durable
+    async def release_payment(self, payment_id):
+        return self.db.release_payment(payment_id)
+
+    @_durable
+    async def approve_campaign(self, campaign_id):
+        return self.db.approve_campaign(campaign_id)
+
+    async def get_payment(self, payment_id):
+        return self.db.get_payment(payment_id)
+
+    async def get_payment_by_campaign(self, campaign_id):
+        return self.db.get_payment_by_campaign(campaign_id)
+
+    async def get_payments_by_campaign(self, campaign_id):
+        return self.db.get_payments_by_campaign(campaign_id)
+
+    async def get_payments_by_user(self, user_id, user_type, page=None):
+        return self.db.get_payments_by_user(user_id, user_type, page)
+
+    @_durable
+    async def create_review(self, campaign_id, creator_id, brand_id, rating, comment):
+        return self.db.create_review(campaign_id, creator_id, brand_id, rating, comment)
+
+    async def get_reviews_by_creator(self, creator_id, page=None):
+        return self.db.get_reviews_by_creator(creator_id, page)
+
+    async def get_rating_summary(self, creator_id):
+        return self.db.get_rating_summary(creator_id)
+
+    @_durable
+    async def recompute_creator_ratings(self, fix=False):
+        return self.db.recompute_creator_ratings(fix)
+
+    @_durable
+    async def create_application(self, campaign_id, creator_id):
+        return self.db.create_application(campaign_id, creator_id)
+
+    async def get_applicants(self, campaign_id, page=None):
+        return self.db.get_applicants(campaign_id, page)
+
+    async def get_applications_by_creator(self, creator_id):
+        return self.db.get_applications_by_creator(creator_id)
+
+    @_durable
+    async def import_creators(self, rows):
+        return self.db.import_creators(rows)
+
+    @_durable
+    async def import_campaigns(self, rows):
+        return self.db.import_campaigns(rows)
+
+
+def create_storage() -> Storage:
+    database_url = os.environ.get("DATABASE_URL")
+    if database_url:
+        from app.postgres import PostgresStorage
+        return PostgresStorage(database_url)
+    wal_dir = os.environ.get("DATABASE_WAL_DIR")
+    if wal_dir:
+        db.enable_durability(
+            wal_dir,
+            fsync_interval=float(os.environ.get("DATABASE_WAL_FSYNC_INTERVAL_MS", "5")) / 1000,
+            synchronous=os.environ.get("DATABASE_WAL_SYNCHRONOUS", "") == "1",
+        )
+    return MemoryStorage(db, float(os.environ.get("DATABASE_SNAPSHOT_INTERVAL", "300")))
+
+
+storage = create_storage()
@@ -0,0 +1,266 @@
+"""
+Write-ahead log and snapshots for the in-memory Database
+
+Each mutation appends the new state of the changed record. Records are
+buffered and a background thread writes and fsyncs them in batches
+(group commit), so a burst of writes shares a single fsync. A snapshot
+captures all tables at a log sequence number (LSN); recovery loads the
+newest snapshot and replays only the segments written after it. A snapshot
+file is a pickled {table: {id: record}} dict, optionally followed by pickled
+(table, [record, ...]) chunks that add rows to it.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+# lsn, payload length, crc32 of payload
+RECORD_HEADER = struct.Struct("<QII")
+
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".bin"
+
+
+def _lsn_from_name(name: str, prefix: str, suffix: str) -> Optional[int]:
+    if name.startswith(prefix) and name.endswith(suffix):
+        try:
+            return int(name[len(prefix):-len(suffix)])
+        except ValueError:
+            return None
+    return None
+
+
+def _resolve(future: "asyncio.Future"):
+    # The waiting request may have been cancelled meanwhile
+    if not future.done():
+        future.set_result(None)
+
+
+class WriteAheadLog:
+    def __init__(self, directory: str, fsync_interval: float = 0.005, synchronous: bool = False):
+        """
+        fsync_interval bounds how long an acknowledged write can stay unsynced.
+        With synchronous=True, append() blocks until its record is fsynced.
+        """
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.synchronous = synchronous
+        os.makedirs(directory, exist_ok=True)
+
+        self.last_lsn = 0
+        self.durable_lsn = 0
+        self.records_written = 0
+        self.fsyncs = 0
+
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._durable = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        # (lsn, seq, loop, future) per coroutine in wait_durable_async, resolved by the flusher
+        self._async_waiters: List[tuple] = []
+        self._async_waiter_seq = itertools.count()
+        self._fd: Optional[int] = None
+        self._segment_start = 0
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _list(self, prefix: str, suffix: str) -> List[Tuple[int, str]]:
+        found = []
+        for name in os.listdir(self.directory):
+            lsn = _lsn_from_name(name, prefix, suffix)
+            if lsn is not None:
+                found.append((lsn, name))
+        return sorted(found)
+
+    def _fsync_directory(self):
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load(self) -> Tuple[Optional[dict], Iterator[Tuple[str, dict]]]:
+        """
+        Return the newest snapshot (or None) and an iterator over the
+        (table, record) pairs logged after it. A torn record at the end of
+        the log is truncated away. Must be consumed before start().
+        """
+        snapshot = None
+        snapshot_lsn = 0
+        snapshots = self._list(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX)
+        if snapshots:
+            snapshot_lsn, name = snapshots[-1]
+            with open(self._path(name), "rb") as f:
+                snapshot = pickle.load(f)
+                # Snapshots taken in batches follow the (empty) tables with (table, records) chunks
+                while True:
+                    try:
+                        table, records = pickle.load(f)
+                    except EOFError:
+                        break
+                    rows = snapshot.setdefault(table, {})
+                    for record in records:
+                        rows[record["id"]] = record
+        self.last_lsn = self.durable_lsn = snapshot_lsn
+        return snapshot, self._replay(snapshot_lsn)
+
+    def _replay(self, after_lsn: int) -> Iterator[Tuple[str, dict]]:
+        for _, name in self._list(SEGMENT_PREFIX, SEGMENT_SUFFIX):
+            path = self._path(name)
+            with open(path, "rb") as f:
+                data = f.read()
+            offset = 0
+            while offset < len(data):
+                header_end = offset + RECORD_HEADER.size
+                if header_end > len(data):
+                    break
+                lsn, length, crc = RECORD_HEADER.unpack_from(data, offset)
+                payload = data[header_end:header_end + length]
+                if len(payload) != length or zlib.crc32(payload) != crc:
+                    break
+                offset = header_end + length
+                if lsn <= after_lsn:
+                    continue
+                self.last_lsn = self.durable_lsn = lsn
+                yield pickle.loads(payload)
+            if offset < len(data):
+                # Torn write from a crash: drop the partial record and stop, since
+                # nothing after it can have been acknowledged as durable.
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+                    os.fsync(f.fileno())
+                return
+
+    def start(self):
+        self._open_segment(self.last_lsn + 1)
+        self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def _open_segment(self, start_lsn: int):
+        name = f"{SEGMENT_PREFIX}{start_lsn:020d}{SEGMENT_SUFFIX}"
+        self._fd = os.open(self._path(name), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._segment_start = start_lsn
+        self._fsync_directory()
+
+    def append(self, table: str, record: dict, wait: bool = True) -> int:
+        """
+        With wait=False a synchronous log returns before the fsync; the caller
+        must then pass the returned LSN to wait_durable().
+        """
+        payload = pickle.dumps((table, record), pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.last_lsn += 1
+            lsn = self.last_lsn
+            self._buffer += RECORD_HEADER.pack(lsn, len(payload), zlib.crc32(payload))
+            self._buffer += payload
+        if self.synchronous and wait:
+            self.wait_durable(lsn)
+        return lsn
+
+    def wait_durable(self, lsn: int):
+        with self._lock:
+            self._wakeup.set()
+            while self.durable_lsn < lsn and not self._closed:
+                self._durable.wait()
+
+    async def wait_durable_async(self, lsn: int):
+        """wait_durable without blocking the event loop; the flusher resolves the future."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.durable_lsn >= lsn or self._closed:
+                return
+            future = loop.create_future()
+            heapq.heappush(self._async_waiters, (lsn, next(self._async_waiter_seq), loop, future))
+            self._wakeup.set()
+        await future
+
+    def _notify_durable(self):
+        # Under self._lock, after durable_lsn advanced or the log closed
+        self._durable.notify_all()
+        waiters = self._async_waiters
+        while waiters and (waiters[0][0] <= self.durable_lsn or self._closed):
+            _, _, loop, future = heapq.heappop(waiters)
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.fsync_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write and fsync everything appended so far."""
+        with self._io_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+                data, self._buffer = self._buffer, bytearray()
+                lsn = self.last_lsn
+            os.write(self._fd, data)
+            os.fsync(self._fd)
+            with self._lock:
+                self.records_written += lsn - self.durable_lsn
+                self.fsyncs += 1
+                self.durable_lsn = lsn
+                self._notify_durable()
+
+    def rotate(self) -> int:
+        """Start a new segment and return the last LSN covered by the old ones."""
+        with self._io_lock:
+            with self._lock:
+                data, self._buffer = self._buffer, bytearray()
+                lsn = self.last_lsn
+            if data:
+                os.write(self._fd, data)
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._open_segment(lsn + 1)
+            with self._lock:
+                self.records_written += lsn - self.durable_lsn
+                self.durable_lsn = lsn
+                self._notify_durable()
+        return lsn
+
+    def write_snapshot(self, lsn: int, payload: bytes):
+        """Persist a snapshot taken at lsn and drop the log segments it covers."""
+        path = self._path(f"{SNAPSHOT_PREFIX}{lsn:020d}{SNAPSHOT_SUFFIX}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._fsync_directory()
+
+        for snapshot_lsn, name in self._list(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX):
+            if snapshot_lsn < lsn:
+                os.remove(self._path(name))
+        # Segments are contiguous, so one starting at or before lsn ends before lsn + 1
+        for start_lsn, name in self._list(SEGMENT_PREFIX, SEGMENT_SUFFIX):
+            if start_lsn <= lsn and start_lsn != self._segment_start:
+                os.remove(self._path(name))
+
+    def close(self):
+        if self._fd is None:
+            return
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._notify_durable()
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        os.close(self._fd)
+        self._fd = None
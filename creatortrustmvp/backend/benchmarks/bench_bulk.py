@@ -0,0 +1,90 @@
+"""
+Throughput of the NDJSON bulk import and export against the in-memory Database.
+
+    python -m benchmarks.bench_bulk --creators 50000
+
+Imports the same creators three ways into empty databases: one
+create_user/create_creator_profile call pair per row (what the profile
+endpoint does, minus HTTP and bcrypt), Database.import_creators with
+already-validated rows, and import_ndjson end to end from NDJSON bytes. Then
+exports the table back to NDJSON.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.bulk import export_ndjson, import_ndjson
+from app.database import Database
+from app.models import UserType
+from app.storage import MemoryStorage
+
+CHUNK_SIZE = 64 * 1024
+
+
+def creator_row(i: int) -> dict:
+    return {
+        "email": f"creator{i}@example.com",
+        "name": f"Creator {i}",
+        "bio": "Home workouts and meal prep",
+        "niche": ("fitness", "food", "tech", "travel")[i % 4],
+        "location": ("Lagos", "Accra", "Nairobi")[i % 3],
+        "instagram_handle": f"creator{i}",
+        "youtube_handle": None,
+        "tiktok_handle": None,
+    }
+
+
+async def chunks(data: bytes):
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+async def run(count: int) -> dict:
+    rows = [creator_row(i) for i in range(count)]
+    ndjson = b"".join(json.dumps(row).encode() + b"\n" for row in rows)
+
+    db = Database()
+    started = time.perf_counter()
+    for row in rows:
+        data = dict(row)
+        user = db.create_user(data.pop("email"), "", UserType.CREATOR)
+        db.create_creator_profile(user["id"], data)
+    per_row = time.perf_counter() - started
+
+    db = Database()
+    started = time.perf_counter()
+    db.import_creators(rows)
+    batched = time.perf_counter() - started
+
+    storage = MemoryStorage(Database())
+    started = time.perf_counter()
+    result = await import_ndjson(storage, "creators", chunks(ndjson))
+    end_to_end = time.perf_counter() - started
+    assert result["imported"] == count, result
+
+    started = time.perf_counter()
+    exported = 0
+    async for chunk in export_ndjson(storage, "creators"):
+        exported += chunk.count(b"\n")
+    export = time.perf_counter() - started
+    assert exported == count
+
+    return {
+        "creators": count,
+        "per_row_calls_per_second": round(count / per_row),
+        "import_creators_per_second": round(count / batched),
+        "ndjson_import_per_second": round(count / end_to_end),
+        "ndjson_export_per_second": round(count / export),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--creators", type=int, default=50_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.creators)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
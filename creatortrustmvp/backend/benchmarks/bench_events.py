@@ -0,0 +1,229 @@
+"""
+Capacity of the campaign event stream.
+
+    python -m benchmarks.bench_events --subscribers 50000 --events 20000
+    python -m benchmarks.bench_events --subscribers 50000 --http-streams 2000
+
+Opens --subscribers subscriptions on an EventBus, one per user, each drained
+by its own task the way the /api/events stream drains it, with --slow-share
+of them never reading. Publishes --events events addressed to two random
+users each, and reports the publish cost, the delay until a reading
+subscriber has the frame, how long the event loop stalls while heartbeats go
+out to every stream (the maximum is set by full garbage collections over a
+heap of that many tasks, not by the heartbeat), and the memory held per idle
+subscription. A final burst to some slow users
+shows their queues staying within EVENTS_QUEUE_SIZE frames, the rest
+dropped in favour of a resync.
+
+With --http-streams, also serves the app with uvicorn on a local port and
+holds that many real /api/events connections open, reporting the server's
+memory per connection and the delay from a campaign assignment made over
+HTTP to its event arriving on the creator's stream. Open file descriptors
+limit how many real connections one machine can hold, hence a separate
+count.
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import threading
+import time
+import tracemalloc
+
+from app.events import EventBus
+
+CAMPAIGN = {
+    "title": "Launch", "description": "", "budget": 500.0, "platforms": ["instagram"], "duration_days": 14,
+    "niche": "fitness", "min_followers": 0, "content_requirements": "",
+}
+
+
+def percentile(values: list, share: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(share * len(values)))], 3)
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+
+async def drain(subscription, received: dict):
+    while True:
+        await subscription.next_chunk()
+        received[subscription.user_id] = time.perf_counter()
+
+
+async def run_bus(args) -> dict:
+    bus = EventBus(heartbeat=0)
+    users = [f"user-{i}" for i in range(args.subscribers)]
+    slow = set(random.Random(args.seed).sample(users, int(args.slow_share * len(users))))
+    received: dict = {}
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    subscriptions = [bus.subscribe(user_id) for user_id in users]
+    tasks = [asyncio.create_task(drain(s, received)) for s in subscriptions if s.user_id not in slow]
+    await asyncio.sleep(0)
+    idle_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+
+    rnd = random.Random(args.seed)
+    publish_us, delays = [], []
+    for i in range(args.events):
+        targets = rnd.sample(users, 2)
+        started = time.perf_counter()
+        bus.publish("campaign.assigned", targets, {"campaign_id": f"campaign-{i}", "status": "assigned"})
+        publish_us.append(1e6 * (time.perf_counter() - started))
+        if i % 100 == 0:
+            # Let the readers run, as the event loop would between requests
+            await asyncio.sleep(0)
+            delays += [1000 * (received[user_id] - started) for user_id in targets if user_id in received]
+            received.clear()
+    await asyncio.sleep(0)
+
+    # A burst for a few slow users, far beyond what their queues hold
+    burst_users = sorted(slow)[:100]
+    for i in range(2 * bus.queue_size):
+        bus.publish("campaign.updated", burst_users, {"campaign_id": f"burst-{i}", "status": "open"})
+
+    # Heartbeats back to back for a while, timing the waits of a task that only yields
+    bus.heartbeat = 0.05
+    subscriptions.append(bus.subscribe("heartbeat-probe"))
+    stalls, last = [], time.perf_counter()
+    deadline = last + 2
+    while last < deadline:
+        await asyncio.sleep(0)
+        now = time.perf_counter()
+        stalls.append(1000 * (now - last))
+        last = now
+
+    slow_frames = max((len(s.frames) for s in subscriptions if s.user_id in slow), default=0)
+    for subscription in subscriptions:
+        bus.unsubscribe(subscription)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "subscribers": args.subscribers,
+        "slow_subscribers": len(slow),
+        "events": args.events,
+        "publish_p50_us": percentile(publish_us, 0.5),
+        "publish_p99_us": percentile(publish_us, 0.99),
+        "delivery_p50_ms": percentile(delays, 0.5) if delays else None,
+        "delivery_p99_ms": percentile(delays, 0.99) if delays else None,
+        "heartbeat_loop_stall_p999_ms": percentile(stalls, 0.999),
+        "heartbeat_loop_stall_max_ms": round(max(stalls), 3),
+        "bytes_per_idle_subscription": round(idle_bytes / args.subscribers),
+        "queue_size": bus.queue_size,
+        "max_frames_queued_by_slow_subscriber": slow_frames,
+        "slow_subscribers_resyncing": sum(s.missed for s in subscriptions),
+        "frames_dropped": bus.dropped,
+    }
+
+
+async def run_http(args) -> dict:
+    import httpx
+    import uvicorn
+
+    from app.auth import create_access_token
+    from app.database import Database
+    from app.main import app
+    from app.models import UserType
+    from app.storage import storage
+
+    db = Database()
+    storage.db = db
+    brand_user = db.create_user("brand@bench.example.com", "", UserType.BRAND)
+    brand = db.create_brand_profile(brand_user["id"], {"company_name": "Brand", "industry": "fitness",
+                                                       "website": None, "description": ""})
+    creators = []
+    for i in range(args.http_streams):
+        user = db.create_user(f"creator{i}@bench.example.com", "", UserType.CREATOR)
+        profile = db.create_creator_profile(user["id"], {"name": f"Creator {i}", "bio": "", "niche": "fitness",
+                                                         "location": "Lagos"})
+        creators.append((user["id"], profile["id"]))
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning", backlog=4096))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    arrived: dict = {}
+    opened = asyncio.Semaphore(200)
+    base_rss = rss_mb()
+
+    async def listen(client: httpx.AsyncClient, user_id: str, ready: asyncio.Event):
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+        async with opened:
+            stream = client.stream("GET", "/api/events", headers=headers)
+            response = await stream.__aenter__()
+        ready.set()
+        try:
+            async for chunk in response.aiter_bytes():
+                if b"campaign.assigned" in chunk:
+                    arrived[user_id] = time.perf_counter()
+        finally:
+            await stream.__aexit__(None, None, None)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=None) as client:
+        readies = [asyncio.Event() for _ in creators]
+        tasks = [asyncio.create_task(listen(client, user_id, ready))
+                 for (user_id, _), ready in zip(creators, readies)]
+        for ready in readies:
+            await ready.wait()
+        while db.events.subscriber_count < len(creators):
+            await asyncio.sleep(0.05)
+        # Client and server share this process, so the growth includes both ends of every connection
+        per_connection_kb = 1024 * (rss_mb() - base_rss) / len(creators)
+
+        brand_headers = {"Authorization": f"Bearer {create_access_token({'sub': brand_user['id']})}"}
+        delays = []
+        try:
+            for user_id, profile_id in random.Random(args.seed).sample(creators, min(200, len(creators))):
+                campaign = db.create_campaign(brand["id"], CAMPAIGN)
+                started = time.perf_counter()
+                response = await client.post(f"/api/campaigns/{campaign['id']}/assign", headers=brand_headers,
+                                             json={"creator_id": profile_id})
+                response.raise_for_status()
+                while user_id not in arrived:
+                    await asyncio.sleep(0.0005)
+                delays.append(1000 * (arrived[user_id] - started))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    server.should_exit = True
+    thread.join(10)
+    return {
+        "streams": len(creators),
+        "rss_kb_per_connection_both_ends": round(per_connection_kb, 1),
+        "assign_to_event_p50_ms": percentile(delays, 0.5),
+        "assign_to_event_p99_ms": percentile(delays, 0.99),
+    }
+
+
+async def run(args) -> dict:
+    results = {"bus": await run_bus(args)}
+    if args.http_streams:
+        results["http"] = await run_http(args)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=50_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--slow-share", type=float, default=0.1, help="share of subscribers that never read")
+    parser.add_argument("--http-streams", type=int, default=0, help="real /api/events connections to hold open")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Cost of a campaign expiry tick.
+
+    python -m benchmarks.bench_expiry --campaigns 200000
+
+Gives open campaigns deadlines spread over 30 days, some with an escrowed
+payment, then advances a simulated clock one minute per tick for a day.
+Reports the mean tick time and the cost per expired campaign next to one
+sweep over the whole campaigns table, which is what a tick would cost
+without the deadline heap.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.database import Database
+from app.models import CampaignStatus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--campaigns", type=int, default=200_000)
+    parser.add_argument("--ticks", type=int, default=1440)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    db = Database()
+    start_time = datetime.utcnow()
+    for i in range(args.campaigns):
+        campaign = db.create_campaign(f"brand-{i % 1000}", {
+            "title": "Campaign", "description": "", "budget": float(rnd.randrange(50, 5000)),
+            "platforms": ["instagram"], "duration_days": 30, "niche": "tech", "min_followers": 0,
+            "content_requirements": "",
+        })
+        deadline = start_time + timedelta(seconds=rnd.uniform(0, 30 * 86400))
+        db.update_campaign(campaign["id"], {"deadline": deadline})
+        if i % 4 == 0:
+            db.create_payment(campaign["id"], 100.0)
+
+    timings, expired = [], 0
+    for tick in range(1, args.ticks + 1):
+        now = start_time + timedelta(minutes=tick)
+        started = time.perf_counter()
+        expired += len(db.expire_campaigns(now))
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    [c for c in db.campaigns.values() if c["status"] == CampaignStatus.OPEN.value and c["deadline"] <= now]
+    sweep = time.perf_counter() - started
+
+    print(json.dumps({
+        "campaigns": args.campaigns,
+        "ticks": args.ticks,
+        "expired": expired,
+        "mean_tick_ms": round(1000 * sum(timings) / len(timings), 4),
+        "us_per_expired_campaign": round(1e6 * sum(timings) / max(expired, 1), 1),
+        "full_sweep_ms": round(1000 * sweep, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
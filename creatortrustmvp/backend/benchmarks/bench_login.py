@@ -0,0 +1,94 @@
+"""
+Latency of unrelated requests while the API is handling a login storm.
+
+    BCRYPT_ROUNDS=12 python -m benchmarks.bench_login --concurrency 32 --duration 5
+    python -m benchmarks.bench_login --inline   # hash on the event loop, for comparison
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+import app.main
+from app import auth
+from app.main import app as api
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args):
+    if args.inline:
+        async def verify_inline(plain_password, hashed_password):
+            return auth.verify_password(plain_password, hashed_password)
+        app.main.verify_password_async = verify_inline
+
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        emails = [f"storm{i}@example.com" for i in range(args.users)]
+        for email in emails:
+            await client.post("/api/auth/register", json={
+                "email": email, "password": "correct horse", "user_type": "creator"
+            })
+
+        deadline = time.perf_counter() + args.duration
+        logins = 0
+        max_queue_depth = 0
+
+        async def login_worker(worker: int):
+            nonlocal logins
+            i = worker
+            while time.perf_counter() < deadline:
+                response = await client.post("/api/auth/login", json={
+                    "email": emails[i % len(emails)], "password": "correct horse"
+                })
+                assert response.status_code == 200, response.text
+                logins += 1
+                i += args.concurrency
+
+        probe_latencies = []
+
+        async def probe():
+            nonlocal max_queue_depth
+            while time.perf_counter() < deadline:
+                # Time from when the probe wanted to send until it got its answer, so
+                # a blocked event loop shows up even while the probe is sleeping.
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                await client.get("/healthz")
+                probe_latencies.append((time.perf_counter() - start - 0.01) * 1000)
+                max_queue_depth = max(max_queue_depth, auth.password_queue_depth())
+
+        await asyncio.gather(probe(), *(login_worker(w) for w in range(args.concurrency)))
+
+    print(json.dumps({
+        "mode": "inline" if args.inline else "thread_pool",
+        "bcrypt_rounds": auth.BCRYPT_ROUNDS,
+        "hash_workers": auth.PASSWORD_HASH_WORKERS,
+        "concurrency": args.concurrency,
+        "logins_per_second": round(logins / args.duration, 1),
+        "max_queue_depth": max_queue_depth,
+        "healthz_ms": {
+            "p50": round(statistics.median(probe_latencies), 2),
+            "p99": round(percentile(probe_latencies, 0.99), 2),
+            "max": round(max(probe_latencies), 2),
+        },
+    }, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--inline", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Campaign-creator match latency.
+
+    python -m benchmarks.bench_matching --profiles 1000000
+
+Fills the creator columns with profiles spread over eight niches (random
+followers, handles, ratings and engagement) and times match queries for
+campaigns with different platforms and follower minimums, plus the cost of
+the incremental column update done on every profile write.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from app.database import Database
+from app.matching import PLATFORMS
+from app.records import CreatorProfileRecord
+
+NICHES = ["fitness", "beauty", "tech", "food", "travel", "gaming", "fashion", "finance"]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(1000 * ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+def make_profile(rnd: random.Random, i: int, now: datetime) -> CreatorProfileRecord:
+    profile = {
+        "id": f"creator-{i}",
+        "user_id": f"user-{i}",
+        "name": f"Creator {i}",
+        "bio": "",
+        "niche": rnd.choice(NICHES),
+        "location": "Lagos",
+        "engagement_rate": round(rnd.uniform(0, 12), 2),
+        "subscription_tier": "free",
+        "rating": round(rnd.uniform(0, 5), 2),
+        "total_campaigns": rnd.randint(0, 40),
+        "created_at": now,
+        "updated_at": now,
+    }
+    for platform in PLATFORMS:
+        if rnd.random() < 0.6:
+            profile[f"{platform}_handle"] = f"@creator{i}"
+            profile[f"followers_{platform}"] = int(rnd.paretovariate(1.2) * 1000)
+        else:
+            profile[f"followers_{platform}"] = 0
+    return CreatorProfileRecord.from_dict(profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    now = datetime.utcnow()
+    db = Database()
+    # Only the columns are filled; the other creator indexes play no part in matching
+    start = time.perf_counter()
+    for i in range(args.profiles):
+        profile = make_profile(rnd, i, now)
+        db.creator_profiles[profile["id"]] = profile
+        db.creator_columns.put(profile)
+    build_seconds = time.perf_counter() - start
+
+    timings = []
+    for _ in range(args.queries):
+        campaign = {
+            "niche": rnd.choice(NICHES),
+            "platforms": rnd.sample(PLATFORMS, rnd.randint(1, 3)),
+            "min_followers": rnd.choice([0, 1_000, 10_000, 100_000]),
+        }
+        start = time.perf_counter()
+        db.match_creators(campaign, args.limit)
+        timings.append(time.perf_counter() - start)
+
+    updates = []
+    for _ in range(10_000):
+        profile = db.creator_profiles[f"creator-{rnd.randrange(args.profiles)}"]
+        profile["rating"] = round(rnd.uniform(0, 5), 2)
+        start = time.perf_counter()
+        db.creator_columns.put(profile)
+        updates.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "profiles": args.profiles,
+        "build_seconds": round(build_seconds, 1),
+        "queries": len(timings),
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+        "update_p50_us": round(1000 * percentile(updates, 0.50), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Resident memory per 100k rows for plain dict rows versus slotted records.
+
+    python -m benchmarks.bench_memory --rows 100000
+
+Each layout is measured in a fresh subprocess. Row payloads are decoded
+from JSON one at a time, like request bodies, so repeated values such as
+niche or status start out as separate string objects.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from app.records import CampaignRecord, CreatorProfileRecord, PaymentRecord
+
+NICHES = ["fitness", "beauty", "tech", "food", "travel", "gaming", "fashion", "finance"]
+LOCATIONS = ["Lagos", "Accra", "Nairobi", "London", "New York", "Berlin"]
+
+
+def campaign_row(i: int, brand_ids: list) -> dict:
+    now = datetime.utcnow()
+    row = json.loads(json.dumps({
+        "id": str(uuid.uuid4()),
+        "brand_id": brand_ids[i % len(brand_ids)],
+        "creator_id": None,
+        "title": f"Campaign {i}",
+        "description": "Short-form video for the new range",
+        "budget": float(100 + i % 5000),
+        "platforms": ["instagram", "tiktok"],
+        "duration_days": 14,
+        "status": "open",
+        "niche": NICHES[i % len(NICHES)],
+        "min_followers": 1000,
+        "content_requirements": "One reel and two stories",
+    }))
+    row.update({"created_at": now, "updated_at": now, "deadline": now + timedelta(days=14)})
+    return row
+
+
+def creator_row(i: int, brand_ids: list) -> dict:
+    now = datetime.utcnow()
+    row = json.loads(json.dumps({
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "name": f"Creator {i}",
+        "bio": "Creating everyday content",
+        "niche": NICHES[i % len(NICHES)],
+        "location": LOCATIONS[i % len(LOCATIONS)],
+        "instagram_handle": f"creator{i}",
+        "youtube_handle": None,
+        "tiktok_handle": None,
+        "followers_instagram": i % 100_000,
+        "followers_youtube": 0,
+        "followers_tiktok": 0,
+        "engagement_rate": 0.0,
+        "subscription_tier": "free",
+        "rating": 0.0,
+        "total_campaigns": 0,
+    }))
+    row.update({"created_at": now, "updated_at": now})
+    return row
+
+
+def payment_row(i: int, brand_ids: list) -> dict:
+    payment_id = str(uuid.uuid4())
+    row = json.loads(json.dumps({
+        "id": payment_id,
+        "campaign_id": brand_ids[i % len(brand_ids)],
+        "amount": float(100 + i % 5000),
+        "status": "escrowed",
+        "payment_reference": f"PAY-{payment_id[:8]}",
+        "released_at": None,
+    }))
+    row["created_at"] = datetime.utcnow()
+    return row
+
+
+ENTITIES = {
+    "campaigns": (campaign_row, CampaignRecord),
+    "creator_profiles": (creator_row, CreatorProfileRecord),
+    "payments": (payment_row, PaymentRecord),
+}
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+def measure(entity: str, layout: str, rows: int) -> int:
+    make_row, record_type = ENTITIES[entity]
+    parents = [str(uuid.uuid4()) for _ in range(1000)]
+    before = rss_bytes()
+    table = {}
+    for i in range(rows):
+        row = make_row(i, parents)
+        table[row["id"]] = row if layout == "dict" else record_type.from_dict(row)
+    return rss_bytes() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--entity", choices=sorted(ENTITIES), action="append")
+    parser.add_argument("--measure", nargs=2, metavar=("ENTITY", "LAYOUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(measure(args.measure[0], args.measure[1], args.rows))
+        return
+
+    results = {}
+    for entity in args.entity or sorted(ENTITIES):
+        per_layout = {}
+        for layout in ("dict", "record"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory", "--rows", str(args.rows),
+                 "--measure", entity, layout],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            per_layout[layout] = int(output) * 100_000 // args.rows
+        per_layout["saved_percent"] = round(100 * (1 - per_layout["record"] / per_layout["dict"]), 1)
+        results[entity] = per_layout
+    print(json.dumps({"rss_bytes_per_100k_rows": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
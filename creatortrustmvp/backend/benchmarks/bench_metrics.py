@@ -0,0 +1,122 @@
+"""
+Overhead of the metrics instrumentation.
+
+    python -m benchmarks.bench_metrics --requests 50000
+
+Times a stub ASGI app that only sends a response, bare and wrapped in
+MetricsMiddleware, which isolates the per-request cost of the middleware;
+rounds alternate and the best round of each side is kept. Reports the added
+time and what it is as a share of a core at 10k requests per second, and as
+a share of GET /healthz and GET /api/campaigns/{id} through the app's full
+middleware stack (whose own run-to-run noise is larger than the middleware
+cost, so they are not compared directly). Does the same for the timing
+wrapper DATABASE_METHOD_METRICS=1 puts on Database methods.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.database import Database
+from app.main import app as api
+from app.metrics import MetricsMiddleware, _timed, database_latency
+from app.storage import storage
+
+CAMPAIGN = {
+    "title": "Launch", "description": "", "budget": 500.0, "platforms": ["instagram"], "duration_days": 14,
+    "niche": "fitness", "min_followers": 0, "content_requirements": "",
+}
+
+
+class StubRoute:
+    path = "/stub/{id}"
+
+
+async def stub_app(scope, receive, send):
+    scope["route"] = StubRoute
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def scope_for(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "server": ("bench", 80), "client": ("127.0.0.1", 1), "app": api,
+    }
+
+
+async def time_requests(stack, path: str, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        await stack(scope_for(path), receive, send)
+    return (time.perf_counter() - started) / count
+
+
+def time_calls(method, args: tuple, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        method(*args)
+    return (time.perf_counter() - started) / count
+
+
+def overhead(bare: float, instrumented: float) -> dict:
+    added = instrumented - bare
+    return {
+        "bare_us": round(1e6 * bare, 2),
+        "instrumented_us": round(1e6 * instrumented, 2),
+        "added_us": round(1e6 * added, 2),
+        # Share of one core spent on instrumentation at 10k requests (or calls) per second
+        "cpu_share_at_10k_per_second": f"{100 * added * 10_000:.2f}%",
+    }
+
+
+async def run(args) -> dict:
+    db = Database()
+    campaign = db.create_campaign("bench-brand", CAMPAIGN)
+    storage.db = db
+
+    results = {}
+    stacks = {False: stub_app, True: MetricsMiddleware(stub_app)}
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(args.rounds):
+        for metrics in (False, True):
+            best[metrics] = min(best[metrics], await time_requests(stacks[metrics], "/stub/1", args.requests))
+    results["MetricsMiddleware"] = overhead(best[False], best[True])
+
+    added = best[True] - best[False]
+    stack = api.build_middleware_stack()
+    for path in ("/healthz", f"/api/campaigns/{campaign['id']}"):
+        request = min([await time_requests(stack, path, args.requests) for _ in range(args.rounds)])
+        results[f"GET {path.replace(campaign['id'], '{id}')}"] = {
+            "request_us": round(1e6 * request, 2),
+            "middleware_share": f"{100 * added / request:.2f}%",
+        }
+
+    timed = _timed(Database.get_campaign, database_latency.labels(("get_campaign",)))
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(args.rounds):
+        best[False] = min(best[False], time_calls(Database.get_campaign, (db, campaign["id"]), args.requests))
+        best[True] = min(best[True], time_calls(timed, (db, campaign["id"]), args.requests))
+    results["Database.get_campaign"] = overhead(best[False], best[True])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50_000, help="requests (or calls) per round")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
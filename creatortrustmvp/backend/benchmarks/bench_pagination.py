@@ -0,0 +1,95 @@
+"""
+Cost of fetching a page of campaigns, creators or applicants at increasing depth.
+
+    python -m benchmarks.bench_pagination --rows 100000 --limit 20
+
+Walks the cursor chain and reports the mean latency of the first and the
+last pages next to building the full unpaginated list. Half of the creators
+apply to one popular campaign.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.database import Database
+from app.pagination import (
+    APPLICANT_SORT_KEYS, CAMPAIGN_SORT_KEYS, CREATOR_SORT_KEYS, fetch_size, finish_page, parse_page
+)
+
+NICHES = ["fitness", "beauty", "tech", "food", "travel", "gaming", "fashion", "finance"]
+
+
+def seed(db: Database, rows: int) -> str:
+    """Fill the database and return the id of the popular campaign."""
+    rnd = random.Random(0)
+    popular = None
+    for i in range(rows):
+        user_id = f"bench-user-{i}"
+        profile = db.create_creator_profile(user_id, {"name": f"Creator {i}", "bio": "", "niche": rnd.choice(NICHES),
+                                            "location": "Lagos"})
+        db.update_creator_profile(user_id, {"followers_instagram": rnd.randrange(100_000),
+                                            "rating": round(rnd.uniform(1, 5), 1)})
+        db.create_campaign("bench-brand", {"title": "Campaign", "description": "", "budget": float(rnd.randrange(50, 5000)),
+                                           "platforms": ["instagram"], "duration_days": rnd.randrange(1, 60),
+                                           "niche": rnd.choice(NICHES), "min_followers": 0,
+                                           "content_requirements": ""})
+        popular = popular or next(iter(db.campaigns))
+        if i % 2 == 0:
+            db.create_application(popular, profile["id"])
+    return popular
+
+
+def walk_pages(fetch, sort_keys, sort: str, limit: int) -> list:
+    """Return the latency of every page in the cursor chain."""
+    timings, cursor = [], None
+    while True:
+        start = time.perf_counter()
+        page = parse_page(sort, cursor, limit, sort_keys, sort)
+        _, cursor = finish_page(fetch(fetch_size(page)), page, sort_keys)
+        timings.append(time.perf_counter() - start)
+        if not cursor:
+            return timings
+
+
+def mean_ms(timings: list) -> float:
+    return round(1000 * sum(timings) / len(timings), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    db = Database()
+    popular = seed(db, args.rows)
+
+    cases = {
+        "campaigns -budget": (lambda page: db.list_campaigns(page=page), CAMPAIGN_SORT_KEYS, "-budget"),
+        "campaigns deadline, niche=tech": (lambda page: db.list_campaigns(niche="tech", page=page),
+                                           CAMPAIGN_SORT_KEYS, "deadline"),
+        "creators -rating": (lambda page: db.search_creators(page=page), CREATOR_SORT_KEYS, "-rating"),
+        "creators -followers, niche=food": (lambda page: db.search_creators(niche="food", page=page),
+                                            CREATOR_SORT_KEYS, "-followers"),
+        "applicants -rating, popular campaign": (lambda page: db.get_applicants(popular, page=page),
+                                                 APPLICANT_SORT_KEYS, "-rating"),
+    }
+    results = {}
+    for name, (fetch, sort_keys, sort) in cases.items():
+        timings = walk_pages(fetch, sort_keys, sort, args.limit)
+        start = time.perf_counter()
+        fetch(None)
+        full_list = time.perf_counter() - start
+        tenth = max(1, len(timings) // 10)
+        results[name] = {
+            "pages": len(timings),
+            "first_pages_ms": mean_ms(timings[:tenth]),
+            "last_pages_ms": mean_ms(timings[-tenth:]),
+            "full_list_ms": round(1000 * full_list, 3),
+        }
+    print(json.dumps({"rows": args.rows, "limit": args.limit, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
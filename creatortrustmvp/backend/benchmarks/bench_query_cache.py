@@ -0,0 +1,91 @@
+"""
+Effect of the query result cache on repeated creator searches and campaign listings.
+
+    python -m benchmarks.bench_query_cache --creators 20000 --operations 50000
+
+Seeds the synthetic dataset, then runs the same random mix of operations
+with the cache enabled and disabled: first pages of filtered searches and
+listings (niche, location and status drawn with a skew, so some filters are
+far more common than others) interleaved with --write-share profile updates
+and campaign assignments, which invalidate entries. Reports the mean query
+latency of both runs and the hit ratio.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.database import Database
+from app.pagination import Page
+from benchmarks.dataset import LOCATIONS, NICHES, seed
+
+PAGE_SIZE = 20
+
+
+def skewed(rnd: random.Random, values: list):
+    """values[0] is drawn about twice as often as values[1], three times as often as values[2], ..."""
+    return rnd.choices(values, weights=[1 / (i + 1) for i in range(len(values))])[0]
+
+
+def operations(world: dict, count: int, write_share: float, seed_value: int) -> list:
+    rnd = random.Random(seed_value)
+    page = Page("rating", True, None, PAGE_SIZE + 1)
+    newest = Page("created_at", True, None, PAGE_SIZE + 1)
+    ops = []
+    for _ in range(count):
+        kind = rnd.random()
+        if kind < write_share / 2:
+            ops.append(("update_creator_profile", (rnd.choice(world["creator_users"]),
+                                                   {"followers_instagram": rnd.randrange(100_000)})))
+        elif kind < write_share:
+            ops.append(("assign_campaign", (rnd.choice(world["open"]), rnd.choice(world["creators"]))))
+        elif kind < 0.5:
+            ops.append(("search_creators", (skewed(rnd, NICHES), None, None,
+                                            rnd.choice([None, skewed(rnd, LOCATIONS)]), page)))
+        else:
+            ops.append(("list_campaigns", (rnd.choice(["open", None]), rnd.choice([None, skewed(rnd, NICHES)]),
+                                           None, None, newest)))
+    return ops
+
+
+def run(args, cache: bool) -> dict:
+    db = Database()
+    world = seed(db, args.creators, random.Random(0))
+    # Ids are random, but the same seeds draw the same operations on the same rows
+    ops = operations(world, args.operations, args.write_share, args.seed)
+    if not cache:
+        db.creator_search_cache.max_entries = db.campaign_list_cache.max_entries = 0
+    query_seconds, queries = 0.0, 0
+    for name, call_args in ops:
+        if name in ("search_creators", "list_campaigns"):
+            started = time.perf_counter()
+            getattr(db, name)(*call_args)
+            query_seconds += time.perf_counter() - started
+            queries += 1
+        else:
+            getattr(db, name)(*call_args)
+    hits = db.creator_search_cache.hits + db.campaign_list_cache.hits
+    lookups = hits + db.creator_search_cache.misses + db.campaign_list_cache.misses
+    return {
+        "mean_query_us": round(1e6 * query_seconds / max(1, queries), 1),
+        "hit_ratio": round(hits / max(1, lookups), 3),
+        "invalidated": db.creator_search_cache.invalidations + db.campaign_list_cache.invalidations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--creators", type=int, default=20_000)
+    parser.add_argument("--operations", type=int, default=50_000)
+    parser.add_argument("--write-share", type=float, default=0.05, help="share of operations that are writes")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = {"uncached": run(args, False), "cached": run(args, True)}
+    results["speedup"] = round(results["uncached"]["mean_query_us"] / results["cached"]["mean_query_us"], 1)
+    print(json.dumps({"creators": args.creators, "operations": args.operations,
+                      "write_share": args.write_share, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Keyword search latency over creator profiles.
+
+    python -m benchmarks.bench_search --profiles 1000000
+
+Profiles get Zipf-distributed bio words, a name, a niche, a location and a
+unique handle. Reports index build time, resident memory and latency
+percentiles for a mix of one- to three-word queries, prefix queries and
+queries combined with a niche filter.
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from app.database import Database
+from app.pagination import Page, RELEVANCE
+
+NICHES = ["fitness", "beauty", "tech", "food", "travel", "gaming", "fashion", "finance"]
+LOCATIONS = ["Lagos", "Accra", "Nairobi", "London", "New York", "Berlin", "Cairo", "Johannesburg"]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096 / 2**20
+
+
+def make_vocabulary(rnd: random.Random, size: int) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 10))))
+    return sorted(words)
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(1000 * ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    vocabulary = make_vocabulary(rnd, args.vocabulary)
+    rnd.shuffle(vocabulary)
+    # Zipf-like: word i is drawn with weight 1 / (i + 1)
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+
+    db = Database()
+    base_rss = rss_mb()
+    start = time.perf_counter()
+    for i in range(args.profiles):
+        bio = " ".join(rnd.choices(vocabulary, cum_weights=cumulative, k=rnd.randint(5, 25)))
+        name = " ".join(rnd.choices(vocabulary, cum_weights=cumulative, k=2)).title()
+        db.create_creator_profile(f"bench-user-{i}", {
+            "name": name,
+            "bio": bio,
+            "niche": rnd.choice(NICHES),
+            "location": rnd.choice(LOCATIONS),
+            "instagram_handle": f"@{name.split()[0].lower()}_{i}",
+        })
+    build_seconds = time.perf_counter() - start
+
+    queries = []
+    for _ in range(args.queries):
+        words = rnd.choices(vocabulary, cum_weights=cumulative, k=rnd.randint(1, 3))
+        kind = rnd.random()
+        if kind < 0.3:
+            words[-1] = words[-1][:max(2, len(words[-1]) // 2)]
+        niche = rnd.choice(NICHES) if kind > 0.7 else None
+        queries.append((" ".join(words), niche))
+
+    page = Page(RELEVANCE, False, None, args.limit)
+    timings, hits = [], 0
+    for q, niche in queries:
+        start = time.perf_counter()
+        results = db.search_creators(niche=niche, q=q, page=page)
+        timings.append(time.perf_counter() - start)
+        hits += bool(results)
+
+    print(json.dumps({
+        "profiles": args.profiles,
+        "terms": len(db.creators_text.postings),
+        "build_seconds": round(build_seconds, 1),
+        "rss_mb_for_profiles_and_indexes": round(rss_mb() - base_rss),
+        "queries": len(queries),
+        "queries_with_results": hits,
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Encoding time of a campaign list response with and without cached fragments.
+
+    python -m benchmarks.bench_serialization --rows 10000
+
+"response_model" validates and dumps the rows the way FastAPI does for
+response_model=List[Campaign]; "cached" joins the per-record fragments kept
+by app.serialization (warm after the first request, cold before it).
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.database import Database
+from app.models import Campaign
+from app.serialization import encode_record
+
+CAMPAIGN = {
+    "title": "Summer launch",
+    "description": "Short-form video for the new range",
+    "budget": 500.0,
+    "platforms": ["instagram", "tiktok"],
+    "duration_days": 14,
+    "niche": "fitness",
+    "min_followers": 1000,
+    "content_requirements": "One reel and two stories",
+}
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = Database()
+    for _ in range(args.rows):
+        db.create_campaign("bench-brand", CAMPAIGN)
+    rows = db.list_campaigns()
+    adapter = TypeAdapter(List[Campaign])
+
+    def response_model():
+        return adapter.dump_json(adapter.validate_python(rows))
+
+    def cached():
+        return b"[" + b",".join(encode_record(row, Campaign) for row in rows) + b"]"
+
+    cold_start = time.perf_counter()
+    cached()
+    cold = time.perf_counter() - cold_start
+    baseline = best_of(args.repeat, response_model)
+    warm = best_of(args.repeat, cached)
+    print(json.dumps({
+        "rows": args.rows,
+        "response_model_ms": round(1000 * baseline, 2),
+        "cached_cold_ms": round(1000 * cold, 2),
+        "cached_warm_ms": round(1000 * warm, 2),
+        "speedup": round(baseline / warm, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Write throughput and startup time of the durable in-memory Database.
+
+    python -m benchmarks.bench_wal --campaigns 100000
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from app.database import Database
+from app.models import UserType
+
+CAMPAIGN = {
+    "title": "Summer launch",
+    "description": "Short-form video for the new range",
+    "budget": 500.0,
+    "platforms": ["instagram", "tiktok"],
+    "duration_days": 14,
+    "niche": "fitness",
+    "min_followers": 1000,
+    "content_requirements": "One reel and two stories",
+}
+
+
+def write_campaigns(db: Database, brand_id: str, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        db.create_campaign(brand_id, CAMPAIGN)
+    db.wal.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--campaigns", type=int, default=100_000)
+    parser.add_argument("--tail", type=int, default=10_000, help="writes logged after the snapshot")
+    parser.add_argument("--fsync-interval-ms", type=float, default=5.0)
+    parser.add_argument("--synchronous", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database()
+        db.enable_durability(directory, args.fsync_interval_ms / 1000, args.synchronous)
+        user = db.create_user("bench@example.com", "x", UserType.BRAND)
+        brand = db.create_brand_profile(user["id"], {"company_name": "Bench", "industry": "retail",
+                                                     "description": "benchmark brand"})
+
+        elapsed = write_campaigns(db, brand["id"], args.campaigns)
+        fsyncs = db.wal.fsyncs
+
+        snapshot_start = time.perf_counter()
+        db.snapshot()
+        snapshot_time = time.perf_counter() - snapshot_start
+
+        write_campaigns(db, brand["id"], args.tail)
+        db.wal.close()
+
+        startup_start = time.perf_counter()
+        recovered = Database()
+        recovered.enable_durability(directory)
+        startup_time = time.perf_counter() - startup_start
+        recovered.wal.close()
+
+        assert len(recovered.campaigns) == args.campaigns + args.tail
+
+        print(json.dumps({
+            "campaigns": args.campaigns,
+            "synchronous": args.synchronous,
+            "writes_per_second": round(args.campaigns / elapsed),
+            "records_per_fsync": round(args.campaigns / max(fsyncs, 1), 1),
+            "snapshot_seconds": round(snapshot_time, 3),
+            "startup_seconds": round(startup_time, 3),
+            "replayed_tail": args.tail,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
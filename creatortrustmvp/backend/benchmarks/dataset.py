@@ -0,0 +1,102 @@
+"""
+Synthetic dataset for the benchmark suite.
+
+seed() fills a Database through its public methods, so every index and
+aggregate is maintained exactly as the API would maintain it. Sizes derive
+from the creator count: one brand per 20 creators, one campaign per two
+creators, about two applications per campaign, and payments and reviews for
+the campaigns that get that far. Campaigns are split between open, assigned,
+submitted and completed.
+"""
+import random
+from typing import Dict
+
+from app.database import Database
+from app.models import UserType
+
+NICHES = ["fitness", "beauty", "tech", "food", "travel", "gaming", "fashion", "finance"]
+LOCATIONS = ["Lagos", "Accra", "Nairobi", "London", "New York", "Berlin"]
+PLATFORMS = ["instagram", "youtube", "tiktok"]
+WORDS = ["vegan", "home", "workouts", "meal", "prep", "reviews", "budget", "travel", "skincare",
+         "streams", "coding", "tutorials", "street", "style", "investing", "tips", "daily", "vlogs"]
+SUBMISSION = {"content_links": ["https://example.com/post"], "notes": ""}
+
+
+def seed(db: Database, creators: int, rnd: random.Random) -> dict:
+    """
+    Fill db and return the ids the benchmarks draw arguments from: user ids,
+    profile ids and emails of brands and creators, the campaign ids by status
+    and the brand of each campaign.
+    """
+    world = {key: [] for key in ("brand_users", "brands", "creator_users", "creators", "emails",
+                                 "open", "assigned", "submitted", "completed")}
+    world["campaign_brands"] = {}
+    for i in range(max(1, creators // 20)):
+        user = db.create_user(f"brand{i}@bench.example.com", "", UserType.BRAND)
+        profile = db.create_brand_profile(user["id"], {
+            "company_name": f"Brand {i}", "industry": rnd.choice(NICHES), "website": None, "description": "",
+        })
+        world["brand_users"].append(user["id"])
+        world["brands"].append(profile["id"])
+
+    for i in range(creators):
+        email = f"creator{i}@bench.example.com"
+        user = db.create_user(email, "", UserType.CREATOR)
+        db.create_creator_profile(user["id"], {
+            "name": f"Creator {i}",
+            "bio": " ".join(rnd.choices(WORDS, k=rnd.randint(3, 10))),
+            "niche": rnd.choice(NICHES),
+            "location": rnd.choice(LOCATIONS),
+            "instagram_handle": f"creator{i}",
+            "youtube_handle": f"creator{i}" if rnd.random() < 0.4 else None,
+            "tiktok_handle": f"creator{i}" if rnd.random() < 0.6 else None,
+        })
+        profile = db.update_creator_profile(user["id"], {
+            "followers_instagram": int(rnd.paretovariate(1.2) * 1000),
+            "followers_youtube": int(rnd.paretovariate(1.2) * 500),
+            "followers_tiktok": int(rnd.paretovariate(1.2) * 800),
+            "engagement_rate": round(rnd.uniform(0.5, 8.0), 2),
+        })
+        world["creator_users"].append(user["id"])
+        world["creators"].append(profile["id"])
+        world["emails"].append(email)
+
+    for _ in range(max(1, creators // 2)):
+        brand_id = rnd.choice(world["brands"])
+        campaign = db.create_campaign(brand_id, {
+            "title": "Campaign",
+            "description": " ".join(rnd.choices(WORDS, k=8)),
+            "budget": float(rnd.randrange(50, 5000)),
+            "platforms": rnd.sample(PLATFORMS, rnd.randint(1, 2)),
+            "duration_days": rnd.randrange(7, 60),
+            "niche": rnd.choice(NICHES),
+            "min_followers": rnd.choice([0, 0, 1000, 5000]),
+            "content_requirements": "",
+        })
+        world["campaign_brands"][campaign["id"]] = brand_id
+        applicants = rnd.sample(world["creators"], min(len(world["creators"]), rnd.randint(0, 4)))
+        for creator_id in applicants:
+            db.create_application(campaign["id"], creator_id)
+
+        stage = rnd.random()
+        if stage < 0.4 or not applicants:
+            world["open"].append(campaign["id"])
+            continue
+        creator_id = applicants[0]
+        db.assign_campaign(campaign["id"], creator_id)
+        db.create_payment(campaign["id"], campaign["budget"])
+        if stage < 0.6:
+            world["assigned"].append(campaign["id"])
+            continue
+        db.create_submission(campaign["id"], creator_id, SUBMISSION)
+        if stage < 0.7:
+            world["submitted"].append(campaign["id"])
+            continue
+        db.approve_campaign(campaign["id"])
+        db.create_review(campaign["id"], creator_id, brand_id, rnd.randint(1, 5), "")
+        world["completed"].append(campaign["id"])
+    return world
+
+
+def dataset_size(db: Database) -> Dict[str, int]:
+    return {table: len(getattr(db, table)) for table in db.TABLES}
@@ -0,0 +1,228 @@
+"""
+Stress test for concurrent approve and release.
+
+    python -m benchmarks.stress_flows --campaigns 2000 --threads 16
+    python -m benchmarks.stress_flows --database-url postgresql://localhost/creatortrust
+
+Creates submitted campaigns with escrowed payments, then races several
+approvals of every campaign against repeated releases of its payments, late
+resubmissions and reassignments, with campaign listings read alongside. The
+in-memory Database is driven from a thread pool with a tiny switch interval
+so threads interleave inside its methods; PostgreSQL is driven by concurrent
+tasks over the connection pool. Exits with status 1 if any invariant fails:
+each campaign is approved exactly once, each payment is released once, every
+creator's total_campaigns counts each of their campaigns once and the
+profile totals match the payments.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import Database
+from app.models import CampaignStatus, PaymentStatus, UserType
+from app.storage import MemoryStorage, Storage
+
+CAMPAIGN = {
+    "title": "Launch",
+    "description": "",
+    "budget": 500.0,
+    "platforms": ["instagram"],
+    "duration_days": 14,
+    "niche": "fitness",
+    "min_followers": 0,
+    "content_requirements": "",
+}
+SUBMISSION = {"content_links": ["https://example.com/post"], "notes": ""}
+
+
+async def setup(storage: Storage, args: argparse.Namespace, rnd: random.Random) -> dict:
+    run = uuid.uuid4().hex[:8]
+    brands, creators = [], []
+    for i in range(args.brands):
+        user = await storage.create_user(f"brand-{run}-{i}@example.com", "x", UserType.BRAND)
+        brands.append(await storage.create_brand_profile(user["id"], {
+            "company_name": f"Brand {i}", "industry": "fitness", "website": None, "description": "",
+        }))
+    for i in range(args.creators):
+        user = await storage.create_user(f"creator-{run}-{i}@example.com", "x", UserType.CREATOR)
+        creators.append(await storage.create_creator_profile(user["id"], {
+            "name": f"Creator {i}", "bio": "", "niche": "fitness", "location": "Lagos",
+            "instagram_handle": None, "youtube_handle": None, "tiktok_handle": None,
+        }))
+
+    campaigns, payments = {}, {}
+    for _ in range(args.campaigns):
+        brand, creator = rnd.choice(brands), rnd.choice(creators)
+        campaign = await storage.create_campaign(brand["id"], CAMPAIGN)
+        await storage.assign_campaign(campaign["id"], creator["id"])
+        await storage.create_submission(campaign["id"], creator["id"], SUBMISSION)
+        campaigns[campaign["id"]] = (brand["id"], creator["id"])
+        for _ in range(rnd.randint(1, 2)):
+            payment = await storage.create_payment(campaign["id"], float(rnd.randrange(10, 1000)))
+            payments[payment["id"]] = (campaign["id"], payment["amount"])
+    return {"brands": brands, "creators": creators, "campaigns": campaigns, "payments": payments}
+
+
+def build_ops(world: dict, copies: int, rnd: random.Random) -> list:
+    ops = []
+    for campaign_id, (brand_id, creator_id) in world["campaigns"].items():
+        ops += [("approve", campaign_id, None)] * copies
+        ops += [("submit", campaign_id, creator_id), ("assign", campaign_id, creator_id),
+                ("list", None, brand_id)]
+    for payment_id in world["payments"]:
+        ops += [("release", payment_id, None)] * copies
+    rnd.shuffle(ops)
+    return ops
+
+
+def run_op_sync(db: Database, op: tuple):
+    kind, key, other = op
+    if kind == "approve":
+        return db.approve_campaign(key)
+    if kind == "release":
+        return db.release_payment(key)
+    if kind == "submit":
+        return db.create_submission(key, other, SUBMISSION)
+    if kind == "assign":
+        return db.assign_campaign(key, other)
+    db.list_campaigns(status=CampaignStatus.COMPLETED.value)
+    return db.get_profile_stats(other)
+
+
+async def run_op_async(storage: Storage, op: tuple):
+    kind, key, other = op
+    if kind == "approve":
+        return await storage.approve_campaign(key)
+    if kind == "release":
+        return await storage.release_payment(key)
+    if kind == "submit":
+        return await storage.create_submission(key, other, SUBMISSION)
+    if kind == "assign":
+        return await storage.assign_campaign(key, other)
+    await storage.list_campaigns(status=CampaignStatus.COMPLETED.value)
+    return await storage.get_profile_stats(other)
+
+
+def tally(ops: list, results: list) -> Counter:
+    successes = Counter()
+    for (kind, key, _), result in zip(ops, results):
+        if kind in ("approve", "release") and result:
+            successes[kind, key] += 1
+    return successes
+
+
+async def check(storage: Storage, world: dict, successes: Counter) -> list:
+    failures = []
+    for campaign_id in world["campaigns"]:
+        approvals = successes["approve", campaign_id]
+        if approvals != 1:
+            failures.append(f"campaign {campaign_id} approved {approvals} times")
+        campaign = await storage.get_campaign(campaign_id)
+        if campaign["status"] != CampaignStatus.COMPLETED.value:
+            failures.append(f"campaign {campaign_id} ended {campaign['status']}")
+
+    released = Counter()
+    for payment_id, (campaign_id, amount) in world["payments"].items():
+        if successes["release", payment_id] > 1:
+            failures.append(f"payment {payment_id} released {successes['release', payment_id]} times")
+        payment = await storage.get_payment(payment_id)
+        if payment["status"] != PaymentStatus.RELEASED.value:
+            failures.append(f"payment {payment_id} ended {payment['status']}")
+        released[world["campaigns"][campaign_id][0]] += amount
+
+    expected_campaigns = Counter(creator_id for _, creator_id in world["campaigns"].values())
+    for creator in world["creators"]:
+        profile = await storage.get_creator_profile_by_id(creator["id"])
+        if profile["total_campaigns"] != expected_campaigns[creator["id"]]:
+            failures.append(f"creator {creator['id']} has total_campaigns {profile['total_campaigns']}, "
+                            f"expected {expected_campaigns[creator['id']]}")
+
+    for brand in world["brands"]:
+        stats = await storage.get_profile_stats(brand["id"])
+        if abs(stats["released"] - released[brand["id"]]) > 1e-6 or stats["escrowed"]:
+            failures.append(f"brand {brand['id']} totals {dict(stats)}, expected released {released[brand['id']]}")
+    return failures
+
+
+def check_indexes(db: Database) -> list:
+    """The incrementally maintained indexes must equal ones rebuilt from the tables."""
+    failures = [f"profile totals of {profile_id} disagree with a recount" for profile_id in db.verify_profile_stats()]
+    live = (db.campaigns_by_status,
+            {status: {field: list(index.iter_entries()) for field, index in indexes.items()}
+             for status, indexes in db.campaigns_sorted_by_status.items()})
+    db.rebuild_indexes()
+    rebuilt = (db.campaigns_by_status,
+               {status: {field: list(index.iter_entries()) for field, index in indexes.items()}
+                for status, indexes in db.campaigns_sorted_by_status.items()})
+    names = ("campaigns_by_status", "campaigns_sorted_by_status")
+    return failures + [f"{name} differs from a rebuild" for name, a, b in zip(names, live, rebuilt) if a != b]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--campaigns", type=int, default=2000)
+    parser.add_argument("--brands", type=int, default=20)
+    parser.add_argument("--creators", type=int, default=50)
+    parser.add_argument("--copies", type=int, default=4, help="concurrent approvals per campaign and releases per payment")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads (in-memory) or concurrent tasks")
+    parser.add_argument("--database-url", help="stress PostgresStorage instead of the in-memory Database")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    if args.database_url:
+        from app.postgres import PostgresStorage
+        storage = PostgresStorage(args.database_url)
+        await storage.open()
+    else:
+        db = Database()
+        storage = MemoryStorage(db)
+
+    try:
+        world = await setup(storage, args, rnd)
+        ops = build_ops(world, args.copies, rnd)
+        started = time.perf_counter()
+        if args.database_url:
+            semaphore = asyncio.Semaphore(args.threads)
+
+            async def limited(op):
+                async with semaphore:
+                    return await run_op_async(storage, op)
+
+            results = await asyncio.gather(*(limited(op) for op in ops))
+        else:
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+            try:
+                with ThreadPoolExecutor(args.threads) as pool:
+                    results = list(pool.map(lambda op: run_op_sync(db, op), ops))
+            finally:
+                sys.setswitchinterval(switch_interval)
+        elapsed = time.perf_counter() - started
+
+        failures = await check(storage, world, tally(ops, results))
+        if not args.database_url:
+            failures += check_indexes(db)
+    finally:
+        await storage.close()
+
+    print(json.dumps({
+        "backend": "postgres" if args.database_url else "memory",
+        "campaigns": args.campaigns,
+        "payments": len(world["payments"]),
+        "operations": len(ops),
+        "ops_per_second": round(len(ops) / elapsed),
+        "failures": len(failures),
+    }, indent=2))
+    for failure in failures[:20]:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,282 @@
+"""
+Benchmark suite: Database method latency and API endpoint throughput.
+
+    python -m benchmarks.suite --scales 1000,10000 --output results.json
+    python -m benchmarks.suite --scales 1000,10000 --compare results.json
+
+For each scale (a creator count) seeds a fresh in-memory Database with the
+synthetic dataset from benchmarks.dataset, then
+  - times DATABASE_CASES by calling Database methods directly, one call at a
+    time, and
+  - drives the FastAPI app in process through httpx.ASGITransport with
+    --concurrency clients per case in HTTP_CASES, timing every request.
+Results are printed (and written to --output) as JSON, with the commit they
+were measured at. --compare reads an earlier result file and exits with
+status 1 if a case's p50 at the same scale grew by more than --threshold.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from app.auth import create_access_token
+from app.database import Database
+from app.main import app as api
+from app.matching import DEFAULT_MATCH_LIMIT
+from app.models import UserType
+from app.pagination import RELEVANCE, Page
+from app.storage import MemoryStorage, storage
+from benchmarks.dataset import LOCATIONS, NICHES, WORDS, dataset_size, seed
+
+PAGE_SIZE = 20
+# Creators that get a token for the authenticated endpoints (every brand does)
+TOKEN_CREATORS = 100
+# p50 growth smaller than this is noise, whatever the ratio
+NOISE_FLOOR = {"p50_us": 1.0, "p50_ms": 0.05}
+
+# Each case picks its arguments (untimed) and returns the call to time
+DatabaseCase = Callable[[Database, dict, random.Random], Tuple[Callable, tuple]]
+
+DATABASE_CASES: Dict[str, DatabaseCase] = {
+    "get_user_by_email": lambda db, world, rnd: (
+        db.get_user_by_email, (rnd.choice(world["emails"]),)),
+    "get_creator_profile_by_id": lambda db, world, rnd: (
+        db.get_creator_profile_by_id, (rnd.choice(world["creators"]),)),
+    "search_creators_by_niche": lambda db, world, rnd: (
+        db.search_creators, (rnd.choice(NICHES), None, None, None, Page("rating", True, None, PAGE_SIZE + 1))),
+    "search_creators_by_niche_and_location": lambda db, world, rnd: (
+        db.search_creators, (rnd.choice(NICHES), None, None, rnd.choice(LOCATIONS),
+                             Page("followers", True, None, PAGE_SIZE + 1))),
+    "search_creators_by_text": lambda db, world, rnd: (
+        db.search_creators, (None, None, None, None, Page(RELEVANCE, False, None, PAGE_SIZE + 1),
+                             " ".join(rnd.sample(WORDS, 2)))),
+    "list_open_campaigns": lambda db, world, rnd: (
+        db.list_campaigns, ("open", None, None, None, Page("created_at", True, None, PAGE_SIZE + 1))),
+    "list_campaigns_by_niche": lambda db, world, rnd: (
+        db.list_campaigns, (None, rnd.choice(NICHES), None, None, Page("budget", True, None, PAGE_SIZE + 1))),
+    "get_campaign": lambda db, world, rnd: (
+        db.get_campaign, (rnd.choice(world["open"]),)),
+    "match_creators": lambda db, world, rnd: (
+        db.match_creators, (db.get_campaign(rnd.choice(world["open"])), DEFAULT_MATCH_LIMIT)),
+    "get_applicants": lambda db, world, rnd: (
+        db.get_applicants, (rnd.choice(world["open"]), Page("rating", True, None, PAGE_SIZE + 1))),
+    "get_reviews_by_creator": lambda db, world, rnd: (
+        db.get_reviews_by_creator, (rnd.choice(world["creators"]), Page("created_at", True, None, PAGE_SIZE + 1))),
+    "get_rating_summary": lambda db, world, rnd: (
+        db.get_rating_summary, (rnd.choice(world["creators"]),)),
+    "get_payments_by_brand": lambda db, world, rnd: (
+        db.get_payments_by_user, (rnd.choice(world["brand_users"]), UserType.BRAND,
+                                  Page("created_at", True, None, PAGE_SIZE + 1))),
+    "get_profile_stats": lambda db, world, rnd: (
+        db.get_profile_stats, (rnd.choice(world["brands"]),)),
+    "update_creator_profile": lambda db, world, rnd: (
+        db.update_creator_profile, (rnd.choice(world["creator_users"]),
+                                    {"followers_instagram": rnd.randrange(100_000)})),
+    "create_campaign": lambda db, world, rnd: (
+        db.create_campaign, (rnd.choice(world["brands"]), {
+            "title": "Campaign", "description": "", "budget": float(rnd.randrange(50, 5000)),
+            "platforms": ["instagram"], "duration_days": 30, "niche": rnd.choice(NICHES),
+            "min_followers": 0, "content_requirements": "",
+        })),
+    "create_application": lambda db, world, rnd: (
+        db.create_application, (rnd.choice(world["open"]), rnd.choice(world["creators"]))),
+}
+
+# Each case picks (method, url, headers, json body) for one request; tokens
+# holds bearer headers by brand profile id under "brand" and a list of
+# creator ones under "creator"
+HttpCase = Callable[[dict, random.Random, dict], Tuple[str, str, dict, Any]]
+
+def matches_request(world: dict, rnd: random.Random, tokens: dict) -> Tuple[str, str, dict, Any]:
+    campaign_id = rnd.choice(world["open"])
+    return "GET", f"/api/campaigns/{campaign_id}/matches", tokens["brand"][world["campaign_brands"][campaign_id]], None
+
+
+HTTP_CASES: Dict[str, HttpCase] = {
+    "GET /healthz": lambda world, rnd, tokens: ("GET", "/healthz", {}, None),
+    "GET /api/auth/me": lambda world, rnd, tokens: (
+        "GET", "/api/auth/me", rnd.choice(tokens["creator"]), None),
+    "GET /api/creators/search?niche": lambda world, rnd, tokens: (
+        "GET", f"/api/creators/search?niche={rnd.choice(NICHES)}&limit={PAGE_SIZE}", {}, None),
+    "GET /api/creators/search?q": lambda world, rnd, tokens: (
+        "GET", f"/api/creators/search?q={'+'.join(rnd.sample(WORDS, 2))}&limit={PAGE_SIZE}", {}, None),
+    "GET /api/campaigns?status=open": lambda world, rnd, tokens: (
+        "GET", f"/api/campaigns?status=open&limit={PAGE_SIZE}", {}, None),
+    "GET /api/campaigns/{id}": lambda world, rnd, tokens: (
+        "GET", f"/api/campaigns/{rnd.choice(world['open'])}", {}, None),
+    "GET /api/campaigns/{id}/matches": lambda world, rnd, tokens: matches_request(world, rnd, tokens),
+    "GET /api/reviews/creator/{id}/summary": lambda world, rnd, tokens: (
+        "GET", f"/api/reviews/creator/{rnd.choice(world['creators'])}/summary", {}, None),
+    "GET /api/payments/history": lambda world, rnd, tokens: (
+        "GET", f"/api/payments/history?limit={PAGE_SIZE}", tokens["brand"][rnd.choice(world["brands"])], None),
+    "GET /api/brands/dashboard": lambda world, rnd, tokens: (
+        "GET", "/api/brands/dashboard", tokens["brand"][rnd.choice(world["brands"])], None),
+    "POST /api/creators/profile": lambda world, rnd, tokens: (
+        "POST", "/api/creators/profile", rnd.choice(tokens["creator"]), {
+            "name": "Updated", "bio": " ".join(rnd.sample(WORDS, 4)), "niche": rnd.choice(NICHES),
+            "location": rnd.choice(LOCATIONS),
+        }),
+}
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def bearer(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': user_id})}"}
+
+
+def run_database_cases(db: Database, world: dict, iterations: int, rnd: random.Random) -> dict:
+    results = {}
+    for name, case in DATABASE_CASES.items():
+        gc.collect()
+        timings = []
+        for _ in range(iterations):
+            method, args = case(db, world, rnd)
+            started = time.perf_counter()
+            method(*args)
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            "calls": iterations,
+            "mean_us": round(1e6 * sum(timings) / len(timings), 2),
+            "p50_us": round(1e6 * percentile(timings, 0.50), 2),
+            "p99_us": round(1e6 * percentile(timings, 0.99), 2),
+        }
+    return results
+
+
+async def run_http_cases(world: dict, requests: int, concurrency: int, rnd: random.Random) -> dict:
+    tokens = {
+        "brand": {brand_id: bearer(user_id) for brand_id, user_id in zip(world["brands"], world["brand_users"])},
+        "creator": [bearer(user_id) for user_id in world["creator_users"][:TOKEN_CREATORS]],
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, case in HTTP_CASES.items():
+            gc.collect()
+            plan = [case(world, rnd, tokens) for _ in range(requests)]
+            timings: List[float] = []
+            errors = 0
+
+            async def worker(offset: int):
+                nonlocal errors
+                for method, url, headers, body in plan[offset::concurrency]:
+                    started = time.perf_counter()
+                    response = await client.request(method, url, headers=headers, json=body)
+                    timings.append(time.perf_counter() - started)
+                    errors += response.status_code >= 400
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(i) for i in range(concurrency)))
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                "requests": requests,
+                "errors": errors,
+                "requests_per_second": round(requests / elapsed, 1),
+                "p50_ms": round(1000 * percentile(timings, 0.50), 3),
+                "p99_ms": round(1000 * percentile(timings, 0.99), 3),
+            }
+    return results
+
+
+def regressions(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """
+    Cases whose p50 at a scale present in both runs grew by more than
+    threshold, and by more than the noise floor.
+    """
+    found = []
+    baseline_scales = {scale["creators"]: scale for scale in baseline["scales"]}
+    for scale in current["scales"]:
+        before = baseline_scales.get(scale["creators"])
+        if before is None:
+            continue
+        for section, metric in (("database", "p50_us"), ("http", "p50_ms")):
+            for name, result in scale[section].items():
+                previous = before[section].get(name)
+                if previous is None or result[metric] - previous[metric] < NOISE_FLOOR[metric]:
+                    continue
+                if result[metric] > previous[metric] * threshold:
+                    found.append(f"{scale['creators']} creators, {name}: {metric} "
+                                 f"{previous[metric]} -> {result[metric]}")
+    return found
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scales = []
+    for creators in args.scales:
+        rnd = random.Random(args.seed)
+        db = Database()
+        started = time.perf_counter()
+        world = seed(db, creators, rnd)
+        seed_seconds = time.perf_counter() - started
+        storage.db = db
+        scales.append({
+            "creators": creators,
+            "rows": dataset_size(db),
+            "seed_seconds": round(seed_seconds, 2),
+            "database": run_database_cases(db, world, args.iterations, rnd),
+            "http": await run_http_cases(world, args.requests, args.concurrency, rnd),
+        })
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "measured_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "iterations": args.iterations,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scales": scales,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=lambda value: [int(n) for n in value.split(",")], default=[1000, 10_000],
+                        help="comma-separated creator counts")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per Database case")
+    parser.add_argument("--requests", type=int, default=500, help="requests per HTTP case")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients per HTTP case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--compare", help="earlier results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.5, help="p50 growth that counts as a regression")
+    args = parser.parse_args()
+    if not isinstance(storage, MemoryStorage):
+        parser.error("the suite measures the in-memory Database; unset DATABASE_URL")
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(json.load(f), results, args.threshold)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Database
+from app.main import app
+from app.storage import MemoryStorage, storage
+from tests.helpers import register
+
+
+@pytest.fixture
+def db():
+    return Database()
+
+
+@pytest.fixture
+def fast_switching():
+    """Switch threads as often as possible, so races between them show up."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture
+def client():
+    if not isinstance(storage, MemoryStorage):
+        pytest.skip("needs the in-memory backend")
+    original = storage.db
+    storage.db = Database()
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        storage.db = original
+
+
+@pytest.fixture
+def brand(client):
+    headers = register(client, "brand@example.com", "brand")
+    response = client.post("/api/brands/profile", headers=headers,
+                           json={"company_name": "Acme", "industry": "Food", "description": "Snacks"})
+    assert response.status_code == 200, response.text
+    return headers
+
+
+@pytest.fixture
+def creator(client):
+    """(headers, profile) of a creator with a profile."""
+    headers = register(client, "creator@example.com", "creator")
+    response = client.post("/api/creators/profile", headers=headers,
+                           json={"name": "Ada", "bio": "Recipes", "niche": "Food", "location": "Lagos"})
+    assert response.status_code == 200, response.text
+    return headers, response.json()
+
+
+@pytest.fixture
+def campaign(client, brand):
+    response = client.post("/api/campaigns", headers=brand, json={
+        "title": "Launch", "description": "New flavour", "budget": 500, "platforms": ["instagram"],
+        "duration_days": 7, "niche": "Food", "min_followers": 0, "content_requirements": "One post",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
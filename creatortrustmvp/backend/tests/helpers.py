@@ -0,0 +1,54 @@
+import threading
+from typing import Callable, List
+
+from app.database import Database
+from app.models import UserType
+
+SUBMISSION = {"content_links": ["https://example.com/post"], "notes": "Done"}
+
+
+def register(client, email: str, user_type: str) -> dict:
+    """Authorization headers for a new user."""
+    response = client.post("/api/auth/register", json={"email": email, "password": "pw", "user_type": user_type})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def add_brand(db: Database, name: str = "Acme") -> dict:
+    user = db.create_user(f"{name.lower()}@example.com", "", UserType.BRAND)
+    return db.create_brand_profile(user["id"], {"company_name": name, "industry": "Food", "description": ""})
+
+
+def add_creator(db: Database, name: str, niche: str = "Food", location: str = "Lagos", bio: str = "",
+                **fields) -> dict:
+    user = db.create_user(f"{name.lower().replace(' ', '.')}@example.com", "", UserType.CREATOR)
+    db.create_creator_profile(user["id"], {"name": name, "bio": bio, "niche": niche, "location": location})
+    return db.update_creator_profile(user["id"], fields) if fields else db.get_creator_profile_by_user_id(user["id"])
+
+
+def add_campaign(db: Database, brand_id: str, **fields) -> dict:
+    data = {"title": "Launch", "description": "", "budget": 500.0, "platforms": ["instagram"],
+            "duration_days": 7, "niche": "Food", "min_followers": 0, "content_requirements": ""}
+    return db.create_campaign(brand_id, {**data, **fields})
+
+
+def deliver(db: Database, campaign_id: str, creator_id: str):
+    assert db.assign_campaign(campaign_id, creator_id) is not None
+    assert db.create_submission(campaign_id, creator_id, SUBMISSION) is not None
+
+
+def race(calls: List[Callable[[], object]]) -> list:
+    """Run calls on their own threads, released together, and return their results in order."""
+    barrier = threading.Barrier(len(calls))
+    results: list = [None] * len(calls)
+
+    def run(index: int, call: Callable[[], object]):
+        barrier.wait()
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -0,0 +1,27 @@
+from tests.helpers import add_brand, add_campaign, add_creator, race
+
+
+def test_applying_twice_is_rejected(client, brand, creator, campaign):
+    headers, profile = creator
+    first = client.post(f"/api/campaigns/{campaign['id']}/apply", headers=headers)
+    second = client.post(f"/api/campaigns/{campaign['id']}/apply", headers=headers)
+
+    assert first.status_code == 200 and first.json()["application"]["creator_id"] == profile["id"]
+    assert second.status_code == 400 and second.json()["detail"] == "You have already applied to this campaign"
+    applicants = client.get(f"/api/campaigns/{campaign['id']}/applicants", headers=brand).json()
+    assert [applicant["id"] for applicant in applicants] == [profile["id"]]
+
+
+def test_concurrent_duplicates_store_one_application(db, fast_switching):
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    campaigns = [add_campaign(db, brand["id"]) for _ in range(20)]
+
+    for campaign in campaigns:
+        results = race([lambda: db.create_application(campaign["id"], creator["id"])] * 4)
+        assert sum(result is not None for result in results) == 1
+    assert len(db.applications) == len(campaigns)
+
+    db.rebuild_indexes()
+    assert db.create_application(campaigns[0]["id"], creator["id"]) is None
+    assert len(db.get_applications_by_creator(creator["id"])) == len(campaigns)
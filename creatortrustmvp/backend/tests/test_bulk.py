@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from app import bulk
+from app.bulk import import_ndjson
+from app.storage import MemoryStorage
+from tests.helpers import add_creator
+
+
+def creator_line(email: str, **fields) -> str:
+    return json.dumps({"email": email, "name": "Ada", "bio": "", "niche": "Food", "location": "Lagos", **fields})
+
+
+def run_import(storage, lines, table="creators") -> dict:
+    async def chunks():
+        yield "\n".join(lines).encode()
+
+    return asyncio.run(import_ndjson(storage, table, chunks()))
+
+
+def test_rejected_lines_are_reported_by_number(db):
+    add_creator(db, "Taken")
+    result = run_import(MemoryStorage(db), [
+        creator_line("a@example.com"),
+        "{not json",
+        "",
+        creator_line("not-an-email"),
+        creator_line("a@example.com"),
+        creator_line("taken@example.com"),
+        creator_line("c@example.com"),
+    ])
+
+    assert result["imported"] == 2 and result["failed"] == 4
+    errors = {error["line"]: error["error"] for error in result["errors"]}
+    assert list(errors) == [2, 4, 5, 6]
+    assert errors[2].startswith("Invalid JSON")
+    assert errors[4].startswith("email:")
+    assert errors[5] == "Duplicate email, first given on line 1"
+    assert errors[6] == "Email already registered"
+    assert db.get_user_by_email("c@example.com") is not None
+
+
+def test_rows_are_inserted_a_chunk_at_a_time(db, monkeypatch):
+    monkeypatch.setattr(bulk, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(bulk, "MAX_REPORTED_ERRORS", 2)
+    storage = MemoryStorage(db)
+    batches = []
+    import_creators = storage.import_creators
+
+    async def record(rows):
+        batches.append([row["email"] for row in rows])
+        return await import_creators(rows)
+
+    storage.import_creators = record
+    lines = [creator_line(f"{i}@example.com") for i in range(5)] + ["{", "{", creator_line("0@example.com")]
+    result = run_import(storage, lines)
+
+    assert batches == [["0@example.com", "1@example.com"], ["2@example.com", "3@example.com"], ["4@example.com"]]
+    assert result["imported"] == 5 and result["failed"] == 3
+    assert [error["line"] for error in result["errors"]] == [6, 7]
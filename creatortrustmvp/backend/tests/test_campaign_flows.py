@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from app.storage import storage
+from tests.helpers import add_brand, add_campaign, add_creator, deliver, race
+
+
+def escrow(client, brand, campaign_id, amount):
+    response = client.post("/api/payments/escrow", headers=brand, json={"campaign_id": campaign_id, "amount": amount})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def payment_statuses(client, headers):
+    response = client.get("/api/payments/history", headers=headers)
+    assert response.status_code == 200, response.text
+    return {payment["id"]: payment["status"] for payment in response.json()}
+
+
+def submit(client, brand, creator, campaign_id):
+    creator_headers, profile = creator
+    response = client.post(f"/api/campaigns/{campaign_id}/assign", headers=brand, json={"creator_id": profile["id"]})
+    assert response.status_code == 200, response.text
+    response = client.post(f"/api/campaigns/{campaign_id}/submit", headers=creator_headers,
+                           json={"content_links": ["https://example.com/post"], "notes": "Done"})
+    assert response.status_code == 200, response.text
+
+
+def test_approve_releases_every_escrowed_payment(client, brand, creator, campaign):
+    first = escrow(client, brand, campaign["id"], 300)
+    second = escrow(client, brand, campaign["id"], 200)
+    submit(client, brand, creator, campaign["id"])
+
+    response = client.post(f"/api/campaigns/{campaign['id']}/approve", headers=brand)
+    assert response.status_code == 200, response.text
+    assert response.json()["campaign"]["status"] == "completed"
+    assert payment_statuses(client, brand) == {first["id"]: "released", second["id"]: "released"}
+    assert storage.db.verify_profile_stats() == []
+
+
+def test_approve_twice_conflicts(client, brand, creator, campaign):
+    escrow(client, brand, campaign["id"], 500)
+    submit(client, brand, creator, campaign["id"])
+    assert client.post(f"/api/campaigns/{campaign['id']}/approve", headers=brand).status_code == 200
+
+    assert client.post(f"/api/campaigns/{campaign['id']}/approve", headers=brand).status_code == 409
+    profile = client.get(f"/api/creators/profile/{creator[1]['user_id']}").json()
+    assert profile["total_campaigns"] == 1
+
+
+def test_approve_before_submission_conflicts(client, brand, creator, campaign):
+    response = client.post(f"/api/campaigns/{campaign['id']}/assign", headers=brand,
+                           json={"creator_id": creator[1]["id"]})
+    assert response.status_code == 200, response.text
+
+    assert client.post(f"/api/campaigns/{campaign['id']}/approve", headers=brand).status_code == 409
+
+
+def test_release_twice_conflicts(client, brand, campaign):
+    payment = escrow(client, brand, campaign["id"], 500)
+    assert client.post(f"/api/payments/{payment['id']}/release", headers=brand).status_code == 200
+
+    assert client.post(f"/api/payments/{payment['id']}/release", headers=brand).status_code == 409
+    assert payment_statuses(client, brand) == {payment["id"]: "released"}
+
+
+def test_expiry_refunds_escrow(client, brand, campaign):
+    payment = escrow(client, brand, campaign["id"], 500)
+    response = client.put(f"/api/campaigns/{campaign['id']}", headers=brand, json={"deadline": "2020-01-01T00:00:00"})
+    assert response.status_code == 200, response.text
+
+    storage.db.expire_campaigns(datetime.utcnow())
+    assert client.get(f"/api/campaigns/{campaign['id']}").json()["campaign"]["status"] == "expired"
+    assert payment_statuses(client, brand) == {payment["id"]: "refunded"}
+    assert storage.db.verify_profile_stats() == []
+
+
+
+def test_concurrent_approvals_complete_once(db, fast_switching):
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    for _ in range(50):
+        campaign = add_campaign(db, brand["id"])
+        payments = [db.create_payment(campaign["id"], 100.0) for _ in range(3)]
+        deliver(db, campaign["id"], creator["id"])
+
+        results = race([lambda: db.approve_campaign(campaign["id"])] * 8)
+
+        assert sum(result is not None for result in results) == 1
+        assert all(payment["status"] == "released" for payment in payments)
+    assert db.get_creator_profile_by_id(creator["id"])["total_campaigns"] == 50
+    assert db.get_profile_stats(creator["id"])["released"] == 50 * 300.0
+    assert db.verify_profile_stats() == []
+
+
+def test_approve_and_release_race_releases_each_payment_once(db, fast_switching):
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    for _ in range(50):
+        campaign = add_campaign(db, brand["id"])
+        payments = [db.create_payment(campaign["id"], 100.0) for _ in range(3)]
+        deliver(db, campaign["id"], creator["id"])
+        releases = [lambda payment_id=payment["id"]: db.release_payment(payment_id) for payment in payments]
+
+        results = race([lambda: db.approve_campaign(campaign["id"])] * 4 + releases * 2)
+
+        assert sum(result is not None for result in results[:4]) == 1
+        assert all(payment["status"] == "released" for payment in payments)
+    assert db.get_profile_stats(creator["id"])["released"] == 50 * 300.0
+    assert db.get_profile_stats(brand["id"])["escrowed"] == 0
+    assert db.verify_profile_stats() == []
+
+
+def test_assign_racing_approve_leaves_one_outcome(db, fast_switching):
+    brand = add_brand(db)
+    first, second = add_creator(db, "Ada"), add_creator(db, "Bo")
+    for _ in range(50):
+        campaign = add_campaign(db, brand["id"])
+        db.create_payment(campaign["id"], 100.0)
+        deliver(db, campaign["id"], first["id"])
+
+        results = race([lambda: db.approve_campaign(campaign["id"]),
+                        lambda: db.assign_campaign(campaign["id"], second["id"])] * 4)
+
+        # Submitted work can no longer be reassigned, so every approval but one and every assign fail
+        assert sum(result is not None for result in results) == 1
+        assert campaign["status"] == "completed" and campaign["creator_id"] == first["id"]
+    assert [c["id"] for c in db.get_campaigns_by_creator(second["id"])] == []
+    assert db.get_creator_profile_by_id(first["id"])["total_campaigns"] == 50
+    assert db.verify_profile_stats() == []
@@ -0,0 +1,54 @@
+from app.models import UserType
+from app.pagination import Page
+from tests.helpers import SUBMISSION, add_brand, add_campaign, add_creator, deliver
+
+
+def by_campaign(db):
+    return {
+        campaign_id: ({s["id"] for s in db.get_submissions_by_campaign(campaign_id)},
+                      {p["id"] for p in db.get_payments_by_campaign(campaign_id)})
+        for campaign_id in db.campaigns
+    }
+
+
+def test_submissions_and_payments_are_indexed_by_campaign(db):
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    campaigns = [add_campaign(db, brand["id"]) for _ in range(4)]
+    payments = [db.create_payment(campaign["id"], 100.0 * (i + 1)) for i, campaign in enumerate(campaigns[:3])]
+    deliver(db, campaigns[0]["id"], creator["id"])
+    db.create_submission(campaigns[0]["id"], creator["id"], SUBMISSION)
+    deliver(db, campaigns[1]["id"], creator["id"])
+
+    indexed = by_campaign(db)
+    assert indexed[campaigns[0]["id"]] == ({s["id"] for s in db.submissions.values()
+                                            if s["campaign_id"] == campaigns[0]["id"]}, {payments[0]["id"]})
+    assert len(indexed[campaigns[0]["id"]][0]) == 2
+    assert indexed[campaigns[2]["id"]] == (set(), {payments[2]["id"]})
+    assert indexed[campaigns[3]["id"]] == (set(), set())
+    assert db.get_submission_by_campaign(campaigns[1]["id"])["campaign_id"] == campaigns[1]["id"]
+
+    db.rebuild_indexes()
+    assert by_campaign(db) == indexed
+
+
+def test_payments_follow_the_campaign_to_a_new_creator(db):
+    brand = add_brand(db)
+    ada, grace = add_creator(db, "Ada"), add_creator(db, "Grace")
+    campaigns = [add_campaign(db, brand["id"]) for _ in range(3)]
+    for i, campaign in enumerate(campaigns):
+        db.create_payment(campaign["id"], 100.0 * (i + 1))
+        db.assign_campaign(campaign["id"], ada["id"])
+    db.assign_campaign(campaigns[1]["id"], grace["id"])
+    largest_first = Page("amount", True, None, None)
+
+    def amounts(user_id, user_type, page=None):
+        return [payment["amount"] for payment in db.get_payments_by_user(user_id, user_type, page)]
+
+    for _ in range(2):
+        assert sorted(amounts(ada["user_id"], UserType.CREATOR)) == [100.0, 300.0]
+        assert amounts(ada["user_id"], UserType.CREATOR, Page("amount", True, None, 1)) == [300.0]
+        assert amounts(grace["user_id"], UserType.CREATOR, largest_first) == [200.0]
+        assert amounts(brand["user_id"], UserType.BRAND, largest_first) == [300.0, 200.0, 100.0]
+        assert amounts(brand["user_id"], UserType.CREATOR) == []
+        db.rebuild_indexes()
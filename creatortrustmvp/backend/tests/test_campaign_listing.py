@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from app.indexes import SortedIndex
+from app.pagination import Page
+from app.storage import storage
+from tests.helpers import add_brand, add_campaign, add_creator, deliver
+
+NICHES = ["Food", "Tech", "Travel"]
+
+
+def expected(db, status=None, niche=None, low=None, high=None):
+    return {
+        campaign["id"] for campaign in db.campaigns.values()
+        if (status is None or campaign["status"] == status)
+        and (niche is None or campaign["niche"].lower() == niche.lower())
+        and (low is None or campaign["budget"] >= low)
+        and (high is None or campaign["budget"] <= high)
+    }
+
+
+def ids(rows):
+    return {row["id"] for row in rows}
+
+
+def test_sorted_index_range_after_removal():
+    index = SortedIndex()
+    for key, item_id in [(300.0, "c"), (100.0, "a"), (200.0, "b"), (200.0, "d")]:
+        index.add(key, item_id)
+    index.remove(200.0, "b")
+
+    assert list(index.irange(150.0, 300.0)) == ["d", "c"]
+    assert index.count_range(maximum=200.0) == 2
+
+
+def test_listing_follows_updates(db):
+    rnd = random.Random(2)
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    campaigns = [add_campaign(db, brand["id"], niche=rnd.choice(NICHES), budget=float(rnd.randrange(50, 5000)))
+                 for _ in range(60)]
+    for campaign in campaigns[:10]:
+        deliver(db, campaign["id"], creator["id"])
+    for campaign in campaigns[10:40]:
+        db.update_campaign(campaign["id"], {"niche": rnd.choice(NICHES).upper(),
+                                            "budget": float(rnd.randrange(50, 5000))})
+
+    for status in (None, "open", "submitted"):
+        for niche in (None, "food", "TECH"):
+            for low, high in ((None, None), (1000.0, None), (None, 2500.0), (1000.0, 2500.0)):
+                assert ids(db.list_campaigns(status, niche, low, high)) == expected(db, status, niche, low, high)
+
+
+def test_budget_page_is_the_largest_budgets(db):
+    brand = add_brand(db)
+    campaigns = [add_campaign(db, brand["id"], budget=float(budget)) for budget in range(100, 2100, 100)]
+    db.update_campaign(campaigns[0]["id"], {"budget": 5000.0})
+
+    page = db.list_campaigns(status="open", page=Page("budget", True, None, 3))
+    assert [row["budget"] for row in page] == [5000.0, 2000.0, 1900.0]
+
+
+@pytest.mark.parametrize("changes", [{"budget": "lots"}, {"budget": float("nan")}, {"budget": float("inf")},
+                                     {"budget": -1}, {"status": "archived"}, {"brand_id": "other"}])
+def test_rejected_update_leaves_campaign_indexed(db, changes):
+    brand = add_brand(db)
+    campaign = add_campaign(db, brand["id"])
+
+    with pytest.raises(ValueError):
+        db.update_campaign(campaign["id"], changes)
+
+    assert campaign["budget"] == 500.0 and campaign["brand_id"] == brand["id"]
+    assert ids(db.list_campaigns("open", "food", 100.0, 1000.0)) == {campaign["id"]}
+
+
+@pytest.mark.parametrize("body", ['{"budget": "lots"}', '{"budget": NaN}', '{"budget": Infinity}',
+                                  '{"budget": -5}', '{"status": "cancelled"}'])
+def test_invalid_update_is_unprocessable(client, brand, campaign, body):
+    response = client.put(f"/api/campaigns/{campaign['id']}", headers={**brand, "Content-Type": "application/json"},
+                          content=body)
+    assert response.status_code == 422
+
+    listed = client.get("/api/campaigns", params={"status": "open", "niche": "food", "budget_max": 1000}).json()
+    assert [(row["id"], row["budget"]) for row in listed] == [(campaign["id"], 500)]
+    assert storage.db.verify_profile_stats() == []
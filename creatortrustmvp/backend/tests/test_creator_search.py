@@ -0,0 +1,87 @@
+import math
+import random
+
+import pytest
+
+from app.indexes import PREFIX_MATCH_WEIGHT, InvertedIndex
+from app.pagination import Page, total_followers
+from tests.helpers import add_creator
+
+NICHES = ["Food", "Tech", "Travel"]
+LOCATIONS = ["Lagos", "Accra", "Nairobi"]
+
+
+def expected(db, niche=None, location=None, min_followers=None):
+    return {
+        profile["id"] for profile in db.creator_profiles.values()
+        if (niche is None or profile["niche"].lower() == niche.lower())
+        and (location is None or profile["location"].lower() == location.lower())
+        and (not min_followers or total_followers(profile) >= min_followers)
+    }
+
+
+def ids(rows):
+    return {row["id"] for row in rows}
+
+
+def test_search_follows_profile_updates(db):
+    rnd = random.Random(1)
+    profiles = [add_creator(db, f"Creator {i}", niche=rnd.choice(NICHES), location=rnd.choice(LOCATIONS),
+                            followers_instagram=rnd.randrange(0, 50000)) for i in range(60)]
+    for profile in profiles[:30]:
+        db.update_creator_profile(profile["user_id"], {"niche": rnd.choice(NICHES).lower(),
+                                                       "location": rnd.choice(LOCATIONS),
+                                                       "followers_youtube": rnd.randrange(0, 50000)})
+
+    for niche in (None, "food", "TECH"):
+        for location in (None, "lagos", "Accra"):
+            for min_followers in (None, 10000, 40000):
+                results = db.search_creators(niche, min_followers, location=location, cache=False)
+                assert ids(results) == expected(db, niche, location, min_followers)
+
+
+def test_followers_page_reflects_a_new_total(db):
+    profiles = [add_creator(db, f"Creator {i}", followers_instagram=1000 * i) for i in range(10)]
+    db.update_creator_profile(profiles[0]["user_id"], {"followers_tiktok": 20000})
+
+    page = db.search_creators(niche="food", page=Page("followers", True, None, 3), cache=False)
+    assert [total_followers(row) for row in page] == [20000, 9000, 8000]
+    assert db.search_creators(niche="tech", cache=False) == []
+
+
+def bm25(docs, doc_id, term, k1=1.2, b=0.75):
+    tf = docs[doc_id].count(term)
+    df = sum(term in words for words in docs.values())
+    average = sum(map(len, docs.values())) / len(docs)
+    idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+    return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(docs[doc_id]) / average))
+
+
+def test_bm25_scores_every_token_and_prefixes_at_reduced_weight():
+    docs = {"a": "vegan baking vegan", "b": "vegan travel blog", "c": "baking bread", "d": "street food"}
+    index = InvertedIndex()
+    for doc_id, text in docs.items():
+        index.add(doc_id, [(text, 1)])
+    words = {doc_id: text.split() for doc_id, text in docs.items()}
+
+    scores = index.search("vegan baking")
+    assert set(scores) == {"a"}
+    assert scores["a"] == pytest.approx(bm25(words, "a", "vegan") + bm25(words, "a", "baking"))
+
+    scores = index.search("bak")
+    assert scores["c"] > scores["a"]
+    assert scores["c"] == pytest.approx(PREFIX_MATCH_WEIGHT * bm25(words, "c", "baking"))
+    assert index.search("vegan", within={"b", "d"}).keys() == {"b"}
+
+
+def test_keyword_search_ranks_updated_profiles(db):
+    ada = add_creator(db, "Ada", bio="Sourdough baking every week")
+    grace = add_creator(db, "Grace", bio="Street food reviews")
+    add_creator(db, "Linus", niche="Tech", bio="Baking robots")
+    db.update_creator_profile(grace["user_id"], {"bio": "Baking and street food"})
+
+    assert {row["name"] for row in db.search_creators(q="baking")} == {"Grace", "Ada", "Linus"}
+    assert {row["name"] for row in db.search_creators(niche="food", q="bak")} == {"Grace", "Ada"}
+    assert [row["name"] for row in db.search_creators(q="sourd")] == ["Ada"]
+    assert db.search_creators(q="reviews") == []
+    assert db.search_creators(q="ada baking")[0]["id"] == ada["id"]
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from tests.helpers import add_brand, add_campaign, add_creator, deliver
+
+
+def test_profile_stats_follow_campaign_and_payment_changes(db):
+    brand = add_brand(db)
+    ada, grace = add_creator(db, "Ada"), add_creator(db, "Grace")
+    delivered, reassigned, expiring = (add_campaign(db, brand["id"], budget=budget) for budget in (100, 200, 400))
+    for campaign in (delivered, reassigned, expiring):
+        db.create_payment(campaign["id"], campaign["budget"])
+    deliver(db, delivered["id"], ada["id"])
+    db.assign_campaign(reassigned["id"], ada["id"])
+    db.assign_campaign(reassigned["id"], grace["id"])
+
+    assert db.get_profile_stats(brand["id"]) == {
+        "released": 0.0, "escrowed": 700.0, "campaigns": 3, "active_campaigns": 2, "completed_campaigns": 0}
+    assert db.get_profile_stats(ada["id"])["escrowed"] == 100.0
+    assert db.get_profile_stats(grace["id"])["campaigns"] == 1
+
+    db.approve_campaign(delivered["id"])
+    db.expire_campaigns(datetime.utcnow() + timedelta(days=30))
+
+    assert db.get_profile_stats(brand["id"]) == {
+        "released": 100.0, "escrowed": 200.0, "campaigns": 3, "active_campaigns": 1, "completed_campaigns": 1}
+    assert db.get_profile_stats(ada["id"]) == {
+        "released": 100.0, "escrowed": 0.0, "campaigns": 1, "active_campaigns": 0, "completed_campaigns": 1}
+    assert db.verify_profile_stats() == []
+
+
+def test_dashboards_show_released_and_escrowed_totals(client, brand, creator, campaign):
+    creator_headers, profile = creator
+    assert client.post(f"/api/campaigns/{campaign['id']}/assign", headers=brand,
+                       json={"creator_id": profile["id"]}).status_code == 200
+    assert client.post("/api/payments/escrow", headers=brand,
+                       json={"campaign_id": campaign["id"], "amount": 500}).status_code == 200
+
+    pending = client.get("/api/creators/dashboard", headers=creator_headers).json()
+    assert (pending["pending_earnings"], pending["total_earnings"], pending["total_campaigns"]) == (500, 0, 1)
+    assert client.get("/api/brands/dashboard", headers=brand).json()["pending_amount"] == 500
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.events import RESYNC_FRAME, EventBus, TooManySubscribers
+from app.storage import storage
+from tests.helpers import add_brand, add_campaign, add_creator
+
+
+def test_events_reach_only_the_users_they_name():
+    async def run():
+        bus = EventBus(heartbeat=0)
+        ada, grace = bus.subscribe("ada"), bus.subscribe("grace")
+        bus.publish("campaign.assigned", ["ada", None], {"id": "c1"})
+        bus.publish("campaign.submitted", ["ada"], {"id": "c1"})
+        return await ada.next_chunk(), grace.frames, bus.delivered
+
+    chunk, grace_frames, delivered = asyncio.run(run())
+    assert chunk.count(b"\n\n") == 2 and b"event: campaign.assigned\n" in chunk
+    assert chunk.index(b"campaign.assigned") < chunk.index(b"campaign.submitted")
+    assert not grace_frames and delivered == 2
+
+
+def test_database_writes_are_published_to_the_brand_and_creator(db):
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    campaign = add_campaign(db, brand["id"])
+
+    async def run():
+        db.events.heartbeat = 0
+        subscriptions = [db.events.subscribe(brand["user_id"]), db.events.subscribe(creator["user_id"])]
+        # Published from another thread, as a request handled off the loop would
+        await asyncio.to_thread(db.assign_campaign, campaign["id"], creator["id"])
+        return [await asyncio.wait_for(s.next_chunk(), 1) for s in subscriptions]
+
+    for chunk in asyncio.run(run()):
+        assert b"event: campaign.assigned\n" in chunk and campaign["id"].encode() in chunk
+
+
+def test_a_slow_subscriber_gets_one_resync_and_then_new_events():
+    async def run():
+        bus = EventBus(queue_size=2, heartbeat=0)
+        slow = bus.subscribe("ada")
+        for i in range(4):
+            bus.publish("campaign.updated", ["ada"], {"i": i})
+        behind = await slow.next_chunk()
+        bus.publish("campaign.updated", ["ada"], {"i": 4})
+        return behind, await slow.next_chunk(), bus.dropped
+
+    behind, after, dropped = asyncio.run(run())
+    assert behind == RESYNC_FRAME
+    assert b'"i": 4' in after and dropped == 2
+
+
+def test_reconnecting_replays_missed_events_or_resyncs():
+    async def run():
+        bus = EventBus(replay_size=2, heartbeat=0)
+        for i in range(3):
+            bus.publish("campaign.updated", ["ada"], {"i": i})
+        replayed = bus.subscribe("ada", f"{bus.epoch}:2")
+        too_old = bus.subscribe("ada", f"{bus.epoch}:0")
+        other_run = bus.subscribe("ada", "00000000:3")
+        return [await s.next_chunk() for s in (replayed, too_old, other_run)]
+
+    replayed, too_old, other_run = asyncio.run(run())
+    assert b'"i": 2' in replayed and b'"i": 1' not in replayed
+    assert too_old == other_run == RESYNC_FRAME
+
+
+def test_subscribe_enforces_the_cap():
+    async def run():
+        bus = EventBus(heartbeat=0, max_subscribers=1)
+        first = bus.subscribe("ada")
+        with pytest.raises(TooManySubscribers):
+            bus.subscribe("grace")
+        bus.unsubscribe(first)
+        bus.subscribe("grace")
+        return bus.subscriber_count
+
+    assert asyncio.run(run()) == 1
+
+
+def test_a_full_bus_answers_503(client, brand):
+    storage.events.max_subscribers = 0
+    response = client.get("/api/events", headers=brand)
+
+    assert response.status_code == 503
+    assert storage.events.subscriber_count == 0
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database import Database
+from app.scheduler import ExpiryScheduler
+from app.storage import MemoryStorage
+from tests.helpers import add_brand, add_campaign
+
+
+def test_tick_expires_only_overdue_campaigns():
+    db = Database()
+    brand = add_brand(db)
+    overdue, current = add_campaign(db, brand["id"]), add_campaign(db, brand["id"])
+    payment = db.create_payment(overdue["id"], 250.0)
+    db.update_campaign(overdue["id"], {"deadline": datetime.utcnow() - timedelta(minutes=1)})
+
+    expired = asyncio.run(ExpiryScheduler(MemoryStorage(db)).tick())
+
+    assert expired == 1
+    assert overdue["status"] == "expired" and current["status"] == "open"
+    assert payment["status"] == "refunded"
+    assert db.verify_profile_stats() == []
+
+
+def test_stop_waits_for_the_running_tick():
+    class SlowStorage:
+        finished = False
+
+        async def expire_campaigns(self, now, refund):
+            try:
+                await asyncio.sleep(10)
+            finally:
+                self.finished = True
+            return []
+
+    async def run():
+        storage = SlowStorage()
+        scheduler = ExpiryScheduler(storage, interval=1)
+        scheduler.start()
+        await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return storage.finished
+
+    assert asyncio.run(run())
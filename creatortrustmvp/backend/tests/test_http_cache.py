@@ -0,0 +1,47 @@
+from app.http_cache import CAMPAIGN_CACHE_CONTROL, etag_matches
+from app.storage import storage
+
+
+def get(client, path, etag=None):
+    return client.get(path, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_etag_comparison_is_weak():
+    assert etag_matches('W/"x-1", "x-2"', '"x-1"')
+    assert etag_matches("*", '"x-1"')
+    assert not etag_matches('"x-12"', '"x-1"') and not etag_matches(None, '"x-1"')
+
+
+def test_campaign_is_not_modified_until_a_write(client, brand, creator, campaign):
+    path = f"/api/campaigns/{campaign['id']}"
+    first = get(client, path)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == CAMPAIGN_CACHE_CONTROL
+
+    cached = get(client, path, etag)
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    assert client.put(path, headers=brand, json={"title": "Relaunch"}).status_code == 200
+    updated = get(client, path, etag)
+    assert updated.status_code == 200 and updated.json()["campaign"]["title"] == "Relaunch"
+    assert updated.headers["ETag"] != etag
+
+    # A write to a record the response embeds changes the tag as well
+    _, profile = creator
+    storage.db.assign_campaign(campaign["id"], profile["id"])
+    etag = get(client, path).headers["ETag"]
+    storage.db.update_creator_profile(profile["user_id"], {"bio": "New bio"})
+    assert get(client, path, etag).status_code == 200
+
+
+def test_reviews_tag_changes_with_a_new_review(client, creator, campaign):
+    _, profile = creator
+    path = f"/api/reviews/creator/{profile['id']}"
+    etag = get(client, path).headers["ETag"]
+    assert get(client, path, etag).status_code == 304
+
+    storage.db.create_review(campaign["id"], profile["id"], campaign["brand_id"], 5, "Great")
+    response = get(client, path, etag)
+    assert response.status_code == 200 and [review["rating"] for review in response.json()] == [5]
+    assert get(client, path, response.headers["ETag"]).status_code == 304
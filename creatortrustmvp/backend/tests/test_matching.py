@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from app.matching import (
+    ENGAGEMENT_MIDPOINT, EXPERIENCE_MIDPOINT, MATCH_WEIGHTS, MAX_RATING, PLATFORMS, CreatorColumns, reach_midpoint
+)
+from tests.helpers import add_creator
+
+
+def score(profile, min_followers, platforms):
+    reach = sum(profile.get(f"followers_{platform}", 0) for platform in platforms)
+    if reach < min_followers:
+        return None
+    engagement = profile["engagement_rate"]
+    campaigns = profile["total_campaigns"]
+    handles = sum(bool(profile.get(f"{platform}_handle")) for platform in platforms)
+    return (MATCH_WEIGHTS["rating"] * min(profile["rating"] / MAX_RATING, 1.0) +
+            MATCH_WEIGHTS["engagement"] * engagement / (engagement + ENGAGEMENT_MIDPOINT) +
+            MATCH_WEIGHTS["reach"] * reach / (reach + reach_midpoint(min_followers)) +
+            MATCH_WEIGHTS["experience"] * campaigns / (campaigns + EXPERIENCE_MIDPOINT) +
+            MATCH_WEIGHTS["platforms"] * handles / len(platforms))
+
+
+def random_profile(rnd, i):
+    profile = {"id": f"p{i:03d}", "niche": rnd.choice(["Food", "Tech"]), "rating": rnd.choice([0.0, 3.5, 4.5, 5.0]),
+               "engagement_rate": rnd.choice([0.0, 2.0, 6.0]), "total_campaigns": rnd.randrange(0, 4)}
+    for platform in PLATFORMS:
+        profile[f"followers_{platform}"] = rnd.choice([0, 5000, 20000])
+        profile[f"{platform}_handle"] = rnd.choice([None, "handle"])
+    return profile
+
+
+@pytest.mark.parametrize("min_followers, platforms", [(0, ["instagram"]), (10000, ["youtube", "tiktok"]),
+                                                      (25000, list(PLATFORMS))])
+def test_top_k_matches_a_full_sort(min_followers, platforms):
+    rnd = random.Random(min_followers)
+    profiles = [random_profile(rnd, i) for i in range(300)]
+    columns = CreatorColumns(capacity=16)
+    for profile in profiles:
+        columns.put(profile)
+    for profile in profiles[::3]:
+        profile["rating"] = 5.0 - profile["rating"]
+        columns.put(profile)
+
+    scored = [(profile["id"], score(profile, min_followers, platforms)) for profile in profiles
+              if profile["niche"] == "Food"]
+    ranked = sorted(((pid, s) for pid, s in scored if s is not None), key=lambda item: (-item[1], item[0]))
+    for limit in (1, 7, 20, len(ranked) + 5):
+        matches = columns.match("food", min_followers, platforms, limit)
+        assert [pid for pid, _ in matches] == [pid for pid, _ in ranked[:limit]]
+        assert [s for _, s in matches] == pytest.approx([s for _, s in ranked[:limit]])
+
+
+def test_ties_at_the_cut_go_to_older_profiles(db):
+    creators = [add_creator(db, f"Creator {i}", followers_instagram=1000) for i in range(6)]
+    db.update_creator_profile(creators[4]["user_id"], {"followers_instagram": 2000})
+    campaign = {"niche": "Food", "min_followers": 500, "platforms": ["instagram"]}
+
+    matches = db.match_creators(campaign, 3)
+    assert [match["creator"]["id"] for match in matches] == [creators[4]["id"], creators[0]["id"], creators[1]["id"]]
+    assert db.match_creators({**campaign, "niche": "Travel"}, 3) == []
@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.metrics import (
+    LATENCY_BOUNDS, LoopLagProbe, MetricsMiddleware, log_linear_bounds, request_latency, responses
+)
+
+
+def test_log_linear_bounds_stay_within_a_quarter():
+    bounds = log_linear_bounds(-15, 5, 4)
+
+    assert bounds == LATENCY_BOUNDS
+    assert len(bounds) == 81 and bounds[0] == 2.0 ** -15 and bounds[-1] == 32.0
+    assert all(high / low <= 1.25 for low, high in zip(bounds, bounds[1:]))
+
+
+def respond(content_type: bytes, route: str):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "route": SimpleNamespace(path=route)}
+    asyncio.run(MetricsMiddleware(app)(scope, None, send))
+
+
+def test_event_streams_are_counted_but_not_timed():
+    respond(b"application/json", "/test/json")
+    respond(b"text/event-stream; charset=utf-8", "/test/stream")
+
+    assert sum(request_latency.series[("GET", "/test/json")].counts) == 1
+    assert ("GET", "/test/stream") not in request_latency.series
+    assert responses.values[("GET", "/test/stream", 200)] == 1
+
+
+def test_stop_waits_for_the_probe_task():
+    async def run():
+        probe = LoopLagProbe(0.01)
+        probe.start()
+        task = probe._task
+        await asyncio.sleep(0.03)
+        await probe.stop()
+        return task
+
+    task = asyncio.run(run())
+    assert task.done() and task.cancelled()
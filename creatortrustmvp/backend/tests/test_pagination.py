@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(sort, key, item_id):
+    data = json.dumps([sort, key, item_id]).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor("-created_at", created_at, "abc")) == ("-created_at", (created_at, "abc"))
+
+
+def test_timezone_aware_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor("-created_at", {"dt": "2026-01-02T03:04:05+00:00"}, "abc"))
+
+
+def test_timezone_aware_cursor_is_a_bad_request(client, campaign):
+    cursor = raw_cursor("-created_at", {"dt": "2026-01-02T03:04:05+00:00"}, campaign["id"])
+    assert client.get("/api/campaigns", params={"cursor": cursor}).status_code == 400
+
+
+def test_next_page_starts_after_the_cursor(client, brand, campaign):
+    response = client.post("/api/campaigns", headers=brand, json={
+        "title": "Sequel", "description": "Second flavour", "budget": 900, "platforms": ["instagram"],
+        "duration_days": 7, "niche": "Food", "min_followers": 0, "content_requirements": "One post",
+    })
+    assert response.status_code == 200, response.text
+    bigger = response.json()
+
+    response = client.get("/api/campaigns", params={"sort": "-budget", "limit": 1})
+    assert [row["id"] for row in response.json()] == [bigger["id"]]
+    response = client.get("/api/campaigns", params={"cursor": response.headers["X-Next-Cursor"], "limit": 1})
+    assert [row["id"] for row in response.json()] == [campaign["id"]]
+    assert "X-Next-Cursor" not in response.headers
@@ -0,0 +1,80 @@
+import random
+
+from app.pagination import Page
+from app.query_cache import QueryCache
+from tests.helpers import add_brand, add_campaign, add_creator, deliver
+
+NICHES = ["Food", "Tech", "Travel"]
+FIRST_PAGE = Page("budget", True, None, 5)
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def same_results(cached, fresh, page):
+    # Unpaginated results come in no particular order
+    return ids(cached) == ids(fresh) if page is not None else sorted(ids(cached)) == sorted(ids(fresh))
+
+
+def test_cache_is_bounded_by_entries_and_rows():
+    cache = QueryCache(max_entries=2, max_rows=5, max_result_rows=4)
+    cache.put(("food", 1), [{"id": "a"}])
+    cache.put(("tech", 1), [{"id": "b"}, {"id": "c"}])
+    cache.get(("food", 1))
+    cache.put(("food", 2), [{"id": "d"}, {"id": "e"}])
+    cache.put(("travel", 1), [{"id": str(i)} for i in range(5)])
+
+    assert cache.get(("tech", 1)) is None and cache.get(("travel", 1)) is None
+    assert ids(cache.get(("food", 1))) == ["a"] and cache.rows == 3 and cache.evictions == 1
+
+
+def test_cached_listings_match_fresh_ones_after_writes(db):
+    rnd = random.Random(3)
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    campaigns = [add_campaign(db, brand["id"], niche=rnd.choice(NICHES), budget=float(rnd.randrange(50, 5000)))
+                 for _ in range(40)]
+    queries = [dict(status=status, niche=niche, budget_min=low, page=page)
+               for status in (None, "open") for niche in (None, "food", "TECH")
+               for low in (None, 1000.0) for page in (None, FIRST_PAGE)]
+
+    for step in range(60):
+        for query in queries:
+            assert same_results(db.list_campaigns(**query), db.list_campaigns(**query, cache=False), query["page"])
+        campaign = rnd.choice(campaigns)
+        if step % 5 == 0 and campaign["status"] == "open":
+            deliver(db, campaign["id"], creator["id"])
+        elif step % 7 == 0:
+            campaigns.append(add_campaign(db, brand["id"], niche=rnd.choice(NICHES)))
+        else:
+            db.update_campaign(campaign["id"], {"niche": rnd.choice(NICHES), "budget": float(rnd.randrange(50, 5000))})
+    assert db.campaign_list_cache.hits > 0 and db.campaign_list_cache.invalidations > 0
+
+
+def test_cached_searches_match_fresh_ones_after_writes(db):
+    rnd = random.Random(4)
+    profiles = [add_creator(db, f"Creator {i}", niche=rnd.choice(NICHES), followers_instagram=rnd.randrange(0, 50000))
+                for i in range(40)]
+    queries = [dict(niche=niche, min_followers=minimum, location=location, page=page)
+               for niche in (None, "food") for minimum in (None, 20000)
+               for location in (None, "Lagos") for page in (None, Page("followers", True, None, 5))]
+
+    for _ in range(60):
+        for query in queries:
+            assert same_results(db.search_creators(**query), db.search_creators(**query, cache=False), query["page"])
+        profile = rnd.choice(profiles)
+        db.update_creator_profile(profile["user_id"], {"niche": rnd.choice(NICHES),
+                                                       "location": rnd.choice(["Lagos", "Accra"]),
+                                                       "followers_instagram": rnd.randrange(0, 50000)})
+    assert db.creator_search_cache.hits > 0 and db.creator_search_cache.invalidations > 0
+
+
+def test_writes_elsewhere_keep_entries(db):
+    brand = add_brand(db)
+    campaign = add_campaign(db, brand["id"], niche="Tech")
+    cached = db.list_campaigns(niche="food")
+    db.update_campaign(campaign["id"], {"budget": 900.0})
+
+    assert db.list_campaigns(niche="food") == cached
+    assert db.campaign_list_cache.hits == 1 and db.campaign_list_cache.invalidations == 0
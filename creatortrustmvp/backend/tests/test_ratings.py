@@ -0,0 +1,34 @@
+from app.pagination import Page
+from app.storage import storage
+from tests.helpers import add_brand, add_campaign, add_creator
+
+
+def test_summary_and_rating_order_follow_new_reviews(db):
+    brand = add_brand(db)
+    ada, grace = add_creator(db, "Ada"), add_creator(db, "Grace")
+    campaign = add_campaign(db, brand["id"])
+    for rating in (5, 4, 4):
+        db.create_review(campaign["id"], ada["id"], brand["id"], rating, "")
+    db.create_review(campaign["id"], grace["id"], brand["id"], 5, "")
+
+    assert db.get_rating_summary(ada["id"]) == {
+        "count": 3, "average": 4.33, "bayesian_average": 3.5, "histogram": {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}}
+    top = db.search_creators(page=Page("rating", True, None, 1))
+    assert top[0]["id"] == grace["id"]
+
+    db.create_review(campaign["id"], grace["id"], brand["id"], 1, "")
+
+    assert db.get_rating_summary(grace["id"])["histogram"] == {1: 1, 2: 0, 3: 0, 4: 0, 5: 1}
+    assert grace["rating"] == 3.0
+    assert db.search_creators(page=Page("rating", True, None, 1))[0]["id"] == ada["id"]
+    assert db.recompute_creator_ratings() == []
+
+
+def test_summary_endpoint_counts_a_new_review(client, creator, campaign):
+    _, profile = creator
+    storage.db.create_review(campaign["id"], profile["id"], campaign["brand_id"], 4, "")
+    response = client.get(f"/api/reviews/creator/{profile['id']}/summary")
+
+    assert response.status_code == 200
+    assert response.json() == {"count": 1, "average": 4.0, "bayesian_average": 3.17,
+                               "histogram": {"1": 0, "2": 0, "3": 0, "4": 1, "5": 0}}
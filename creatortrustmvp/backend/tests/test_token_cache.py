@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from app.auth import TokenCache, token_cache
+from app.storage import storage
+from tests.helpers import register
+
+
+def claims(user_id, ttl=60):
+    return {"sub": user_id, "exp": time.time() + ttl}
+
+
+def test_least_recently_used_and_expired_tokens_are_evicted():
+    cache = TokenCache(2)
+    cache.put("a", claims("u"))
+    cache.put("b", claims("v"))
+    cache.get("a")
+    cache.put("c", claims("u"))
+    cache.put("d", claims("w", ttl=-1))
+
+    assert cache.get("b") is None and cache.get("d") is None
+    assert cache.get("c")["sub"] == "u"
+
+
+def test_invalidate_user_evicts_only_their_tokens():
+    cache = TokenCache(10)
+    cache.put("a", claims("u"))
+    cache.put("b", claims("u"))
+    cache.put("c", claims("v"))
+
+    cache.invalidate_user("u")
+
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c")["sub"] == "v"
+
+
+def test_password_hash_change_evicts_cached_tokens(client):
+    headers = register(client, "rehash@example.com", "creator")
+    token = headers["Authorization"].split()[1]
+    user = client.get("/api/auth/me", headers=headers).json()["user"]
+    assert token_cache.get(token)["sub"] == user["id"]
+
+    asyncio.run(storage.update_user_password_hash(user["id"], "new-hash"))
+
+    assert token_cache.get(token) is None
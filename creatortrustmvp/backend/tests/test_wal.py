@@ -0,0 +1,179 @@
+import asyncio
+import os
+import pickle
+import zlib
+
+from app import storage as storage_module
+from app.database import Database
+from app.storage import MemoryStorage
+from app.wal import RECORD_HEADER, SEGMENT_PREFIX, SNAPSHOT_PREFIX, WriteAheadLog
+from tests.helpers import add_brand, add_campaign, add_creator, deliver
+
+# Long enough that nothing is fsynced unless a caller waits for it
+IDLE_FSYNC_INTERVAL = 3600
+
+
+def open_log(directory, **kwargs):
+    wal = WriteAheadLog(str(directory), **kwargs)
+    snapshot, tail = wal.load()
+    records = list(tail)
+    wal.start()
+    return wal, snapshot, records
+
+
+def segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(SEGMENT_PREFIX))
+
+
+def segment_path(directory):
+    return os.path.join(directory, segments(directory)[-1])
+
+
+def test_records_are_framed_with_lsn_length_and_crc(tmp_path):
+    wal, _, _ = open_log(tmp_path)
+    wal.append("users", {"id": "a"})
+    wal.append("users", {"id": "b"})
+    wal.close()
+
+    with open(segment_path(tmp_path), "rb") as f:
+        data = f.read()
+    offset, framed = 0, []
+    while offset < len(data):
+        lsn, length, crc = RECORD_HEADER.unpack_from(data, offset)
+        payload = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+        assert zlib.crc32(payload) == crc
+        framed.append((lsn, pickle.loads(payload)))
+        offset += RECORD_HEADER.size + length
+    assert framed == [(1, ("users", {"id": "a"})), (2, ("users", {"id": "b"}))]
+
+
+def test_replay_truncates_a_torn_tail(tmp_path):
+    wal, _, _ = open_log(tmp_path)
+    for item_id in "abc":
+        wal.append("users", {"id": item_id})
+    wal.close()
+    path = segment_path(tmp_path)
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(RECORD_HEADER.pack(4, 100, 0) + b"partial")
+
+    wal, _, records = open_log(tmp_path)
+
+    assert [record["id"] for _, record in records] == ["a", "b", "c"]
+    assert os.path.getsize(path) == size
+    assert wal.append("users", {"id": "d"}) == 4
+    wal.close()
+
+
+def test_replay_stops_at_a_corrupt_record(tmp_path):
+    wal, _, _ = open_log(tmp_path)
+    for item_id in "abc":
+        wal.append("users", {"id": item_id})
+    wal.close()
+    path = segment_path(tmp_path)
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    second = RECORD_HEADER.size + RECORD_HEADER.unpack_from(data, 0)[1]
+    data[second + RECORD_HEADER.size] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(data)
+
+    wal, _, records = open_log(tmp_path)
+
+    assert [record["id"] for _, record in records] == ["a"]
+    assert os.path.getsize(path) == second
+    wal.close()
+
+
+def test_load_applies_the_segments_after_the_snapshot(tmp_path):
+    db = Database()
+    db.enable_durability(str(tmp_path))
+    brand = add_brand(db)
+    db.snapshot()
+    campaign = add_campaign(db, brand["id"], budget=750.0)
+    db.update_campaign(campaign["id"], {"budget": 800.0})
+    db.wal.close()
+
+    wal = WriteAheadLog(str(tmp_path))
+    snapshot, tail = wal.load()
+    assert set(snapshot["brand_profiles"]) == {brand["id"]} and snapshot["campaigns"] == {}
+    assert [(table, record["budget"]) for table, record in tail] == [("campaigns", 750.0), ("campaigns", 800.0)]
+
+    recovered = Database()
+    recovered.enable_durability(str(tmp_path))
+    assert recovered.get_campaign(campaign["id"])["budget"] == 800.0
+    assert [row["id"] for row in recovered.list_campaigns(status="open")] == [campaign["id"]]
+    recovered.wal.close()
+
+
+def test_snapshot_drops_the_segments_and_snapshots_it_covers(tmp_path):
+    db = Database()
+    db.enable_durability(str(tmp_path))
+    add_brand(db, "First")
+    db.snapshot()
+    add_brand(db, "Second")
+    db.snapshot()
+    add_brand(db, "Third")
+    db.wal.close()
+
+    # Each brand logs its user and its profile, so the second snapshot is at LSN 4
+    snapshots = [name for name in os.listdir(tmp_path) if name.startswith(SNAPSHOT_PREFIX)]
+    assert snapshots == [f"{SNAPSHOT_PREFIX}{4:020d}.bin"]
+    assert segments(tmp_path) == [f"{SEGMENT_PREFIX}{5:020d}.log"]
+
+    recovered = Database()
+    recovered.enable_durability(str(tmp_path))
+    assert len(recovered.brand_profiles) == 3
+    recovered.wal.close()
+
+
+def test_crash_after_batched_snapshot_keeps_whole_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "SNAPSHOT_BATCH", 1)
+    db = Database()
+    db.enable_durability(str(tmp_path), fsync_interval=IDLE_FSYNC_INTERVAL)
+    brand = add_brand(db)
+    creator = add_creator(db, "Ada")
+    campaigns = [add_campaign(db, brand["id"]) for _ in range(3)]
+    payments = [db.create_payment(campaign["id"], 100.0) for campaign in campaigns]
+    for campaign in campaigns:
+        deliver(db, campaign["id"], creator["id"])
+    target = campaigns[1]["id"]
+
+    async def snapshot_while_approving():
+        snapshot = asyncio.create_task(MemoryStorage(db).write_snapshot())
+        # Let the snapshot dump the campaigns but not yet the payments
+        for _ in range(len(db.users) + len(db.creator_profiles) + len(db.brand_profiles) + len(campaigns)):
+            await asyncio.sleep(0)
+        db.approve_campaign(target)
+        await snapshot
+
+    asyncio.run(snapshot_while_approving())
+    # Crash: nothing else reaches the disk, and a write was cut off mid-record
+    with open(segment_path(tmp_path), "ab") as f:
+        f.write(RECORD_HEADER.pack(db.wal.last_lsn + 1, 64, 0)[:7])
+
+    recovered = Database()
+    recovered.enable_durability(str(tmp_path), fsync_interval=IDLE_FSYNC_INTERVAL)
+    assert recovered.get_campaign(target)["status"] == "completed"
+    assert recovered.get_payment(payments[1]["id"])["status"] == "released"
+    assert [recovered.get_campaign(c["id"])["status"] for c in campaigns] == ["submitted", "completed", "submitted"]
+    assert recovered.get_creator_profile_by_id(creator["id"])["total_campaigns"] == 1
+    assert recovered.verify_profile_stats() == []
+    recovered.wal.close()
+
+
+def test_close_waits_for_a_snapshot_in_progress(tmp_path):
+    db = Database()
+    db.enable_durability(str(tmp_path))
+    add_brand(db)
+    storage = MemoryStorage(db, snapshot_interval=0.01)
+
+    async def run():
+        await storage.open()
+        task = storage._snapshot_task
+        await asyncio.sleep(0.05)
+        await storage.close()
+        return task.done()
+
+    assert asyncio.run(run())
+    assert db.wal._fd is None
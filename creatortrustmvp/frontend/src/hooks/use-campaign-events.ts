@@ -0,0 +1,10 @@
+import { useEffect, useRef } from 'react';
+import { api, CampaignEvent } from '../lib/api';
+
+// Calls onEvent for each event on the signed-in user's campaigns and payments while the component is mounted
+export function useCampaignEvents(onEvent: (event: CampaignEvent) => void) {
+  const handler = useRef(onEvent);
+  handler.current = onEvent;
+
+  useEffect(() => api.streamEvents((event) => handler.current(event)), []);
+}
@@ -78,6 +78,12 @@ export interface Review {
   created_at: string;
 }
 
+export interface CampaignEvent {
+  id: string;
+  type: string;
+  data: Record<string, any>;
+}
+
 class ApiClient {
   private token: string | null = null;
 
@@ -250,6 +256,68 @@ class ApiClient {
   async getCampaignAnalytics(campaignId: string) {
     return this.request(`/api/analytics/campaign/${campaignId}`);
   }
+
+  // Follows GET /api/events, reconnecting with Last-Event-ID, until the returned function is called.
+  // onEvent also receives { type: 'resync' } when events were missed and the caller should reload.
+  // EventSource cannot send the Authorization header, so the stream is read with fetch.
+  streamEvents(onEvent: (event: CampaignEvent) => void) {
+    const controller = new AbortController();
+    let lastEventId = '';
+    let retryMs = 5000;
+
+    const handleFrame = (frame: string) => {
+      let id = '';
+      let type = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        const colon = line.indexOf(':');
+        if (colon === 0) continue;
+        const field = colon < 0 ? line : line.slice(0, colon);
+        const value = colon < 0 ? '' : line.slice(colon + 1).replace(/^ /, '');
+        if (field === 'id') id = value;
+        else if (field === 'event') type = value;
+        else if (field === 'data') data += value;
+        else if (field === 'retry' && /^\d+$/.test(value)) retryMs = Number(value);
+      }
+      if (id) lastEventId = id;
+      if (data) onEvent({ id, type, data: JSON.parse(data) });
+    };
+
+    const follow = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const headers: Record<string, string> = {};
+          if (this.token) headers['Authorization'] = `Bearer ${this.token}`;
+          if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+          const response = await fetch(`${API_URL}/api/events`, { headers, signal: controller.signal });
+          // Signed out, or a backend without the stream: nothing to retry
+          if (response.status === 401 || response.status === 501) return;
+          if (response.ok && response.body) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            for (;;) {
+              const { value, done } = await reader.read();
+              if (done) break;
+              buffer += decoder.decode(value, { stream: true });
+              let end;
+              while ((end = buffer.indexOf('\n\n')) >= 0) {
+                handleFrame(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+              }
+            }
+          }
+        } catch (error) {
+          if (controller.signal.aborted) return;
+        }
+        // Jittered, so clients dropped together by a restart do not all reconnect at once
+        await new Promise((resolve) => setTimeout(resolve, retryMs * (0.5 + Math.random())));
+      }
+    };
+
+    follow();
+    return () => controller.abort();
+  }
 }
 
 export const api = new ApiClient();
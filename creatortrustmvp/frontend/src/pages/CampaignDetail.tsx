@@ -2,6 +2,7 @@ import { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { api } from '../lib/api';
+import { useCampaignEvents } from '../hooks/use-campaign-events';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Textarea } from '@/components/ui/textarea';
@@ -21,6 +22,10 @@ export default function CampaignDetail() {
     loadCampaign();
   }, [id]);
 
+  useCampaignEvents((event) => {
+    if (event.type === 'resync' || event.data.campaign_id === id) loadCampaign();
+  });
+
   const loadCampaign = async () => {
     try {
       const data = await api.getCampaign(id!);
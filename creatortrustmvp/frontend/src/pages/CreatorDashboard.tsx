@@ -2,6 +2,7 @@ import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { api, Campaign } from '../lib/api';
+import { useCampaignEvents } from '../hooks/use-campaign-events';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { DollarSign, Briefcase, Star, TrendingUp } from 'lucide-react';
@@ -16,6 +17,9 @@ export default function CreatorDashboard() {
     loadDashboard();
   }, []);
 
+  // Every event on the stream concerns one of this user's campaigns
+  useCampaignEvents(() => loadDashboard());
+
   const loadDashboard = async () => {
     try {
       const data = await api.getCreatorDashboard();